@@ -1,3 +1,7 @@
+from core.tracing import traced
+
+
+@traced("verify_salary_slip")
 def verify_salary_slip(uploaded_file):
     if uploaded_file is None:
         return False, "No document uploaded."
@@ -1,7 +1,11 @@
-from core.pdf_generator import generate_sanction_letter_pdf
 from datetime import datetime
 import random
 
+from core.metrics import PDF_SECONDS, timed
+from core.tracing import traced
+
+@traced("create_sanction_letter")
+@timed(PDF_SECONDS)
 def create_sanction_letter(data):
     """
     Creates a sanction letter with enhanced formatting
@@ -26,7 +30,8 @@ def create_sanction_letter(data):
         "Approval Scenario": f"{data.get('scenario', 'A')} - {data.get('scenario_label', 'Instant Approval')}"
     }
     
-    # Generate PDF
+    # Generate PDF (reportlab is imported on first use, not at app start)
+    from core.pdf_generator import generate_sanction_letter_pdf
     filename = generate_sanction_letter_pdf(formatted_data)
     
     return filename
\ No newline at end of file
@@ -1,9 +1,11 @@
 # agents/underwriting_agent.py
 
-from core.interest import calculate_base_interest_rate
+from core.interest import calculate_base_interest_rate, rate_card_for
 from core.emi import calculate_emi
 from core.foir import calculate_foir
+from core.tracing import traced
 
+@traced("run_underwriting")
 def run_underwriting(
         loan_amount,
         tenure,
@@ -85,4 +87,22 @@ def run_underwriting(
         "interest_rate": interest_rate,
         "emi": new_emi,
         "foir": round(foir, 2)
-    }
\ No newline at end of file
+    }
+
+
+def underwriting_inputs(app_data):
+    """
+    Map the chat's app_data onto run_underwriting keyword arguments.
+    Pricing uses the chosen loan type's rate card (core.interest.rate_card_for),
+    the same one the amount step's preview uses.
+    """
+    return {
+        "loan_amount": app_data["loan_amount"],
+        "tenure": app_data["tenure"],
+        "credit_score": app_data["credit_score"],
+        "existing_emi": app_data["existing_emi"],
+        "income": app_data["monthly_salary"],
+        "employment_type": app_data["employment_type"],
+        "loan_purpose": rate_card_for(app_data),
+        "preapproved_limit": app_data["pre_approved_limit"]
+    }
@@ -1,5 +1,9 @@
 from core.mock_bureau import fetch_pan_details, generate_cibil_report
+from core.metrics import BUREAU_SECONDS, timed
+from core.tracing import traced
 
+@traced("verify_pan")
+@timed(BUREAU_SECONDS)
 def verify_pan(pan):
     """Verifies Pan and generates CIBIL report."""
     result = fetch_pan_details(pan)
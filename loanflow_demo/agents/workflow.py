@@ -0,0 +1,537 @@
+# agents/workflow.py
+"""
+Headless loan-application workflow.
+
+The flow is an explicit table of states and the events that move between
+them. Each state has one handler that runs the relevant agent and returns
+an event. Handlers read and write a serializable ApplicationContext and
+queue chat records in its outbox; they never touch Streamlit. app.py is a
+thin view that renders widgets for input states and feeds their values to
+WorkflowEngine.step(). Batch jobs and tests can drive the same engine
+directly:
+
+    engine = WorkflowEngine()
+    ctx = ApplicationContext()
+    engine.run(ctx, JOURNEY)   # or engine.step(ctx, inputs) per state
+"""
+
+import random
+import time
+
+from agents.verification_agent import verify_pan
+from agents.underwriting_agent import run_underwriting, underwriting_inputs
+from agents.document_agent import verify_salary_slip
+from agents.sanction_agent import create_sanction_letter
+from ai import persona  # noqa: F401  registers the shared master_agent
+from ai.explain import explain_rejection
+from ai.prompts import loan_purpose_prompt
+from ai.prefetch import (
+    prefetch_rejection_explanation, rejection_prefetch_key, poll_prefetched, prefetch_ready,
+    discard_prefetch,
+)
+from core import metrics, resources, tracing
+from core.chat_history import ChatRecord
+from core.affordability import affordability_preview
+from core.purpose_classifier import (
+    classify_purpose, record_classification, recommendation_message, CONFIDENCE_THRESHOLD
+)
+from core.utils import ActionLog, validate_pan
+
+
+# ========================================
+# STATES & TRANSITIONS
+# ========================================
+
+GREETING = "greeting"
+DONE = "done"
+
+TRANSITIONS = {
+    GREETING: {"greeted": "start_confirmation"},
+    "start_confirmation": {"confirmed": "loan_purpose", "declined": "start_confirmation"},
+    "loan_purpose": {"recommended": "loan_type"},
+    "loan_type": {"selected": "amount"},
+    "amount": {"entered": "pan"},
+    "pan": {"submitted": "verification_processing", "invalid": "pan"},
+    "verification_processing": {"verified": "underwriting_trigger", "failed": "pan", "error": "pan"},
+    "underwriting_trigger": {
+        "approved": "sanction_letter",
+        "need_documents": "document_upload",
+        "rejected": DONE,
+        "error": DONE,
+    },
+    "document_upload": {"uploaded": "document_verification"},
+    "document_verification": {"verified": "sanction_letter", "failed": "document_upload", "error": "document_upload"},
+    "sanction_letter": {"sanctioned": DONE, "declined": DONE, "error": DONE},
+    DONE: {},
+}
+
+# States that wait for user input; every other state runs on its own
+INPUT_STATES = {"start_confirmation", "loan_purpose", "loan_type", "amount", "pan", "document_upload"}
+
+CONFIRM_WORDS = {"yes", "y", "ok", "okay", "sure", "start", "begin", "proceed"}
+
+
+# ========================================
+# APPLICATION CONTEXT
+# ========================================
+
+class ApplicationContext:
+    """
+    Everything the workflow knows about one application.
+    to_dict()/from_dict() round-trip it; the outbox, the action log and
+    transient objects (prefetch handles, uploaded files) are not serialized.
+    """
+
+    def __init__(self, application_id=None, state=GREETING, app_data=None,
+                 started_at=None, transitions=0):
+        self.application_id = application_id or f"LF{random.randint(100000, 999999)}"
+        self.state = state
+        self.app_data = dict(app_data or {})
+        self.started_at = time.time() if started_at is None else started_at
+        self.transitions = transitions
+        self.outbox = []
+        self.actions = ActionLog(self.application_id)
+        self.transient = {}
+
+    @property
+    def done(self):
+        return self.state == DONE
+
+    def say(self, role, content):
+        self.outbox.append(ChatRecord.message(role, content))
+        return self.outbox[-1]
+
+    def drain(self):
+        """Chat records produced since the last drain."""
+        records, self.outbox = self.outbox, []
+        return records
+
+    def to_dict(self):
+        return {
+            "application_id": self.application_id,
+            "state": self.state,
+            "app_data": dict(self.app_data),
+            "started_at": self.started_at,
+            "transitions": self.transitions,
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(**d)
+
+
+def format_currency(amount):
+    return f"₹{amount:,}"
+
+
+# ========================================
+# MESSAGES
+# ========================================
+
+GREETING_TEXT = (
+    "👋 Hi, I'm Mr. Finn, your personal loan assistant!\n\n"
+    "I'm here to help you secure the perfect loan for your needs. "
+    "The process is simple, secure, and typically takes just a few minutes.\n\n"
+    "**What I'll need from you:**\n"
+    "• Basic loan requirements\n"
+    "• PAN verification\n"
+    "• Income details\n\n"
+    "Shall we get started?"
+)
+
+SALES_TEXT = (
+    "Excellent! Let's begin. 🚀\n\n"
+    "First, I'd like to understand your financial needs better. "
+    "**What's the primary purpose of your loan?**\n\n"
+    "*For example: buying a home, vehicle, education, business expansion, medical emergency, etc.*"
+)
+
+DECLINED_TEXT = "No worries! When you're ready to proceed, just type 'yes' and we'll get started. 😊"
+
+DOCUMENT_REQUEST_TEXT = (
+    "📄 To proceed further, I'll need to verify your income.\n\n"
+    "Please upload your latest **salary slip** or **bank statement** (last 3 months)."
+)
+
+BADGE_STYLES = {
+    "APPROVED": ("#22c55e", "rgba(34, 197, 94, 0.2)", "✅"),
+    "REJECTED": ("#ef4444", "rgba(239, 68, 68, 0.2)", "❌"),
+    "NEED_SALARY_SLIP": ("#f59e0b", "rgba(245, 158, 11, 0.2)", "⏳"),
+}
+
+BADGE_TEMPLATE = """
+            <div style='background: {bg};
+                        padding: 20px; border-radius: 12px;
+                        border: 2px solid {color};
+                        box-shadow: 0 4px 15px rgba(0,0,0,0.2);'>
+                <div style='color: {color}; font-size: 1.3em; font-weight: 800;
+                            display: flex; align-items: center; gap: 10px;'>
+                    {icon} Underwriting Decision: {decision}
+                </div>
+            </div>
+            """
+
+SANCTION_TEMPLATE = """
+🎊 Congratulations! Your loan has been sanctioned!
+
+Your sanction letter is ready for download. Here's what happens next:
+
+**Next Steps:**
+1. ✅ Download your sanction letter
+2. 📧 Check your email for detailed terms
+3. 🔏 Complete KYC verification (if required)
+4. 💳 Loan disbursement within 24-48 hours
+
+**Application Summary:**
+- ⏱️ Time taken: ~{time_taken} minutes
+- 💰 Sanctioned Amount: {amount}
+- 📅 Tenure: {tenure} months
+- 💳 EMI: ₹{emi:,.2f}
+
+Thank you for choosing LoanFlow AI! 🙏
+
+*Need help? Contact our support team 24/7.*
+                """
+
+
+# ========================================
+# ENGINE
+# ========================================
+
+class WorkflowEngine:
+    """
+    Runs handlers and applies the transition table.
+
+    log(role, content, level) receives audit events. record(application_id,
+    stage, event, latency_ms, payload) receives one structured record per
+    step, with the app_data fields the step changed as payload.
+    recommend(built) turns a built loan-purpose prompt into LLM text (the
+    view streams it; the default is a plain blocking call). Agent callables
+    can be swapped for stubs in tests and load runs.
+    """
+
+    def __init__(self, log=None, recommend=None, verify_pan=verify_pan,
+                 verify_document=verify_salary_slip, sanction=create_sanction_letter,
+                 record=None):
+        self.log = log or (lambda role, content, level="INFO": None)
+        self.record = record
+        self.recommend = recommend or _blocking_recommendation
+        self.verify_pan = verify_pan
+        self.verify_document = verify_document
+        self.sanction = sanction
+        self.agent = resources.get("master_agent")
+
+    def step(self, ctx, inputs=None):
+        """Run the current state's handler once; returns the event."""
+        state = ctx.state
+        if state == DONE:
+            raise ValueError(f"application {ctx.application_id} is already complete")
+        if state in INPUT_STATES and inputs is None:
+            raise ValueError(f"state '{state}' needs input")
+
+        # Agent spans (core/tracing.py) nest under the step and carry the application ID
+        with tracing.span(f"workflow.{state}", application_id=ctx.application_id) as span:
+            before = dict(ctx.app_data) if self.record is not None else None
+            start = time.perf_counter()
+            event = HANDLERS[state](self, ctx, inputs or {})
+            elapsed = time.perf_counter() - start
+            if self.record is not None:
+                changed = {k: v for k, v in ctx.app_data.items() if k not in before or before[k] != v}
+                self.record(ctx.application_id, state, event, round(elapsed * 1000, 3), changed)
+            span.set_attribute("loanflow.event", event)
+
+        metrics.WORKFLOW_STEPS.inc(stage=state, event=event)
+        metrics.WORKFLOW_STEP_SECONDS.observe(elapsed, stage=state)
+        if state == GREETING:
+            metrics.APPLICATIONS_STARTED.inc()
+
+        ctx.state = TRANSITIONS[state][event]
+        ctx.transitions += 1
+        if ctx.state == DONE:
+            metrics.APPLICATIONS_COMPLETED.inc(outcome=event)
+        return event
+
+    def advance(self, ctx):
+        """Run automatic states until the workflow waits for input or is done."""
+        while ctx.state != DONE and ctx.state not in INPUT_STATES:
+            self.step(ctx)
+        return ctx.state
+
+    def run(self, ctx, inputs_by_state, max_steps=100):
+        """
+        Drive a whole journey headlessly. inputs_by_state maps each input
+        state to its inputs; returns the context once done (or stuck).
+        """
+        for _ in range(max_steps):
+            self.advance(ctx)
+            if ctx.done or ctx.state not in inputs_by_state:
+                break
+            self.step(ctx, inputs_by_state[ctx.state])
+        return ctx
+
+    def next_states(self, state):
+        return dict(TRANSITIONS.get(state, {}))
+
+    # ---- handlers ------------------------------------------------------
+
+    def greet(self, ctx, inputs):
+        ctx.say("agent", GREETING_TEXT)
+        return "greeted"
+
+    def confirm_start(self, ctx, inputs):
+        text = inputs["text"]
+        ctx.say("user", text)
+
+        if text.lower().strip() in CONFIRM_WORDS:
+            ctx.say("agent", SALES_TEXT)
+            return "confirmed"
+
+        ctx.say("agent", DECLINED_TEXT)
+        return "declined"
+
+    def recommend_loan_type(self, ctx, inputs):
+        purpose = inputs["text"]
+        ctx.say("user", purpose)
+        ctx.app_data["loan_purpose"] = purpose
+
+        # Local classifier first; the LLM only sees low-confidence purposes
+        match = classify_purpose(purpose)
+        use_llm = match["confidence"] < CONFIDENCE_THRESHOLD
+        record_classification(match["confidence"], use_llm)
+        self.log(
+            "PURPOSE_CLASSIFIER",
+            f"{match['loan_type']} confidence={match['confidence']:.2f} llm={use_llm}",
+            "INFO"
+        )
+
+        if not use_llm:
+            rec = match["loan_type"]
+            ctx.say("agent", recommendation_message(purpose, rec))
+            ctx.app_data["recommended_loan_type"] = rec
+            self.log("CLASSIFIER_RECOMMENDATION", rec, "INFO")
+
+        else:
+            try:
+                ai_reply = self.recommend(loan_purpose_prompt(purpose))
+                ctx.say("agent", ai_reply)
+
+                # Extract recommendation ("Home Loan" -> "Home")
+                if "RECOMMENDED:" in ai_reply:
+                    rec = ai_reply.split("RECOMMENDED:")[1].strip()
+                    rec = classify_purpose(rec)["loan_type"] or rec
+                    ctx.app_data["recommended_loan_type"] = rec
+                    self.log("AI_RECOMMENDATION", rec, "INFO")
+
+            except Exception as e:
+                self.log("AI_ERROR", str(e), "ERROR")
+                ctx.say("agent", "Based on your requirement, I can help you find the right loan. Let's proceed!")
+
+        ctx.say("agent", self.agent.get_message("COLLECT_LOAN_TYPE"))
+        return "recommended"
+
+    def select_loan_type(self, ctx, inputs):
+        loan_type, employment = inputs["loan_type"], inputs["employment_type"]
+        ctx.app_data["loan_type"] = loan_type
+        ctx.app_data["employment_type"] = employment
+
+        ctx.say("user", f"I selected {loan_type} and I'm {employment}")
+        ctx.say("agent", self.agent.get_message("COLLECT_AMOUNT"))
+        return "selected"
+
+    def enter_amount(self, ctx, inputs):
+        loan_amount, tenure = inputs["loan_amount"], inputs["tenure"]
+        # Indicative until underwriting reprices with the bureau score
+        preview = affordability_preview(ctx.app_data, loan_amount, tenure)
+        emi = preview["emi"]
+        ctx.app_data.update({"loan_amount": loan_amount, "tenure": tenure, "emi": emi})
+
+        label = "est. EMI" if preview["indicative"] else "EMI"
+        ctx.say("user", f"I need {format_currency(loan_amount)} for {tenure} months ({label}: ₹{emi:,.2f})")
+        ctx.say("agent", self.agent.get_message("COLLECT_PAN"))
+        return "entered"
+
+    def submit_pan(self, ctx, inputs):
+        pan = inputs["pan"].upper()
+        if not validate_pan(pan):
+            return "invalid"
+
+        ctx.app_data["pan"] = pan
+        ctx.say("user", f"PAN: {pan}")
+        return "submitted"
+
+    def verify(self, ctx, inputs):
+        pan = ctx.app_data["pan"]
+
+        try:
+            bureau_data, cibil_report = self.verify_pan(pan)
+
+            if not bureau_data:
+                self.log("VERIFICATION_FAILED", pan, "WARNING")
+                ctx.say("system", "❌ Verification Failed\n\nUnable to verify PAN. Please check and try again.")
+                return "failed"
+
+            ctx.app_data.update({
+                "name": bureau_data["name"],
+                "credit_score": bureau_data["credit_score"],
+                "existing_emi": bureau_data["existing_emi"],
+                "pre_approved_limit": bureau_data["preapproved_limit"],
+                "monthly_salary": bureau_data.get("monthly_income", 80000)
+            })
+            self.log("VERIFICATION_SUCCESS", bureau_data["name"], "INFO")
+
+            # Rules are deterministic: if this will be a rejection, start the
+            # AI explanation now so it is ready by the underwriting step
+            try:
+                ctx.transient["rejection_prefetch"] = prefetch_rejection_explanation(ctx.app_data)
+            except Exception as e:
+                self.log("PREFETCH_ERROR", str(e), "WARNING")
+
+            score = bureau_data["credit_score"]
+            score_emoji = "🟢" if score >= 750 else "🟡" if score >= 650 else "🔴"
+            ctx.say(
+                "system",
+                f"✅ Verification Successful\n\n"
+                f"Welcome, **{bureau_data['name']}**!\n\n"
+                f"{score_emoji} **CIBIL Score:** {score}\n\n"
+                f"💳 **Pre-approved Limit:** {format_currency(bureau_data['preapproved_limit'])}\n"
+                f"💰 **Existing EMI:** {format_currency(bureau_data['existing_emi'])}/month"
+            )
+            ctx.outbox.append(ChatRecord.report(cibil_report))
+            ctx.say("agent", self.agent.get_message("VERIFICATION_DONE", bureau_data))
+            return "verified"
+
+        except Exception as e:
+            self.log("VERIFICATION_ERROR", str(e), "ERROR")
+            ctx.say("system", "❌ System Error \n\nPlease try again or contact support.")
+            return "error"
+
+    def underwrite(self, ctx, inputs):
+        try:
+            handle = ctx.transient.pop("rejection_prefetch", None)
+            uw_result = run_underwriting(**underwriting_inputs(ctx.app_data))
+            decision = uw_result["decision"]
+            self.log("UNDERWRITING_DECISION", decision, "INFO")
+            metrics.DECISIONS.inc(decision=decision)
+            ctx.app_data.update(uw_result)
+
+            color, bg, icon = BADGE_STYLES.get(decision, BADGE_STYLES["NEED_SALARY_SLIP"])
+            ctx.say("system", BADGE_TEMPLATE.format(bg=bg, color=color, icon=icon, decision=decision))
+
+            if decision == "REJECTED":
+                # Template explanation now; a prefetched LLM answer for these
+                # same inputs is used if it is ready, otherwise the view swaps
+                # it in once it lands
+                if handle and handle["key"] != rejection_prefetch_key(ctx.app_data):
+                    discard_prefetch(handle)  # started for inputs that have since changed
+                    handle = None
+                ready = prefetch_ready(handle)
+                polished = poll_prefetched(handle) if ready else None
+                record = ctx.say("agent", polished or explain_rejection(ctx.app_data, polish=False))
+                if handle and not ready:
+                    record.pending = handle
+                return "rejected"
+
+            discard_prefetch(handle)
+
+            if decision == "NEED_SALARY_SLIP":
+                ctx.say("agent", DOCUMENT_REQUEST_TEXT)
+                return "need_documents"
+
+            ctx.say("agent", "🎉 **Great news!** Your loan has been approved. Let me generate your sanction letter...")
+            return "approved"
+
+        except Exception as e:
+            self.log("UNDERWRITING_ERROR", str(e), "ERROR")
+            ctx.say("system", "❌ System error during underwriting. Please try again.")
+            return "error"
+
+    def receive_document(self, ctx, inputs):
+        ctx.transient["document"] = inputs["document"]
+        return "uploaded"
+
+    def verify_document_step(self, ctx, inputs):
+        try:
+            verified, message = self.verify_document(ctx.transient.get("document"))
+            self.log("DOCUMENT_VERIFICATION", f"Verified: {verified}", "INFO")
+
+            if not verified:
+                ctx.say("agent", f"❌ **Document Verification Failed**\n\n{message}\n\nPlease upload a valid document.")
+                return "failed"
+
+            ctx.say("agent", f"✅ **Document Verified Successfully!**\n\n{message}")
+
+            # Recalculate eligibility
+            salary = ctx.app_data["monthly_salary"]
+            total_emi = ctx.app_data["emi"] + ctx.app_data.get("existing_emi", 0)
+            foir = (total_emi / salary) * 100
+
+            if foir <= 50:
+                ctx.app_data["decision"] = "APPROVED"
+                ctx.say("system", f"✅ FOIR Check Passed ({foir:.1f}% ≤ 50%)")
+            else:
+                ctx.app_data["decision"] = "REJECTED"
+                ctx.say("system", f"❌ FOIR Check Failed ({foir:.1f}% > 50%)")
+            return "verified"
+
+        except Exception as e:
+            self.log("DOCUMENT_ERROR", str(e), "ERROR")
+            ctx.say("system", "❌ Error processing document. Please try again.")
+            return "error"
+
+    def issue_sanction(self, ctx, inputs):
+        try:
+            if ctx.app_data.get("decision") != "APPROVED":
+                ctx.say(
+                    "agent",
+                    "Unfortunately, we couldn't approve your loan at this time. "
+                    "Please review the reasons above and feel free to reapply after addressing them."
+                )
+                return "declined"
+
+            sanction_text = self.sanction({"application_id": ctx.application_id, **ctx.app_data})
+            self.log("SANCTION_GENERATED", ctx.application_id, "INFO")
+            ctx.outbox.append(ChatRecord.sanction(sanction_text))
+
+            ctx.say("agent", SANCTION_TEMPLATE.format(
+                time_taken=int(time.time() - ctx.started_at) // 60,
+                amount=format_currency(ctx.app_data["loan_amount"]),
+                tenure=ctx.app_data["tenure"],
+                emi=ctx.app_data["emi"],
+            ))
+            return "sanctioned"
+
+        except Exception as e:
+            self.log("SANCTION_ERROR", str(e), "ERROR")
+            ctx.say("system", "❌ Error generating sanction letter. Please contact support.")
+            return "error"
+
+
+HANDLERS = {
+    GREETING: WorkflowEngine.greet,
+    "start_confirmation": WorkflowEngine.confirm_start,
+    "loan_purpose": WorkflowEngine.recommend_loan_type,
+    "loan_type": WorkflowEngine.select_loan_type,
+    "amount": WorkflowEngine.enter_amount,
+    "pan": WorkflowEngine.submit_pan,
+    "verification_processing": WorkflowEngine.verify,
+    "underwriting_trigger": WorkflowEngine.underwrite,
+    "document_upload": WorkflowEngine.receive_document,
+    "document_verification": WorkflowEngine.verify_document_step,
+    "sanction_letter": WorkflowEngine.issue_sanction,
+}
+
+
+def _blocking_recommendation(built):
+    from ai.groq_client import get_llama_response
+    return get_llama_response(built["prompt"], max_tokens=built["max_tokens"], use_case=built["use_case"])
+
+
+# A complete journey for headless runs (instant approval for ABCDE1234F)
+JOURNEY = {
+    "start_confirmation": {"text": "yes"},
+    "loan_purpose": {"text": "home renovation"},
+    "loan_type": {"loan_type": "Home", "employment_type": "Salaried"},
+    "amount": {"loan_amount": 300000, "tenure": 36},
+    "pan": {"pan": "ABCDE1234F"},
+    "document_upload": {"document": "salary_slip.pdf"},
+}
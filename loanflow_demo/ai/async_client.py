@@ -0,0 +1,199 @@
+# ai/async_client.py
+"""
+Asyncio Groq client shared by every Streamlit session in the process.
+
+- A semaphore caps concurrent upstream calls (GROQ_MAX_CONCURRENCY)
+- A token bucket keeps us inside the API quota (GROQ_REQUESTS_PER_MINUTE)
+- Identical in-flight prompts are coalesced into a single upstream request
+
+Sync callers (explain_underwriting / explain_cibil) go through
+get_llama_response_coalesced, which runs on one background event loop so
+coalescing works across Streamlit script threads.
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import threading
+import time
+
+from ai.groq_client import get_groq_key, GROQ_MODEL, DEADLINE_SECONDS, FALLBACK_RESPONSES, _build_messages
+from ai.resilience import breaker, latency
+from ai.prompts import record_usage
+from core import tracing
+from core.metrics import LLM_SECONDS
+
+
+MAX_CONCURRENCY = int(os.getenv("GROQ_MAX_CONCURRENCY", "8"))
+REQUESTS_PER_MINUTE = float(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+BURST = int(os.getenv("GROQ_BURST", "5"))
+
+
+class TokenBucket:
+    """Async token bucket. rate <= 0 disables limiting."""
+
+    def __init__(self, rate_per_sec, capacity):
+        self.rate = rate_per_sec
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncLlamaClient:
+    """
+    Concurrency-limited, rate-limited, coalescing wrapper around AsyncGroq.
+    """
+
+    def __init__(self, client=None, max_concurrency=MAX_CONCURRENCY,
+                 requests_per_minute=REQUESTS_PER_MINUTE, burst=BURST):
+        self._client = client
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._bucket = TokenBucket(requests_per_minute / 60.0, burst)
+        self._inflight = {}
+        self.stats = {"requests": 0, "upstream": 0, "coalesced": 0, "errors": 0}
+
+    @property
+    def client(self):
+        if self._client is None and get_groq_key():
+            from groq import AsyncGroq
+            self._client = AsyncGroq(api_key=get_groq_key(), timeout=DEADLINE_SECONDS, max_retries=0)
+        return self._client
+
+    async def complete(self, prompt, max_tokens=250, temperature=0.4, use_case=None, span=None):
+        """
+        Return the completion text; concurrent identical prompts share one call.
+        span (if given) is tagged with whether this call was coalesced.
+        """
+        self.stats["requests"] += 1
+        key = (prompt, max_tokens, temperature)
+
+        task = self._inflight.get(key)
+        coalesced = task is not None
+        if not coalesced:
+            task = asyncio.ensure_future(self._request(prompt, max_tokens, temperature, use_case))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t: self._inflight.pop(key, None))
+        else:
+            self.stats["coalesced"] += 1
+        if span is not None:
+            span.set_attribute("loanflow.coalesced", coalesced)
+
+        # shield: one caller giving up must not cancel the others
+        return await asyncio.shield(task)
+
+    async def _request(self, prompt, max_tokens, temperature, use_case=None):
+        if self.client is None:
+            print("⚠️ Groq client not initialized - using fallback")
+            return FALLBACK_RESPONSES["default"]
+
+        # Wait for quota before taking a slot, so a rate-limited request
+        # doesn't hold one that a ready request could use
+        await self._bucket.acquire()
+
+        async with self._semaphore:
+            if not breaker.allow():
+                print("⚡ Groq circuit open - using fallback")
+                return FALLBACK_RESPONSES["default"]
+
+            self.stats["upstream"] += 1
+            start = time.monotonic()
+
+            try:
+                resp = await asyncio.wait_for(
+                    self.client.chat.completions.create(
+                        model=GROQ_MODEL,
+                        messages=_build_messages(prompt),
+                        max_tokens=max_tokens,
+                        temperature=temperature
+                    ),
+                    DEADLINE_SECONDS
+                )
+                text = resp.choices[0].message.content.strip()
+
+            except Exception as e:
+                self.stats["errors"] += 1
+                breaker.record_failure()
+                LLM_SECONDS.observe(time.monotonic() - start, use_case=use_case or "default", outcome="error")
+                print(f"🔴 Groq API Error: {e}")
+                return FALLBACK_RESPONSES["default"]
+
+            elapsed = time.monotonic() - start
+            breaker.record_success()
+            latency.record(elapsed)
+            LLM_SECONDS.observe(elapsed, use_case=use_case or "default", outcome="ok")
+            record_usage(use_case, prompt, text)
+            return text
+
+
+# ========================================
+# PROCESS-WIDE LOOP + SYNC WRAPPERS
+# ========================================
+
+_loop = None
+_shared_client = None
+_lock = threading.Lock()
+
+
+def _get_loop():
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="groq-async-loop", daemon=True).start()
+        return _loop
+
+
+def get_async_client():
+    """Shared AsyncLlamaClient (lives on the background loop)."""
+    global _shared_client
+    with _lock:
+        if _shared_client is None:
+            _shared_client = AsyncLlamaClient()
+        return _shared_client
+
+
+async def get_llama_response_async(prompt, max_tokens=250, temperature=0.4, use_case=None, span=None):
+    """Awaitable get_llama_response for callers already on the shared loop."""
+    return await get_async_client().complete(prompt, max_tokens, temperature, use_case, span)
+
+
+def get_llama_response_coalesced(prompt, max_tokens=250, temperature=0.4, timeout=None, use_case=None):
+    """
+    Blocking wrapper: submit to the shared loop and wait for the result.
+    Waits at most `timeout` seconds (default: the per-call deadline),
+    queueing behind the rate limit included, then returns the fallback.
+    The caller's span covers the wait, tagged loanflow.coalesced.
+    """
+    timeout = DEADLINE_SECONDS if timeout is None else timeout
+    with tracing.span("get_llama_response_coalesced", **{"loanflow.use_case": use_case or "default"}) as span:
+        future = asyncio.run_coroutine_threadsafe(
+            get_llama_response_async(prompt, max_tokens, temperature, use_case, span), _get_loop()
+        )
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            span.set_attribute("loanflow.timed_out", True)
+            print(f"🔴 Groq API Error: no response within {timeout}s")
+            return FALLBACK_RESPONSES["default"]
+        except Exception as e:
+            future.cancel()
+            print(f"🔴 Groq API Error: {e}")
+            return FALLBACK_RESPONSES["default"]
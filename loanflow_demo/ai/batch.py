@@ -0,0 +1,125 @@
+# ai/batch.py
+"""
+Batch explanation generation for offline underwriting runs.
+
+Each row is underwritten (unless it already carries a decision) and gets
+the same explanation text the chat shows: explain_rejection for
+rejections, explain_underwriting otherwise. With LLM polish on, rows whose
+explanation inputs are identical share one request, unique prompts fan out
+over a bounded thread pool (the shared async client still applies its own
+concurrency cap and rate limit), and results come back strictly in input
+order through a bounded look-ahead window, so memory stays flat for large
+files.
+"""
+
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from agents.underwriting_agent import run_underwriting, underwriting_inputs
+from ai.explain import explain_underwriting, explain_rejection, _use_llm
+from ai.prompts import underwriting_prompt, rejection_prompt
+from ai.templates import underwriting_explanation
+
+
+UW_FIELDS = ["decision", "reason", "interest_rate", "emi", "foir"]
+
+
+class BatchExplainer:
+    """
+    Ordered, deduplicating, concurrency-bounded explanation generator.
+
+    window caps rows held in memory ahead of the writer; cache_size caps
+    remembered unique explanations (oldest are evicted first).
+    """
+
+    def __init__(self, polish=None, max_workers=8, window=256, cache_size=10_000):
+        self.polish = _use_llm(polish)
+        self.max_workers = max(1, max_workers)
+        self.window = max(1, window)
+        self.cache_size = max(1, cache_size)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"rows": 0, "unique": 0, "deduplicated": 0, "errors": 0, "invalid": 0}
+
+    def prepare(self, row):
+        """Row merged with its underwriting result (run only if missing)."""
+        if row.get("error"):
+            raise ValueError(row["error"])
+        app = dict(row)
+        if not app.get("decision"):
+            app.update(run_underwriting(**underwriting_inputs(app)))
+        return app
+
+    def _explain(self, app):
+        if app["decision"] == "REJECTED":
+            return explain_rejection(app, polish=True)
+        return explain_underwriting(app, app, polish=True)
+
+    def _submit(self, executor, app, template_text):
+        if not self.polish:
+            future = Future()
+            future.set_result(template_text)
+            return future
+
+        built = rejection_prompt(app) if app["decision"] == "REJECTED" else underwriting_prompt(app, app)
+        key = (built["prompt"], template_text)
+
+        with self._lock:
+            future = self._cache.get(key)
+            if future is not None:
+                self._cache.move_to_end(key)
+                self.stats["deduplicated"] += 1
+                return future
+
+            future = executor.submit(self._explain, app)
+            self._cache[key] = future
+            self.stats["unique"] += 1
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return future
+
+    def _result(self, future, template_text):
+        try:
+            return future.result()
+        except Exception:
+            with self._lock:
+                self.stats["errors"] += 1
+            return template_text
+
+    def run(self, rows):
+        """
+        Yield (app, explanation) for each row, in input order.
+        app is the row merged with its underwriting result; a row that
+        can't be underwritten comes back with an "error" and no explanation.
+        """
+        pending = deque()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ai-batch") as executor:
+            for row in rows:
+                self.stats["rows"] += 1
+                try:
+                    app = self.prepare(row)
+                    template_text = underwriting_explanation(app, app)
+                    future = self._submit(executor, app, template_text)
+                except Exception as e:
+                    # A bad row is reported in place; the rest of the batch goes on
+                    self.stats["invalid"] += 1
+                    app = dict(row, error=row.get("error") or f"{type(e).__name__}: {e}")
+                    template_text = ""
+                    future = Future()
+                    future.set_result("")
+                pending.append((app, template_text, future))
+
+                while pending and (len(pending) >= self.window or pending[0][2].done()):
+                    app, template_text, future = pending.popleft()
+                    yield app, self._result(future, template_text)
+
+            while pending:
+                app, template_text, future = pending.popleft()
+                yield app, self._result(future, template_text)
+
+
+def explain_batch(rows, polish=None, max_workers=8, window=256):
+    """Convenience wrapper: yields (app, explanation) in input order."""
+    return BatchExplainer(polish=polish, max_workers=max_workers, window=window).run(rows)
@@ -1,63 +1,85 @@
 """
 Loan Explanation Agent
-Uses Groq LLM to convert underwriting results & CIBIL data into
-human-friendly explanations.
+Converts underwriting results & CIBIL data into human-friendly
+explanations.
+
+Explanations come from the local template engine (ai/templates.py) by
+default. With LOANFLOW_LLM_POLISH=1 (or polish=True) the Groq LLM writes
+them instead; those calls go through the shared async client, so
+identical explanations requested by concurrent sessions share one
+upstream request. Prompts are built compactly within per-use-case token
+budgets (ai/prompts.py).
 """
 
-from ai.groq_client import get_llama_response
-from ai.persona import EXPLANATION_PERSONA
+import os
 
+from ai.async_client import get_llama_response_coalesced
+from ai.groq_client import FALLBACK_RESPONSES
+from ai.prompts import underwriting_prompt, cibil_prompt, rejection_prompt
+from ai.templates import underwriting_explanation, cibil_explanation
 
-def explain_underwriting(uw_result, app_data):
+
+LLM_POLISH = os.getenv("LOANFLOW_LLM_POLISH", "0") == "1"
+
+
+def _use_llm(polish):
+    return LLM_POLISH if polish is None else polish
+
+
+def _llm_text(built):
+    """LLM text for a built prompt; None if the LLM fell back."""
+    text = get_llama_response_coalesced(
+        built["prompt"], max_tokens=built["max_tokens"], use_case=built["use_case"]
+    )
+    return None if text == FALLBACK_RESPONSES["default"] else text
+
+
+def _polish(built, template_text):
+    """LLM text for a built prompt; the template if the LLM fell back."""
+    return _llm_text(built) or template_text
+
+
+def explain_underwriting(uw_result, app_data, polish=None):
     """
     Generate natural-language explanation of underwriting decision.
     """
 
-    prompt = f"""
-    {EXPLANATION_PERSONA}
+    template_text = underwriting_explanation(uw_result, app_data)
+    if not _use_llm(polish):
+        return template_text
 
-    Explain the underwriting result in simple English.
+    return _polish(underwriting_prompt(uw_result, app_data), template_text)
 
-    Decision: {uw_result.get('decision')}
-    Reason: {uw_result.get('reason')}
-    Loan Amount: ₹{app_data.get('loan_amount')}
-    Tenure: {app_data.get('tenure')} months
-    EMI: ₹{uw_result.get('emi')}
-    Interest Rate: {uw_result.get('interest_rate')}%
-    FOIR: {uw_result.get('foir')}%
-    Monthly Income: ₹{app_data.get('income')}
 
-    Explain:
-    - Why this decision was made
-    - What FOIR means in this case
-    - Whether the customer can improve eligibility
-    - Keep it short and friendly.
+def explain_cibil(cibil_data, polish=None):
+    """
+    Convert CIBIL report fields into a friendly explanation.
     """
 
-    return get_llama_response(prompt)
+    template_text = cibil_explanation(cibil_data)
+    if not _use_llm(polish):
+        return template_text
 
+    return _polish(cibil_prompt(cibil_data), template_text)
 
 
-def explain_cibil(cibil_data):
+def explain_rejection(app_data, polish=None):
     """
-    Convert CIBIL report fields into a friendly explanation.
+    Generate the rejection explanation shown in the chat.
+    app_data already carries the underwriting result fields.
     """
 
-    prompt = f"""
-    {EXPLANATION_PERSONA}
+    template_text = underwriting_explanation(app_data, app_data)
+    if not _use_llm(polish):
+        return template_text
 
-    Explain the customer's CIBIL health:
+    return _polish(rejection_prompt(app_data), template_text)
 
-    Credit Score: {cibil_data.get('credit_score')}
-    Total Accounts: {cibil_data.get('total_accounts')}
-    Active Accounts: {cibil_data.get('active_accounts')}
-    Closed Accounts: {cibil_data.get('closed_accounts')}
-    Payment History: {cibil_data.get('payment_history')}
 
-    Explain:
-    - Whether the credit score is good or bad
-    - What the account history indicates
-    - Whether payment pattern is healthy
+def polished_rejection(app_data):
     """
-
-    return get_llama_response(prompt)
+    LLM rejection explanation only: None if the LLM fell back, so a caller
+    that already shows the template keeps it. app_data must carry the
+    underwriting result fields.
+    """
+    return _llm_text(rejection_prompt(app_data))
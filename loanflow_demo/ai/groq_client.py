@@ -1,19 +1,62 @@
-import streamlit as st
-from groq import Groq
 import os
-from dotenv import load_dotenv
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
-env_path = os.path.join(os.path.dirname(__file__), "..", ".env")
-load_dotenv(env_path)
+from ai import resilience
+from ai.resilience import breaker, latency, first_token
+from ai.prompts import SYSTEM_PREFIX, record_usage
+from core import resources, tracing
+from core.metrics import LLM_SECONDS
 
-# Load key from Streamlit secrets or env
-GROQ_KEY = None
-try:
-    GROQ_KEY = st.secrets.get("GROQ_API_KEY")
-except Exception:
-    GROQ_KEY = os.getenv("GROQ_API_KEY")
+# groq / dotenv / streamlit secrets are loaded on first use (see get_client)
+# so importing this module stays cheap at cold start.
 
-client = Groq(api_key=GROQ_KEY) if GROQ_KEY else None
+# Per-call deadline (seconds) and optional hedging after the pN latency
+DEADLINE_SECONDS = float(os.getenv("GROQ_DEADLINE_SECONDS", "8"))
+HEDGE_PERCENTILE = float(os.getenv("GROQ_HEDGE_PERCENTILE", "0"))  # 0 = no hedging
+HEDGE_MIN_SAMPLES = 20
+
+
+def _load_groq_key():
+    """Load key from Streamlit secrets or env (.env included)."""
+    from dotenv import load_dotenv
+
+    env_path = os.path.join(os.path.dirname(__file__), "..", ".env")
+    load_dotenv(env_path)
+
+    key = None
+    try:
+        import streamlit as st
+        key = st.secrets.get("GROQ_API_KEY")
+    except Exception:
+        pass
+    return key or os.getenv("GROQ_API_KEY")
+
+
+def _build_client():
+    from groq import Groq
+
+    key = resources.get("groq_key")
+    # GROQ_BASE_URL (read by the SDK) points the client at a local stand-in server.
+    # Retries are left to the breaker/hedge logic so the deadline holds.
+    return Groq(api_key=key, timeout=DEADLINE_SECONDS, max_retries=0) if key else None
+
+
+resources.register("groq_key", _load_groq_key)
+resources.register("groq_client", _build_client, close=lambda client: client and client.close())
+
+
+def get_groq_key():
+    return resources.get("groq_key")
+
+
+def get_client():
+    """Shared Groq client, built on first use (None without an API key)."""
+    return resources.get("groq_client")
+
+
+GROQ_MODEL = "llama-3.3-70b-versatile"
+SYSTEM_PROMPT = SYSTEM_PREFIX  # identical on every call
 
 # Fallback responses if API fails
 FALLBACK_RESPONSES = {
@@ -22,27 +65,180 @@ FALLBACK_RESPONSES = {
     "default": "I'm here to help with your loan application. What would you like to know?"
 }
 
-def get_llama_response(prompt, max_tokens=250, temperature=0.4):
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="groq-call")
+
+
+def _build_messages(prompt):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def _complete(prompt, max_tokens, temperature):
+    resp = get_client().chat.completions.create(
+        model=GROQ_MODEL,
+        messages=_build_messages(prompt),
+        max_tokens=max_tokens,
+        temperature=temperature
+    )
+    return resp.choices[0].message.content.strip()
+
+
+def _hedge_delay():
+    """Seconds to wait before sending a duplicate request, or None."""
+    if HEDGE_PERCENTILE <= 0 or latency.count < HEDGE_MIN_SAMPLES:
+        return None
+    return latency.percentile(HEDGE_PERCENTILE)
+
+
+def _complete_within_deadline(prompt, max_tokens, temperature, deadline):
+    """
+    Run the call on the worker pool and stop waiting at the deadline.
+    If hedging is on and the primary is slower than the pN latency, a
+    duplicate is sent and whichever finishes first wins.
+    """
+    start = time.monotonic()
+    primary = _executor.submit(_complete, prompt, max_tokens, temperature)
+    pending = {primary}
+
+    hedge_after = _hedge_delay()
+    if hedge_after is not None and hedge_after < deadline:
+        done, _ = wait(pending, timeout=hedge_after)
+        if not done:
+            resilience.count("hedged")
+            pending.add(_executor.submit(_complete, prompt, max_tokens, temperature))
+
+    while pending:
+        remaining = deadline - (time.monotonic() - start)
+        if remaining <= 0:
+            break
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if future is not primary:
+                    resilience.count("hedge_wins")
+                return future.result()
+            error = future.exception()
+        if not pending:
+            raise error
+
+    resilience.count("deadline_exceeded")
+    raise TimeoutError(f"Groq call exceeded {deadline}s deadline")
+
+
+@tracing.traced("get_llama_response")
+def get_llama_response(prompt, max_tokens=250, temperature=0.4, deadline=None, use_case=None):
     """
-    Get response from Groq Llama model with fallback
+    Get response from Groq Llama model with fallback.
+    Falls back immediately while the circuit breaker is open.
     """
+    client = get_client()
     if client is None:
         print("⚠️ Groq client not initialized - using fallback")
         return FALLBACK_RESPONSES["default"]
-    
+
+    if not breaker.allow():
+        print("⚡ Groq circuit open - using fallback")
+        return FALLBACK_RESPONSES["default"]
+
+    start = time.monotonic()
     try:
-        resp = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": "You are Agent Finn, a professional loan advisor."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=max_tokens,
-            temperature=temperature
-        )
-        
-        return resp.choices[0].message.content.strip()
-    
+        text = _complete_within_deadline(prompt, max_tokens, temperature, deadline or DEADLINE_SECONDS)
+
     except Exception as e:
+        breaker.record_failure()
+        LLM_SECONDS.observe(time.monotonic() - start, use_case=use_case or "default", outcome="error")
         print(f"🔴 Groq API Error: {e}")
-        return FALLBACK_RESPONSES["default"]
\ No newline at end of file
+        return FALLBACK_RESPONSES["default"]
+
+    elapsed = time.monotonic() - start
+    breaker.record_success()
+    latency.record(elapsed)
+    LLM_SECONDS.observe(elapsed, use_case=use_case or "default", outcome="ok")
+    record_usage(use_case, prompt, text)
+    return text
+
+
+def stream_llama_response(prompt, max_tokens=250, temperature=0.4, deadline=None, use_case=None):
+    """
+    Streaming variant of get_llama_response.
+    Yields text chunks as they arrive; yields the fallback text if the
+    client is missing, the breaker is open, or the call fails before the
+    first token. The SDK timeout bounds the connection and each read; the
+    deadline bounds the whole call, so a stream that keeps trickling past
+    it is closed and counted as a failure (text already yielded stands).
+    """
+    client = get_client()
+    if client is None:
+        print("⚠️ Groq client not initialized - using fallback")
+        yield FALLBACK_RESPONSES["default"]
+        return
+
+    if not breaker.allow():
+        print("⚡ Groq circuit open - using fallback")
+        yield FALLBACK_RESPONSES["default"]
+        return
+
+    # Ended in the finally block: the consumer may abandon the generator
+    span = tracing.start_span("stream_llama_response", **{"loanflow.use_case": use_case or "default"})
+    deadline = deadline or DEADLINE_SECONDS
+    start = time.monotonic()
+    received = False
+    finished = False
+    stream = None
+    output = []
+    try:
+        try:
+            stream = client.chat.completions.create(
+                model=GROQ_MODEL,
+                messages=_build_messages(prompt),
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=True,
+                timeout=deadline
+            )
+
+            for chunk in stream:
+                if time.monotonic() - start > deadline:
+                    resilience.count("deadline_exceeded")
+                    raise TimeoutError(f"Groq stream exceeded {deadline}s deadline")
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if not received:
+                        # Time to first token is the latency the user sees
+                        first_token.record(time.monotonic() - start)
+                        span.set_attribute("loanflow.first_token_ms", round((time.monotonic() - start) * 1000, 1))
+                    received = True
+                    output.append(delta)
+                    yield delta
+
+        except Exception as e:
+            finished = True
+            span.set_attribute("loanflow.outcome", "error")
+            span.end(f"{type(e).__name__}: {e}")
+            breaker.record_failure()
+            LLM_SECONDS.observe(time.monotonic() - start, use_case=use_case or "default", outcome="error")
+            print(f"🔴 Groq API Error: {e}")
+            # Mid-stream failures keep the partial answer already shown
+            if not received:
+                yield FALLBACK_RESPONSES["default"]
+            return
+
+        finished = True
+        span.set_attribute("loanflow.outcome", "ok")
+        breaker.record_success()
+        LLM_SECONDS.observe(time.monotonic() - start, use_case=use_case or "default", outcome="ok")
+        record_usage(use_case, prompt, "".join(output))
+
+    finally:
+        if not finished:
+            # Abandoned by the caller (rerun or close()): no verdict either
+            # way, so a half-open probe slot must not stay taken
+            span.set_attribute("loanflow.outcome", "abandoned")
+            breaker.release()
+        if hasattr(stream, "close"):
+            stream.close()
+        span.end()
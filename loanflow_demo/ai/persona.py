@@ -1,13 +1,15 @@
 # ai/persona.py
 
+from core import resources
+
+
 class MasterAgent:
     """
-    Conversational Master Agent - Widget-based flow
+    Conversational Master Agent - message templates per stage.
+    The flow itself (states and transitions) lives only in
+    agents/workflow.TRANSITIONS.
     """
     
-    def __init__(self):
-        self.stage = "GREETING"
-    
     def get_message(self, stage, context=None):
         """Get agent's message for current stage"""
         
@@ -34,25 +36,10 @@ class MasterAgent:
         }
         
         return messages.get(stage, "How can I help you?")
-    
-    def should_show_widget(self, stage):
-        """Check if widgets should be shown for this stage"""
-        return stage in ["COLLECT_LOAN_TYPE", "COLLECT_AMOUNT", "COLLECT_PAN", "DOCUMENT_REQUIRED"]
-    
-    def get_next_stage(self, current_stage, user_action=None):
-        """Determine next stage based on current stage and action"""
-        
-        flow = {
-            "GREETING": "COLLECT_LOAN_TYPE",
-            "COLLECT_LOAN_TYPE": "COLLECT_AMOUNT",
-            "COLLECT_AMOUNT": "COLLECT_PAN",
-            "COLLECT_PAN": "VERIFICATION_DONE",
-            "VERIFICATION_DONE": "UNDERWRITING",
-            "UNDERWRITING": "DOCUMENT_REQUIRED",  # or SANCTION_READY
-            "DOCUMENT_REQUIRED": "SANCTION_READY"
-        }
-        
-        return flow.get(current_stage, current_stage)
+
+
+# Stateless; one instance serves every session
+resources.register("master_agent", MasterAgent)
 
 
 EXPLANATION_PERSONA = """You are Agent Finn, a friendly loan advisor."""
\ No newline at end of file
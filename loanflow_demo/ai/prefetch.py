@@ -0,0 +1,94 @@
+# ai/prefetch.py
+"""
+Speculative prefetch of AI explanations.
+
+Underwriting rules are cheap and deterministic, so once the bureau data is
+in we already know whether the application will be rejected. The
+rejection explanation is requested in the background right then, and the
+underwriting step picks it up (or drops it) later. Results that arrive
+after the template text was shown replace it: the view polls for them
+while one is pending.
+"""
+
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from agents.underwriting_agent import run_underwriting, underwriting_inputs
+from ai import explain
+from ai.explain import polished_rejection
+from ai.prompts import rejection_prompt
+
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ai-prefetch")
+
+_stats = {"started": 0, "used": 0, "discarded": 0, "missed": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def prefetch_stats():
+    with _stats_lock:
+        return dict(_stats)
+
+
+def start_prefetch(key, fn, *args):
+    """Submit fn(*args) in the background; returns a handle for poll/discard."""
+    _count("started")
+    # Run in a copy of the caller's context so trace spans stay under the application
+    return {"key": key, "future": _executor.submit(contextvars.copy_context().run, fn, *args)}
+
+
+def prefetch_ready(handle):
+    """True once a prefetched call has finished (successfully or not)."""
+    return bool(handle) and handle["future"].done()
+
+
+def poll_prefetched(handle):
+    """Non-blocking: the result if the call has finished, else None."""
+    if not prefetch_ready(handle):
+        return None
+
+    try:
+        result = handle["future"].result()
+    except Exception:
+        _count("missed")
+        return None
+
+    _count("used" if result is not None else "missed")
+    return result
+
+
+def discard_prefetch(handle):
+    """Drop an unused prefetch (cancelled if it hasn't started yet)."""
+    if handle:
+        handle["future"].cancel()
+        _count("discarded")
+
+
+def prefetch_rejection_explanation(app_data):
+    """
+    Predict the underwriting decision and, if it is a rejection, start the
+    LLM explanation request. Returns a handle or None (also when LLM polish
+    is off: the template explanation needs no prefetch).
+    """
+    if not explain.LLM_POLISH:
+        return None
+
+    uw_result = run_underwriting(**underwriting_inputs(app_data))
+    if uw_result["decision"] != "REJECTED":
+        return None
+
+    # Same fields the underwriting step will have when it shows the text;
+    # the result is None on LLM fallback so its (reason-specific) template stays
+    snapshot = {**app_data, **uw_result}
+    return start_prefetch(rejection_prefetch_key(snapshot), polished_rejection, snapshot)
+
+
+def rejection_prefetch_key(app_data):
+    """Inputs the rejection explanation depends on (its prompt)."""
+    return rejection_prompt(app_data)["prompt"]
@@ -0,0 +1,203 @@
+# ai/prompts.py
+"""
+Prompt builder with compaction and per-use-case token budgets.
+
+Every prompt is built as: one task line, one compact "facts" line and a
+few short rules, under a single shared system prefix (sent as the system
+message, so it is identical across calls). Token counts are estimated
+locally (~4 characters per token) and recorded per use case.
+"""
+
+import math
+import re
+import textwrap
+import threading
+
+from core.utils import LOAN_TYPES
+
+
+SYSTEM_PREFIX = (
+    "You are Agent Finn, a friendly, professional loan advisor at LoanFlow. "
+    "Use simple English and stay concise."
+)
+
+# Per-use-case budgets in tokens (input includes the system prefix)
+BUDGETS = {
+    "loan_purpose": {"input": 160, "output": 120},
+    "rejection": {"input": 220, "output": 160},
+    "underwriting": {"input": 220, "output": 180},
+    "cibil": {"input": 180, "output": 160},
+    "default": {"input": 1000, "output": 250},
+}
+
+_SPACES_RE = re.compile(r"[ \t]+")
+_BLANK_LINES_RE = re.compile(r"\n\s*\n+")
+
+
+def compact(text):
+    """Dedent, trim and collapse whitespace; keeps single line breaks."""
+    text = textwrap.dedent(text).strip()
+    text = _SPACES_RE.sub(" ", text)
+    text = _BLANK_LINES_RE.sub("\n", text)
+    return "\n".join(line.strip() for line in text.split("\n"))
+
+
+def estimate_tokens(text):
+    """Cheap local token estimate (~4 chars per token)."""
+    return math.ceil(len(text or "") / 4)
+
+
+def _render(task, fields, rules):
+    lines = [task]
+    if fields:
+        lines.append("Facts: " + "; ".join(f"{k}: {v}" for k, v in fields.items()))
+    if rules:
+        lines.append("Rules: " + " ".join(f"{i}) {r}" for i, r in enumerate(rules, 1)))
+    return compact("\n".join(lines))
+
+
+def build_prompt(use_case, task, fields=None, rules=None, free_text=None):
+    """
+    Build a compact prompt within the use case's input budget.
+
+    free_text names the field holding user-typed text; it is trimmed first
+    when the prompt is over budget. Returns
+    {"use_case", "prompt", "max_tokens", "input_tokens"}.
+    """
+    budget = BUDGETS.get(use_case, BUDGETS["default"])
+    fields = dict(fields or {})
+    limit = budget["input"] - estimate_tokens(SYSTEM_PREFIX)
+
+    prompt = _render(task, fields, rules)
+    over = estimate_tokens(prompt) - limit
+
+    if over > 0:
+        _count_truncation(use_case)
+        if free_text and free_text in fields:
+            value = str(fields[free_text])
+            fields[free_text] = value[:max(0, len(value) - over * 4 - 3)] + "..."
+            prompt = _render(task, fields, rules)
+        prompt = prompt[:limit * 4]
+
+    return {
+        "use_case": use_case,
+        "prompt": prompt,
+        "max_tokens": budget["output"],
+        "input_tokens": estimate_tokens(SYSTEM_PREFIX) + estimate_tokens(prompt),
+    }
+
+
+# ========================================
+# USE-CASE PROMPTS
+# ========================================
+
+def loan_purpose_prompt(purpose):
+    types = ", ".join(LOAN_TYPES)
+    return build_prompt(
+        "loan_purpose",
+        f"Recommend the best loan type ({types}) for this customer's purpose.",
+        {"Purpose": purpose},
+        [
+            "One short sentence on why it fits.",
+            "1-2 short key benefits.",
+            "Readable, conversational format.",
+            "End with: RECOMMENDED: <LoanType>",
+        ],
+        free_text="Purpose",
+    )
+
+
+def rejection_prompt(app_data):
+    return build_prompt(
+        "rejection",
+        "The customer's loan was rejected. Explain why, supportively.",
+        {
+            "Loan": f"₹{app_data['loan_amount']:,}",
+            "Tenure": f"{app_data['tenure']} months",
+            "Credit score": app_data["credit_score"],
+            "Income": f"₹{app_data['monthly_salary']:,}/month",
+            "Existing EMI": f"₹{app_data['existing_emi']:,}",
+            "Pre-approved limit": f"₹{app_data['pre_approved_limit']:,}",
+        },
+        [
+            "2-3 empathetic sentences.",
+            "Name the specific reasons (credit score, FOIR, pre-approved limit).",
+            "Give actionable ways to improve.",
+            "Under 100 words.",
+        ],
+    )
+
+
+def underwriting_prompt(uw_result, app_data):
+    return build_prompt(
+        "underwriting",
+        "Explain this underwriting result.",
+        {
+            "Decision": uw_result.get("decision"),
+            "Reason": uw_result.get("reason"),
+            "Loan": f"₹{app_data.get('loan_amount')}",
+            "Tenure": f"{app_data.get('tenure')} months",
+            "EMI": f"₹{uw_result.get('emi')}",
+            "Rate": f"{uw_result.get('interest_rate')}%",
+            "FOIR": f"{uw_result.get('foir')}%",
+            "Income": f"₹{app_data.get('income')}",
+        },
+        [
+            "Why this decision was made.",
+            "What FOIR means here.",
+            "Whether eligibility can improve.",
+            "Short and friendly.",
+        ],
+    )
+
+
+def cibil_prompt(cibil_data):
+    return build_prompt(
+        "cibil",
+        "Explain the customer's CIBIL health.",
+        {
+            "Score": cibil_data.get("credit_score"),
+            "Accounts": cibil_data.get("total_accounts"),
+            "Active": cibil_data.get("active_accounts"),
+            "Closed": cibil_data.get("closed_accounts"),
+            "Payment history": cibil_data.get("payment_history"),
+        },
+        [
+            "Is the score good or bad.",
+            "What the account history indicates.",
+            "Is the payment pattern healthy.",
+        ],
+    )
+
+
+# ========================================
+# TOKEN COUNTERS
+# ========================================
+
+_usage = {}
+_usage_lock = threading.Lock()
+
+
+def _entry(use_case):
+    return _usage.setdefault(use_case, {"calls": 0, "input_tokens": 0, "output_tokens": 0, "truncated": 0})
+
+
+def _count_truncation(use_case):
+    with _usage_lock:
+        _entry(use_case)["truncated"] += 1
+
+
+def record_usage(use_case, prompt, output_text):
+    """Record estimated tokens for one completed call."""
+    input_tokens = estimate_tokens(SYSTEM_PREFIX) + estimate_tokens(prompt)
+    with _usage_lock:
+        entry = _entry(use_case or "default")
+        entry["calls"] += 1
+        entry["input_tokens"] += input_tokens
+        entry["output_tokens"] += estimate_tokens(output_text)
+
+
+def token_usage():
+    """Per-use-case call and token counters."""
+    with _usage_lock:
+        return {k: dict(v) for k, v in _usage.items()}
@@ -0,0 +1,141 @@
+# ai/resilience.py
+"""
+Circuit breaker and latency tracking for upstream LLM calls.
+
+The breaker is process-wide: once Groq fails FAILURE_THRESHOLD times in a
+row every session gets the fallback immediately, until a half-open probe
+after RESET_TIMEOUT succeeds.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+
+FAILURE_THRESHOLD = int(os.getenv("GROQ_BREAKER_FAILURES", "5"))
+RESET_TIMEOUT = float(os.getenv("GROQ_BREAKER_RESET_SECONDS", "30"))
+
+
+class CircuitBreaker:
+    """
+    closed → (N consecutive failures) → open → (reset timeout) → half_open
+    half_open → (probe succeeds) → closed | (probe fails) → open
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT, half_open_max_calls=1):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+        self.stats = {"successes": 0, "failures": 0, "short_circuited": 0, "trips": 0}
+
+    def allow(self):
+        """True if a call may go upstream now."""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    self.stats["short_circuited"] += 1
+                    return False
+                self.state = self.HALF_OPEN
+                self._probes = 0
+
+            if self.state == self.HALF_OPEN:
+                if self._probes >= self.half_open_max_calls:
+                    self.stats["short_circuited"] += 1
+                    return False
+                self._probes += 1
+
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.stats["successes"] += 1
+            self.consecutive_failures = 0
+            self.state = self.CLOSED
+
+    def release(self):
+        """Give back a half-open probe slot for a call that ended with no result (e.g. an abandoned stream)."""
+        with self._lock:
+            if self.state == self.HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def record_failure(self):
+        with self._lock:
+            self.stats["failures"] += 1
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.stats["trips"] += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, state=self.state, consecutive_failures=self.consecutive_failures)
+
+
+class LatencyTracker:
+    """Rolling window of call latencies (seconds)."""
+
+    def __init__(self, window=200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+            self.total += seconds
+
+    def percentile(self, pct):
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(pct / 100.0 * len(ordered)))]
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "total_seconds": round(self.total, 4),
+            "p50_seconds": self.percentile(50),
+            "p95_seconds": self.percentile(95),
+            "p99_seconds": self.percentile(99),
+        }
+
+
+breaker = CircuitBreaker()
+latency = LatencyTracker()
+first_token = LatencyTracker()
+counters = {"deadline_exceeded": 0, "hedged": 0, "hedge_wins": 0}
+_counters_lock = threading.Lock()
+
+
+def count(name):
+    with _counters_lock:
+        counters[name] += 1
+
+
+def resilience_metrics():
+    """Breaker state, call timings and deadline/hedge counters for export."""
+    with _counters_lock:
+        calls = dict(counters)
+    return {
+        "breaker": breaker.snapshot(),
+        "latency": latency.snapshot(),
+        "first_token": first_token.snapshot(),
+        "calls": calls
+    }
@@ -0,0 +1,222 @@
+# ai/templates.py
+"""
+Local explanation engine.
+
+Underwriting and CIBIL outcomes fall into a handful of buckets
+(decision × reason × score band × FOIR band). Each bucket's text is
+assembled once at import into a format string, so an explanation is a
+dict lookup plus str.format — no LLM round-trip.
+"""
+
+from itertools import product
+
+
+# ========================================
+# BUCKETING
+# ========================================
+
+def score_band(score):
+    if score is None:
+        return "unknown"
+    if score >= 750:
+        return "excellent"
+    if score >= 700:
+        return "good"
+    if score >= 650:
+        return "fair"
+    return "poor"
+
+
+def foir_band(foir):
+    if foir is None:
+        return "unknown"
+    if foir <= 35:
+        return "healthy"
+    if foir <= 50:
+        return "moderate"
+    return "high"
+
+
+def reason_kind(reason):
+    reason = (reason or "").lower()
+    if "credit score" in reason:
+        return "low_score"
+    if "2×" in reason and "exceeds" in reason and "≤" not in reason:
+        return "over_limit"
+    if "exceeds" in reason:
+        return "above_limit"
+    if "within" in reason:
+        return "within_limit"
+    return "other"
+
+
+def history_band(payment_history):
+    codes = [c.strip() for c in (payment_history or "").split(",") if c.strip()]
+    late = [c for c in codes if c != "000"]
+    if not late:
+        return "clean"
+    if all(c == "030" for c in late) and len(late) <= 1:
+        return "minor"
+    return "serious"
+
+
+# ========================================
+# UNDERWRITING TEMPLATES
+# ========================================
+
+DECISION_TEXT = {
+    ("APPROVED", "within_limit"): (
+        "Good news, your loan of ₹{loan_amount:,} is approved. It sits within your "
+        "pre-approved limit, so no extra documents are needed."
+    ),
+    ("NEED_SALARY_SLIP", "above_limit"): (
+        "Your loan of ₹{loan_amount:,} is above your pre-approved limit but within twice "
+        "that limit, so we just need your salary slip to confirm your income."
+    ),
+    ("REJECTED", "low_score"): (
+        "We couldn't approve this loan because your credit score of {credit_score} is "
+        "below our minimum of 700."
+    ),
+    ("REJECTED", "over_limit"): (
+        "We couldn't approve ₹{loan_amount:,} because it is more than twice your "
+        "pre-approved limit."
+    ),
+}
+
+DEFAULT_DECISION_TEXT = {
+    "APPROVED": "Good news, your loan of ₹{loan_amount:,} is approved.",
+    "NEED_SALARY_SLIP": "Your loan of ₹{loan_amount:,} needs a quick income check before approval.",
+    "REJECTED": "We couldn't approve your loan of ₹{loan_amount:,} at this time.",
+}
+
+SCORE_TEXT = {
+    "excellent": "Your credit score of {credit_score} is excellent.",
+    "good": "Your credit score of {credit_score} is good.",
+    "fair": "Your credit score of {credit_score} is fair and has room to improve.",
+    "poor": "Your credit score of {credit_score} needs improvement.",
+    "unknown": "",
+}
+
+FOIR_TEXT = {
+    "healthy": (
+        "Your FOIR is {foir}%, meaning EMIs take a comfortable share of your "
+        "₹{income:,} monthly income."
+    ),
+    "moderate": (
+        "Your FOIR is {foir}%, so EMIs already use a fair part of your "
+        "₹{income:,} monthly income; we cap this at 50%."
+    ),
+    "high": (
+        "Your FOIR is {foir}%, which is above our 50% cap for your "
+        "₹{income:,} monthly income."
+    ),
+    "unknown": "",
+}
+
+EMI_TEXT = "The EMI would be ₹{emi:,} for {tenure} months at {interest_rate}% p.a."
+
+IMPROVE_TEXT = {
+    "low_score": "Paying every EMI and card bill on time for the next few months is the fastest way to lift your score.",
+    "over_limit": "Applying for a lower amount (up to twice your pre-approved limit) or a longer tenure would improve eligibility.",
+    "above_limit": "",
+    "within_limit": "",
+    "other": "Reducing existing EMIs or applying for a lower amount would improve eligibility.",
+}
+
+HIGH_FOIR_TIP = "Closing or prepaying an existing loan would bring your FOIR down."
+
+
+def _underwriting_template(decision, reason, score, foir):
+    parts = [DECISION_TEXT.get((decision, reason), DEFAULT_DECISION_TEXT.get(decision, DEFAULT_DECISION_TEXT["REJECTED"]))]
+
+    if reason != "low_score":
+        parts.append(SCORE_TEXT[score])
+    if decision != "REJECTED" or reason != "low_score":
+        parts.append(FOIR_TEXT[foir])
+
+    if decision == "REJECTED":
+        parts.append(IMPROVE_TEXT[reason])
+        if foir == "high":
+            parts.append(HIGH_FOIR_TIP)
+
+    return " ".join(p for p in parts if p)
+
+
+UNDERWRITING_TEMPLATES = {
+    key: _underwriting_template(*key)
+    for key in product(
+        ["APPROVED", "NEED_SALARY_SLIP", "REJECTED"],
+        ["low_score", "over_limit", "above_limit", "within_limit", "other"],
+        ["excellent", "good", "fair", "poor", "unknown"],
+        ["healthy", "moderate", "high", "unknown"],
+    )
+}
+
+
+def underwriting_bucket(uw_result, app_data):
+    return (
+        uw_result.get("decision") or "REJECTED",
+        reason_kind(uw_result.get("reason")),
+        score_band(app_data.get("credit_score")),
+        foir_band(uw_result.get("foir")),
+    )
+
+
+def underwriting_explanation(uw_result, app_data):
+    """Instant explanation of an underwriting result."""
+    bucket = underwriting_bucket(uw_result, app_data)
+    template = UNDERWRITING_TEMPLATES.get(bucket) or _underwriting_template(*bucket)
+
+    text = template.format(
+        loan_amount=app_data.get("loan_amount") or 0,
+        credit_score=app_data.get("credit_score"),
+        foir=uw_result.get("foir"),
+        income=app_data.get("income") or app_data.get("monthly_salary") or 0,
+    )
+
+    if uw_result.get("emi") and uw_result.get("decision") != "REJECTED":
+        text += " " + EMI_TEXT.format(
+            emi=uw_result["emi"],
+            tenure=app_data.get("tenure"),
+            interest_rate=uw_result.get("interest_rate"),
+        )
+    return text
+
+
+# ========================================
+# CIBIL TEMPLATES
+# ========================================
+
+CIBIL_SCORE_TEXT = {
+    "excellent": "Your credit score of {credit_score} is excellent; lenders see you as a low-risk borrower.",
+    "good": "Your credit score of {credit_score} is good and meets our approval threshold.",
+    "fair": "Your credit score of {credit_score} is fair; it is just below our 700 approval threshold.",
+    "poor": "Your credit score of {credit_score} is low, which limits approvals right now.",
+    "unknown": "We couldn't read a credit score from your report.",
+}
+
+CIBIL_HISTORY_TEXT = {
+    "clean": "Every payment in the last six months was on time, which is a healthy pattern.",
+    "minor": "There is one payment that was 30 days late recently; staying on time will fix this quickly.",
+    "serious": "Several recent payments were late, which weighs on your score; clearing dues is the priority.",
+}
+
+CIBIL_ACCOUNTS_TEXT = (
+    "You have {total_accounts} accounts: {active_accounts} active and {closed_accounts} closed."
+)
+
+CIBIL_TEMPLATES = {
+    (score, history): " ".join([CIBIL_SCORE_TEXT[score], CIBIL_ACCOUNTS_TEXT, CIBIL_HISTORY_TEXT[history]])
+    for score, history in product(CIBIL_SCORE_TEXT, CIBIL_HISTORY_TEXT)
+}
+
+
+def cibil_explanation(cibil_data):
+    """Instant explanation of CIBIL report fields."""
+    bucket = (score_band(cibil_data.get("credit_score")), history_band(cibil_data.get("payment_history")))
+    return CIBIL_TEMPLATES[bucket].format(
+        credit_score=cibil_data.get("credit_score"),
+        total_accounts=cibil_data.get("total_accounts", 0),
+        active_accounts=cibil_data.get("active_accounts", 0),
+        closed_accounts=cibil_data.get("closed_accounts", 0),
+    )
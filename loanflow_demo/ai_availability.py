@@ -1,6 +1,7 @@
 import os
 from groq import Groq
 # Load API key from environment variable
+# (set GROQ_BASE_URL to list models from the local stand-in: python -m tools.llm_standin)
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 if not GROQ_API_KEY:
     raise ValueError("GROQ_API_KEY environment variable is not set. Please set it before running this script.")
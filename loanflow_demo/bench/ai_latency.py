@@ -0,0 +1,136 @@
+# bench/ai_latency.py
+"""
+Latency/throughput benchmark for the AI layer against the local stand-in.
+
+Drives get_llama_response, explain_underwriting and explain_cibil at the
+given concurrency levels and reports p50/p95/p99 latency and throughput.
+
+    python -m bench.ai_latency --concurrency 1 4 16 --requests 64
+    python -m bench.ai_latency --base-url http://127.0.0.1:8787   # external stand-in
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from tools.llm_standin import add_config_args, config_from_args, start_server
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of an unsorted list."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(name, concurrency, latencies, wall):
+    return {
+        "target": name,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+    }
+
+
+def build_targets(distinct):
+    # Imported late: the AI modules read GROQ_* env vars at import time
+    from ai.groq_client import get_llama_response
+    from ai.explain import explain_underwriting, explain_cibil
+
+    def vary(i):
+        # Distinct inputs defeat in-flight coalescing unless --identical
+        return i if distinct else 0
+
+    return {
+        "get_llama_response": lambda i: get_llama_response(
+            f"A customer wants a loan for: request {vary(i)}. End with RECOMMENDED: <LoanType>"
+        ),
+        "explain_underwriting": lambda i: explain_underwriting(
+            {"decision": "REJECTED", "reason": "Loan exceeds 2× pre-approved limit",
+             "emi": 16607.15, "interest_rate": 12.0, "foir": 25.42},
+            {"loan_amount": 500000 + vary(i), "tenure": 36, "income": 85000}
+        ),
+        "explain_cibil": lambda i: explain_cibil(
+            {"credit_score": 700 + vary(i) % 100, "total_accounts": 4, "active_accounts": 3,
+             "closed_accounts": 1, "payment_history": "000,000,000,000,000,000"}
+        ),
+    }
+
+
+def run_level(fn, concurrency, requests):
+    def timed(i):
+        start = time.perf_counter()
+        fn(i)
+        return time.perf_counter() - start
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed, range(requests)))
+    return latencies, time.perf_counter() - wall_start
+
+
+def print_table(rows):
+    header = f"{'target':<22}{'conc':>6}{'reqs':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(f"{r['target']:<22}{r['concurrency']:>6}{r['requests']:>7}"
+              f"{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['throughput_rps']:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the AI layer against the local LLM stand-in")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=48, help="Requests per target per level")
+    parser.add_argument("--targets", nargs="+",
+                        choices=["get_llama_response", "explain_underwriting", "explain_cibil"])
+    parser.add_argument("--identical", action="store_true", help="Send identical prompts (measures coalescing)")
+    parser.add_argument("--rpm", type=float, default=0, help="Client rate limit (0 = unlimited)")
+    parser.add_argument("--base-url", help="Use an already running stand-in instead of starting one")
+    parser.add_argument("--json", help="Write results to this file")
+    add_config_args(parser)
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server, base_url = start_server(config_from_args(args))
+
+    os.environ["GROQ_BASE_URL"] = base_url
+    os.environ.setdefault("GROQ_API_KEY", "standin")
+    os.environ["GROQ_REQUESTS_PER_MINUTE"] = str(args.rpm)
+    os.environ["GROQ_MAX_CONCURRENCY"] = str(max(args.concurrency))
+    os.environ["LOANFLOW_LLM_POLISH"] = "1"  # explain_* use templates otherwise
+
+    targets = build_targets(distinct=not args.identical)
+    selected = args.targets or list(targets)
+
+    print(f"🧪 Stand-in: {base_url}\n")
+    rows = []
+    try:
+        for name in selected:
+            for level in args.concurrency:
+                latencies, wall = run_level(targets[name], level, args.requests)
+                rows.append(summarize(name, level, latencies, wall))
+    finally:
+        if server:
+            server.shutdown()
+
+    print_table(rows)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+        print(f"\n📁 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
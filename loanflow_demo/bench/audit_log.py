@@ -0,0 +1,88 @@
+# bench/audit_log.py
+"""
+Cost of one audit log call on the request thread.
+
+"open-per-call" is the old log_event: open conversation_logs.txt in append
+mode, write one line, close. "buffered" is core.audit: queue the event
+and let the background writer batch it. Reports p50/p99 per call and the
+time until everything is on disk, for each fsync policy.
+
+    python -m bench.audit_log
+    python -m bench.audit_log --events 50000 --fsync never batch
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from bench.ai_latency import percentile
+from core.audit import AuditLogger, RotatingLogFile, FSYNC_POLICIES
+
+
+CONTENT = "I need ₹5,00,000 for 36 months (EMI: ₹16,726.81)"
+
+
+def open_per_call(path, level, role, content):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(f"[{timestamp}] [{level}] {role}: {content}\n")
+
+
+def timed_calls(fn, events):
+    samples = []
+    for i in range(events):
+        start = time.perf_counter()
+        fn("INFO", "USER", CONTENT)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def row(name, samples, total):
+    return {
+        "logger": name,
+        "events": len(samples),
+        "p50_us": round(percentile(samples, 50) * 1e6, 2),
+        "p99_us": round(percentile(samples, 99) * 1e6, 2),
+        "total_ms": round(total * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit log cost per call")
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--fsync", nargs="+", choices=FSYNC_POLICIES, default=["never", "rotate"])
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-audit-")
+    results = []
+
+    path = os.path.join(workdir, "open_per_call.txt")
+    start = time.perf_counter()
+    samples = timed_calls(lambda *e: open_per_call(path, *e), args.events)
+    results.append(row("open-per-call", samples, time.perf_counter() - start))
+
+    for policy in args.fsync:
+        logger = AuditLogger(RotatingLogFile(os.path.join(workdir, f"buffered_{policy}.txt"), fsync=policy))
+        start = time.perf_counter()
+        samples = timed_calls(logger.log, args.events)
+        logger.close()  # "total" includes getting every line on disk
+        results.append(row(f"buffered ({policy})", samples, time.perf_counter() - start))
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+
+    print(f"Audit log cost per call ({args.events:,} events)\n")
+    print(f"{'logger':<20}{'p50 us':>10}{'p99 us':>10}{'total ms':>11}")
+    for r in results:
+        print(f"{r['logger']:<20}{r['p50_us']:>10.2f}{r['p99_us']:>10.2f}{r['total_ms']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
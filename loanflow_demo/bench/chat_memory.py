@@ -0,0 +1,128 @@
+# bench/chat_memory.py
+"""
+Per-session chat history memory: legacy dicts vs ChatHistory records.
+
+Builds the same realistic conversation (greeting, bureau report, decision
+badge, explanations, sanction letter) N times in one session, once as the
+old list of dicts with datetimes and once as a ChatHistory, and reports
+retained bytes measured with tracemalloc plus ChatHistory's own usage
+report (live / spilled / compressed entries).
+
+    python -m bench.chat_memory
+    python -m bench.chat_memory --journeys 1 10 50 --max-bytes 65536
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+from agents.verification_agent import verify_pan
+from core.chat_history import ChatHistory, ChatRecord
+
+
+BADGE = """
+            <div style='background: rgba(239, 68, 68, 0.2);
+                        padding: 20px; border-radius: 12px;
+                        border: 2px solid #ef4444;
+                        box-shadow: 0 4px 15px rgba(0,0,0,0.2);'>
+                <div style='color: #ef4444; font-size: 1.3em; font-weight: 800;
+                            display: flex; align-items: center; gap: 10px;'>
+                    ❌ Underwriting Decision: REJECTED
+                </div>
+            </div>
+            """
+
+
+def journey():
+    """(type, role, content, extra) tuples for one application."""
+    _, report = verify_pan("ABCDE1234F")
+    return [
+        ("message", "agent", "👋 Hi, I'm Mr. Finn, your personal loan assistant! " * 4, None),
+        ("message", "user", "yes", None),
+        ("message", "user", "I want to renovate my kitchen", None),
+        ("message", "agent", "A Home Loan fits renovation well. RECOMMENDED: Home " * 3, None),
+        ("message", "user", "PAN: ABCDE1234F", None),
+        ("message", "system", "✅ Verification Successful\n\nWelcome, **Rohit Sharma**! " * 3, None),
+        ("report", None, report, True),
+        ("message", "system", BADGE, None),
+        ("message", "agent", "We couldn't approve ₹1,500,000 because it is more than twice your limit. " * 3, None),
+        ("sanction", None, "SANCTION LETTER\n" + "Terms and conditions apply. " * 120, None),
+    ]
+
+
+def _entries(one, journeys):
+    # Content is built here so each history pays for its own strings
+    for i in range(journeys):
+        for type_, role, content, extra in one:
+            yield type_, role, f"{content} #{i}", extra
+
+
+def build_legacy(one, journeys):
+    history = []
+    for type_, role, content, extra in _entries(one, journeys):
+        msg = {"type": type_, "content": content, "timestamp": datetime.now()}
+        if role:
+            msg["role"] = role
+        if extra:
+            msg["download_data"] = True
+        history.append(msg)
+    return history
+
+
+def build_records(one, journeys, max_bytes, spill_dir):
+    history = ChatHistory(f"bench-chat-memory-{journeys}", max_bytes=max_bytes, spill_dir=spill_dir)
+    for type_, role, content, extra in _entries(one, journeys):
+        history.append(ChatRecord(type_, role=role, content=content, download=bool(extra)))
+    return history
+
+
+def retained(build, *args):
+    """Bytes still allocated after build(*args) returns (result kept alive)."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = build(*args)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return result, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chat history memory per session")
+    parser.add_argument("--journeys", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--max-bytes", type=int, default=256 * 1024, help="ChatHistory memory cap")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    spill_dir = tempfile.mkdtemp(prefix="chat-memory-")
+    one = journey()
+    results = []
+
+    for n in args.journeys:
+        _, legacy_bytes = retained(build_legacy, one, n)
+        history, record_bytes = retained(build_records, one, n, args.max_bytes, spill_dir)
+        results.append({
+            "journeys": n,
+            "entries": len(history),
+            "legacy_bytes": legacy_bytes,
+            "record_bytes": record_bytes,
+            **{k: v for k, v in history.memory_usage().items() if k in ("live", "spilled", "compressed")},
+        })
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+
+    print(f"Chat history memory per session (cap {args.max_bytes:,} bytes)\n")
+    print(f"{'journeys':>9}{'entries':>9}{'legacy KB':>11}{'records KB':>12}{'live':>7}{'spilled':>9}{'compressed':>12}")
+    for r in results:
+        print(f"{r['journeys']:>9}{r['entries']:>9}{r['legacy_bytes'] / 1024:>11.1f}"
+              f"{r['record_bytes'] / 1024:>12.1f}{r['live']:>7}{r['spilled']:>9}{r['compressed']:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# bench/chat_render.py
+"""
+Rerun cost of the chat history renderer against conversation length.
+
+Each history length is rendered in Streamlit's AppTest harness twice:
+"full" emits every entry (the old renderer's behaviour), "windowed" uses
+the default window. Reported times are the median of --repeat reruns of
+an already-warm session, i.e. what a user pays on every interaction.
+
+    python -m bench.chat_render
+    python -m bench.chat_render --lengths 10 100 1000 --repeat 7
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from theme.history import HISTORY_WINDOW
+
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _script(length, window, app_dir):
+    import sys
+
+    sys.path.insert(0, app_dir)
+
+    import streamlit as st
+    from core.chat_history import ChatHistory, ChatRecord
+    from theme.history import render_chat_history
+
+    if "chat_history" not in st.session_state:
+        history = ChatHistory("bench-chat-render")
+        for i in range(length):
+            if i % 25 == 24:
+                history.append(ChatRecord.report("CIBIL REPORT\n" * 40))
+            else:
+                role = ["user", "agent", "system"][i % 3]
+                history.append(ChatRecord.message(role, f"Message {i}: " + "lorem ipsum " * 20))
+        st.session_state.chat_history = history
+
+    render_chat_history(st.session_state.chat_history, "LF000000", window=window)
+
+
+def measure(length, window, repeat):
+    """Median rerun seconds and emitted element count for one configuration."""
+    at = AppTest.from_function(_script, args=(length, window, APP_DIR), default_timeout=120)
+    at.run()
+
+    times = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - start)
+
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+    elements = len(at.markdown) + len(at.expander) + len(at.get("download_button")) + len(at.button)
+    return statistics.median(times), elements
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chat history rerun time vs history length")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 50, 200, 1000])
+    parser.add_argument("--window", type=int, default=HISTORY_WINDOW)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    for length in args.lengths:
+        full_s, full_n = measure(length, length, args.repeat)
+        win_s, win_n = measure(length, args.window, args.repeat)
+        results.append({
+            "messages": length,
+            "full_ms": round(full_s * 1000, 2),
+            "full_elements": full_n,
+            "windowed_ms": round(win_s * 1000, 2),
+            "windowed_elements": win_n,
+        })
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+
+    print(f"Chat history rerun time (window={args.window}, median of {args.repeat})\n")
+    print(f"{'messages':>9}{'full ms':>10}{'elements':>10}{'windowed ms':>13}{'elements':>10}{'speedup':>9}")
+    for r in results:
+        speedup = r["full_ms"] / r["windowed_ms"] if r["windowed_ms"] else 0
+        print(f"{r['messages']:>9}{r['full_ms']:>10.1f}{r['full_elements']:>10}"
+              f"{r['windowed_ms']:>13.1f}{r['windowed_elements']:>10}{speedup:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# bench/import_time.py
+"""
+Cold-start import benchmark for app.py.
+
+Runs app.py's top-level imports in a fresh interpreter under
+`python -X importtime`, reports the slowest modules, and fails when the
+total exceeds --max-ms or a deferred dependency (groq, reportlab, dotenv)
+is imported eagerly.
+
+    python -m bench.import_time
+    python -m bench.import_time --max-ms 1500 --top 15
+"""
+
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFERRED = ["groq", "reportlab", "dotenv"]
+
+
+def app_imports(path=os.path.join(APP_DIR, "app.py")):
+    """Top-level import statements of app.py, as source lines."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def measure(code):
+    """Return [(self_us, cumulative_us, module)] for one fresh interpreter."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=APP_DIR, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def top_level_total(rows):
+    # Top-level entries have no indentation in the module column
+    return sum(cum for _, cum, name in rows if not name.startswith("  "))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time report for app.py's cold start")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs; the fastest is reported")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list")
+    parser.add_argument("--max-ms", type=float, help="Fail if total import time exceeds this")
+    parser.add_argument("--allow-eager", action="store_true", help="Don't fail on eagerly imported deferred deps")
+    args = parser.parse_args()
+
+    code = "\n".join(app_imports())
+    runs = [measure(code) for _ in range(max(1, args.repeat))]
+    rows = min(runs, key=top_level_total)
+    total_ms = top_level_total(rows) / 1000
+
+    print(f"⏱️  app.py imports: {total_ms:.1f} ms (best of {len(runs)})\n")
+    print(f"{'cumulative ms':>14}{'self ms':>10}  module")
+    for self_us, cum_us, name in sorted(rows, key=lambda r: r[1], reverse=True)[:args.top]:
+        print(f"{cum_us / 1000:>14.1f}{self_us / 1000:>10.1f}  {name.strip()}")
+
+    loaded = {name.strip().split(".")[0] for _, _, name in rows}
+    eager = [dep for dep in DEFERRED if dep in loaded]
+
+    failed = False
+    if eager:
+        print(f"\n❌ Deferred dependencies imported at startup: {', '.join(eager)}")
+        failed = not args.allow_eager
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"\n❌ Import time {total_ms:.1f} ms exceeds budget of {args.max_ms:.1f} ms")
+        failed = True
+
+    if failed:
+        sys.exit(1)
+    print("\n✅ Cold-start import budget OK")
+
+
+if __name__ == "__main__":
+    main()
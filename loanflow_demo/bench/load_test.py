@@ -0,0 +1,309 @@
+# bench/load_test.py
+"""
+Concurrent-session load test of the full loan flow.
+
+Each virtual user drives app.py through Streamlit's AppTest harness, one
+complete journey after another: greeting → start → purpose → loan type →
+amount → PAN (verification + underwriting) → salary slip upload
+(document check + sanction letter). Users run on their own threads in one
+process, the way sessions share a Streamlit server. The bureau is the
+local mock; purposes go to the on-box classifier and polish is off, so
+the LLM is never called unless --standin starts the local stand-in and
+switches polish on.
+
+Reports, per concurrency level, p50/p95/p99 latency of every stage, script
+reruns per journey, and CPU time, resident memory and chat history bytes
+per session. "greeting" includes AppTest's own per-session setup, so it
+overstates what a browser session pays on connect.
+
+    python -m bench.load_test
+    python -m bench.load_test --users 1 8 32 --journeys 3
+    LOANFLOW_LATENCY_PROFILE=demo python -m bench.load_test --users 4
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import ScriptRunnerEvent
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+from bench.ai_latency import percentile
+
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+STAGES = ["greeting", "start", "purpose", "loan_type", "amount", "pan", "document"]
+
+# Over the mock bureau's pre-approved limit (₹4L) but within 2×: the salary
+# slip step runs before the sanction letter
+JOURNEY = {
+    "purpose": "wedding",
+    "loan_amount": 600000,
+    "tenure": 36,
+    "pan": "ABCDE1234F",
+}
+
+
+# ========================================
+# HARNESS
+# ========================================
+
+# AppTest is built for one session at a time. A server shares one runtime
+# and one compiled-script cache across sessions, so the load test does
+# the same: runtime lookups fall back to a shared mock (each run() clears
+# its own on exit), and app.py is compiled once for every session.
+_shared_runtime = None
+_shared_script_cache = None
+
+
+def _install_shared_runtime():
+    global _shared_runtime, _shared_script_cache
+    from unittest.mock import MagicMock
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.dataframe_source_manager import DataframeSourceManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    runtime.dataframe_source_mgr = DataframeSourceManager()
+    _shared_runtime = runtime
+
+    Runtime.instance = classmethod(lambda cls: cls._instance or _shared_runtime)
+    Runtime.exists = classmethod(lambda cls: True)
+
+    _shared_script_cache = ScriptCache()
+    compile_once = ScriptCache.get_bytecode
+    ScriptCache.get_bytecode = lambda self, path: compile_once(_shared_script_cache, path)
+
+    # Each run saves and restores this option; pinning it on means a
+    # restore on one thread never turns it off under another
+    st.config.set_option("global.appTest", True)
+
+
+# ========================================
+# RERUN COUNTING
+# ========================================
+
+# Script executions per AppTest session, st.rerun() included. AppTest
+# follows reruns inside one run() call, so they are counted from the
+# runner's SCRIPT_STARTED events.
+_script_runs = Counter()
+_script_runs_lock = threading.Lock()
+_original_run = LocalScriptRunner.run
+
+
+def _counting_run(self, *args, **kwargs):
+    try:
+        return _original_run(self, *args, **kwargs)
+    finally:
+        started = sum(1 for e in self.events if e == ScriptRunnerEvent.SCRIPT_STARTED)
+        with _script_runs_lock:
+            _script_runs[id(self.session_state)] += started
+
+
+LocalScriptRunner.run = _counting_run
+
+
+def script_runs(at):
+    return _script_runs[id(at._session_state)]
+
+
+# ========================================
+# VIRTUAL USER
+# ========================================
+
+def _settle(at):
+    """Rerun through automatic states (progress ticks when a latency profile is on)."""
+    from agents.workflow import INPUT_STATES, DONE
+    from core.latency import PROGRESS_TICK_SECONDS
+
+    while at.session_state.ctx.state not in INPUT_STATES and at.session_state.ctx.state != DONE:
+        time.sleep(PROGRESS_TICK_SECONDS)
+        at.run()
+    return at
+
+
+def journey():
+    """One complete application; returns ({stage: seconds}, AppTest)."""
+    timings = {}
+
+    def stage(name, action):
+        start = time.perf_counter()
+        at = _settle(action())
+        timings[name] = time.perf_counter() - start
+        if at.exception:
+            raise RuntimeError(f"{name}: {at.exception[0].message}")
+        return at
+
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    stage("greeting", at.run)
+    stage("start", lambda: at.chat_input[0].set_value("yes").run())
+    stage("purpose", lambda: at.chat_input[0].set_value(JOURNEY["purpose"]).run())
+    stage("loan_type", lambda: at.button[0].click().run())
+
+    at.number_input[0].set_value(JOURNEY["loan_amount"])
+    at.slider[0].set_value(JOURNEY["tenure"])
+    stage("amount", lambda: at.button[0].click().run())
+
+    at.text_input[0].set_value(JOURNEY["pan"]).run()
+    stage("pan", lambda: at.button[0].click().run())
+
+    at.file_uploader[0].upload("salary_slip.pdf", b"%PDF-1.4 salary slip", "application/pdf").run()
+    stage("document", lambda: at.button[0].click().run())
+
+    decision = at.session_state.ctx.app_data.get("decision")
+    if at.session_state.ctx.state != "done" or decision != "APPROVED":
+        raise RuntimeError(f"journey ended in {at.session_state.ctx.state} with {decision}")
+    return timings, at
+
+
+def virtual_user(journeys):
+    results = []
+    for _ in range(journeys):
+        try:
+            timings, at = journey()
+            results.append({"timings": timings, "reruns": script_runs(at), "at": at})
+        except Exception as e:
+            results.append({"error": str(e)})
+    return results
+
+
+# ========================================
+# MEASUREMENT
+# ========================================
+
+def rss_bytes():
+    """Current resident set size (Linux), else peak RSS."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_level(users, journeys):
+    from core.chat_history import memory_report
+
+    rss_before = rss_bytes()
+    cpu_before = time.process_time()
+    wall_start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        results = [r for user in pool.map(virtual_user, [journeys] * users) for r in user]
+
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_before
+    rss = rss_bytes() - rss_before  # sessions are still alive here
+
+    ok = [r for r in results if "timings" in r]
+    errors = [r["error"] for r in results if "error" in r]
+    sessions = max(1, len(results))
+
+    by_stage = defaultdict(list)
+    for r in ok:
+        for name, seconds in r["timings"].items():
+            by_stage[name].append(seconds)
+
+    chat_bytes = [u["bytes"] for u in memory_report()]
+    row = {
+        "users": users,
+        "journeys": len(results),
+        "errors": len(errors),
+        "wall_s": round(wall, 2),
+        "journeys_per_s": round(len(ok) / wall, 2) if wall else 0.0,
+        "reruns_per_journey": round(sum(r["reruns"] for r in ok) / max(1, len(ok)), 1),
+        "cpu_ms_per_session": round(cpu / sessions * 1000, 1),
+        "rss_kb_per_session": round(max(0, rss) / sessions / 1024, 1),
+        "chat_kb_per_session": round(sum(chat_bytes) / max(1, len(chat_bytes)) / 1024, 1),
+        "stages": {
+            name: {
+                "p50_ms": round(percentile(by_stage[name], 50) * 1000, 1),
+                "p95_ms": round(percentile(by_stage[name], 95) * 1000, 1),
+                "p99_ms": round(percentile(by_stage[name], 99) * 1000, 1),
+            }
+            for name in STAGES if by_stage[name]
+        },
+    }
+    if errors:
+        row["first_error"] = errors[0]
+
+    del results, ok  # release this level's sessions before the next one
+    return row
+
+
+def print_level(row):
+    print(f"\n👥 {row['users']} concurrent users, {row['journeys']} journeys, "
+          f"{row['errors']} errors, {row['wall_s']} s ({row['journeys_per_s']} journeys/s)")
+    print(f"   reruns/journey {row['reruns_per_journey']}  |  CPU {row['cpu_ms_per_session']} ms/session  |  "
+          f"RSS {row['rss_kb_per_session']} KB/session  |  chat {row['chat_kb_per_session']} KB/session")
+    if "first_error" in row:
+        print(f"   first error: {row['first_error']}")
+
+    header = f"   {'stage':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    print("   " + "-" * (len(header) - 3))
+    for name, s in row["stages"].items():
+        print(f"   {name:<12}{s['p50_ms']:>10}{s['p95_ms']:>10}{s['p99_ms']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test of the loan flow")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 4, 16], help="Concurrency levels")
+    parser.add_argument("--journeys", type=int, default=2, help="Complete journeys per user")
+    parser.add_argument("--standin", action="store_true",
+                        help="Start the local LLM stand-in and turn AI polish on")
+    parser.add_argument("--purpose", default=JOURNEY["purpose"],
+                        help="Loan purpose to send (an unusual one reaches the LLM)")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    JOURNEY["purpose"] = args.purpose
+
+    server = None
+    if args.standin:
+        from tools.llm_standin import start_server
+        server, base_url = start_server()
+        os.environ["GROQ_BASE_URL"] = base_url
+        os.environ.setdefault("GROQ_API_KEY", "standin")
+        os.environ["LOANFLOW_LLM_POLISH"] = "1"
+        print(f"🧪 Stand-in: {base_url}")
+
+    # Conversation logs and sanction PDFs stay out of the app directory
+    os.chdir(tempfile.mkdtemp(prefix="load-test-"))
+    sys.path.insert(0, os.path.dirname(APP_PATH))
+
+    _install_shared_runtime()
+
+    rows = []
+    try:
+        virtual_user(1)  # warm imports and caches; not measured
+        for users in args.users:
+            rows.append(run_level(users, args.journeys))
+            print_level(rows[-1])
+    finally:
+        if server:
+            server.shutdown()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+        print(f"\n📁 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# bench/page_bytes.py
+"""
+Bytes the app sends to the browser per rerun.
+
+Drives app.py through the first few chat turns in Streamlit's AppTest
+harness and sums the serialized size of every element emitted on each
+rerun, split into theme CSS, markdown/HTML and everything else. Point
+--app at another checkout's app.py to compare before/after (one app per
+process: both trees share module names).
+
+    python -m bench.page_bytes --static
+    python -m bench.page_bytes --app /tmp/old/loanflow_demo/app.py
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Chat inputs that walk the flow to the loan-type step
+TURNS = ["yes", "wedding"]
+
+
+def _elements(node):
+    proto = getattr(node, "proto", None)
+    if proto is not None and not getattr(node, "children", None):
+        yield node
+    for child in getattr(node, "children", {}).values():
+        yield from _elements(child)
+
+
+def page_bytes(at):
+    """{"total", "css", "markdown", "elements"} for the last rerun."""
+    totals = {"total": 0, "css": 0, "markdown": 0, "elements": 0}
+    for el in _elements(at._tree):
+        size = el.proto.ByteSize()
+        totals["total"] += size
+        totals["elements"] += 1
+        body = getattr(el.proto, "body", "")
+        if isinstance(body, str) and ("<style" in body or "stylesheet" in body):
+            totals["css"] += size
+        elif el.type == "markdown":
+            totals["markdown"] += size
+    return totals
+
+
+def measure(app_path, static=False):
+    app_path = os.path.abspath(app_path)
+    sys.path.insert(0, os.path.dirname(app_path))
+
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    st.config.set_option("server.enableStaticServing", static)
+
+    # Keep conversation logs out of the app directory
+    os.chdir(tempfile.mkdtemp(prefix="page-bytes-"))
+
+    at = AppTest.from_file(app_path, default_timeout=60).run()
+    results = [{"step": "greeting", **page_bytes(at)}]
+
+    at.run()
+    results.append({"step": "greeting (rerun)", **page_bytes(at)})
+
+    for text in TURNS:
+        at.chat_input[0].set_value(text).run()
+        results.append({"step": f"after '{text}'", **page_bytes(at)})
+
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes sent to the browser per rerun")
+    parser.add_argument("--app", default=os.path.join(APP_DIR, "app.py"))
+    parser.add_argument("--static", action="store_true", help="Measure with server.enableStaticServing on")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = measure(args.app, args.static)
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+
+    print(f"Bytes per rerun: {args.app} (static serving {'on' if args.static else 'off'})\n")
+    print(f"{'step':<20}{'total':>9}{'css':>9}{'markdown':>10}{'elements':>10}")
+    for r in results:
+        print(f"{r['step']:<20}{r['total']:>9,}{r['css']:>9,}{r['markdown']:>10,}{r['elements']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# bench/resources.py
+"""
+Shared resource registry: memory per session and first-request latency.
+
+Each mode runs in a fresh interpreter:
+
+- first request, "cold": nothing is built before the first application
+  arrives; its verification, sanction PDF and LLM client pay for the
+  bureau store, rate cards, master agent, PDF styles and Groq client.
+- first request, "warm": core.resources.warm_up() ran at server start.
+- memory, "shared": N sessions use the process-wide instances.
+- memory, "per-session": each session builds its own copies (what
+  per-session MasterAgents and per-call styles/clients amount to).
+
+Sessions run the headless workflow (agents/workflow.py). A dummy
+GROQ_API_KEY is set so the client is really constructed; no request is
+sent.
+
+    python -m bench.resources
+    python -m bench.resources --sessions 200 --json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WARM_UP_MODULES = ["core.pdf_generator"]
+SHARED = ["bureau_store", "rate_cards", "master_agent", "groq_client", "pdf_styles"]
+
+
+def first_request(warm):
+    from core import resources
+    from agents.workflow import WorkflowEngine, ApplicationContext, JOURNEY
+    from ai.groq_client import get_client
+
+    warm_up_ms = 0.0
+    if warm:
+        start = time.perf_counter()
+        resources.warm_up(modules=WARM_UP_MODULES)
+        warm_up_ms = (time.perf_counter() - start) * 1000
+
+    timings = {}
+    start = time.perf_counter()
+    ctx = WorkflowEngine().run(ApplicationContext(), JOURNEY)
+    timings["journey_ms"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    get_client()
+    timings["llm_client_ms"] = (time.perf_counter() - start) * 1000
+
+    assert ctx.done and ctx.app_data["decision"] == "APPROVED"
+    return {
+        "warm_up_ms": round(warm_up_ms, 2),
+        **{k: round(v, 2) for k, v in timings.items()},
+        "first_request_ms": round(sum(timings.values()), 2),
+    }
+
+
+def memory(sessions, per_session):
+    from core import resources
+    from agents.workflow import WorkflowEngine, ApplicationContext, JOURNEY
+    import core.pdf_generator  # noqa: F401  registers pdf_styles
+
+    engine = WorkflowEngine(sanction=lambda data: "SANCTION LETTER")
+    resources.warm_up(SHARED)  # the shared copies exist either way
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+
+    alive = []
+    for _ in range(sessions):
+        ctx = engine.run(ApplicationContext(), JOURNEY)
+        own = {name: resources.build(name) for name in SHARED} if per_session else None
+        alive.append((ctx, own))
+
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return {"sessions": sessions, "bytes_per_session": round(retained / sessions)}
+
+
+def _child(args):
+    if args.child == "first":
+        result = first_request(warm=args.warm)
+    else:
+        result = memory(args.sessions, per_session=args.per_session)
+    json.dump(result, sys.stdout)
+
+
+def _spawn(*flags):
+    env = {**os.environ, "GROQ_API_KEY": os.environ.get("GROQ_API_KEY", "bench-dummy-key")}
+    proc = subprocess.run(
+        [sys.executable, "-m", "bench.resources", *flags],
+        cwd=APP_DIR, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared resources: memory per session and first-request latency")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--child", choices=["first", "memory"], help=argparse.SUPPRESS)
+    parser.add_argument("--warm", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--per-session", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # Sanction PDFs land in ./output; keep them out of the app directory
+        os.chdir(tempfile.mkdtemp(prefix="bench-resources-"))
+        sys.path.insert(0, APP_DIR)
+        _child(args)
+        return
+
+    results = {
+        "first_request": {
+            "cold": _spawn("--child", "first"),
+            "warm": _spawn("--child", "first", "--warm"),
+        },
+        "memory": {
+            "per-session": _spawn("--child", "memory", "--per-session", "--sessions", str(args.sessions)),
+            "shared": _spawn("--child", "memory", "--sessions", str(args.sessions)),
+        },
+    }
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+
+    print("First request after server start\n")
+    print(f"{'mode':<8}{'warm-up ms':>12}{'journey ms':>12}{'LLM client ms':>15}{'first request ms':>18}")
+    for mode, r in results["first_request"].items():
+        print(f"{mode:<8}{r['warm_up_ms']:>12.1f}{r['journey_ms']:>12.1f}"
+              f"{r['llm_client_ms']:>15.1f}{r['first_request_ms']:>18.1f}")
+
+    print(f"\nRetained memory per session ({args.sessions} sessions)\n")
+    print(f"{'resources':<13}{'bytes/session':>15}")
+    for mode, r in results["memory"].items():
+        print(f"{mode:<13}{r['bytes_per_session']:>15,}")
+
+
+if __name__ == "__main__":
+    main()
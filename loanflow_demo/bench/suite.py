@@ -0,0 +1,307 @@
+# bench/suite.py
+"""
+Benchmark suite for the pricing, underwriting, bureau and PDF code paths,
+plus an end-to-end headless application journey.
+
+Each case runs at a single-call and a batch size. A size is timed in
+loops long enough to be measurable (like timeit's autorange), repeated
+--repeat times, and reported as microseconds per call: the best
+repetition (what comparisons use) and the median. Results can be saved
+as a JSON baseline and later compared against one; --compare exits 1 if
+any case is slower than the baseline by more than --threshold percent.
+
+    python -m bench.suite
+    python -m bench.suite --save                    # bench/baselines/baseline.json
+    python -m bench.suite --compare --threshold 20  # after a change
+    python -m bench.suite --only calculate_emi run_underwriting --repeat 9
+
+Baselines are machine-specific (bench/baselines/ is not committed): compare
+runs from the same, otherwise idle machine.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(APP_DIR, "bench", "baselines", "baseline.json")
+
+MIN_SAMPLE_SECONDS = 0.05
+
+# name -> (setup, sizes); setup() returns run(n), which makes n calls
+CASES = {}
+
+
+def case(name, sizes):
+    def register(setup):
+        CASES[name] = (setup, sizes)
+        return setup
+    return register
+
+
+# ========================================
+# CASES
+# ========================================
+
+BATCH = 1000
+
+
+@case("calculate_emi", (1, BATCH))
+def _emi():
+    from core.emi import calculate_emi
+
+    inputs = [(50000 + 5000 * i, 8.5 + (i % 40) * 0.25, 12 + i % 229) for i in range(BATCH)]
+
+    def run(n):
+        for principal, rate, tenure in inputs[:n]:
+            calculate_emi(principal, rate, tenure)
+    return run
+
+
+@case("calculate_base_interest_rate", (1, BATCH))
+def _interest():
+    from core.interest import calculate_base_interest_rate
+
+    purposes = ["Personal", "Home", "Education", "Business", "wedding"]
+    inputs = [
+        {
+            "tenure_months": 12 + i % 229,
+            "employment_type": "Self-Employed" if i % 3 else "Salaried",
+            "loan_purpose": purposes[i % len(purposes)],
+            "loan_amount": 50000 + 5000 * i,
+            "credit_score": 600 + i % 250,
+        }
+        for i in range(BATCH)
+    ]
+
+    def run(n):
+        for kwargs in inputs[:n]:
+            calculate_base_interest_rate(**kwargs)
+    return run
+
+
+@case("run_underwriting", (1, BATCH))
+def _underwriting():
+    from agents.underwriting_agent import run_underwriting
+
+    # Instant approval, salary slip and rejection tiers in turn
+    profiles = [
+        (300000, 780, 5000, 85000, 400000),
+        (600000, 780, 5000, 85000, 400000),
+        (500000, 640, 12000, 40000, 100000),
+    ]
+    inputs = [
+        {
+            "loan_amount": amount + 1000 * i,
+            "tenure": 12 + i % 229,
+            "credit_score": score,
+            "existing_emi": emi,
+            "income": income,
+            "employment_type": "Salaried",
+            "loan_purpose": "Personal",
+            "preapproved_limit": limit,
+        }
+        for i in range(BATCH)
+        for amount, score, emi, income, limit in [profiles[i % len(profiles)]]
+    ]
+
+    def run(n):
+        for kwargs in inputs[:n]:
+            run_underwriting(**kwargs)
+    return run
+
+
+@case("generate_cibil_report", (1, BATCH))
+def _cibil():
+    from core.mock_bureau import MOCK_PAN_DB, generate_cibil_report
+
+    profiles = list(MOCK_PAN_DB.values())
+    inputs = [profiles[i % len(profiles)] for i in range(BATCH)]
+
+    def run(n):
+        for bureau_data in inputs[:n]:
+            generate_cibil_report(bureau_data)
+    return run
+
+
+@case("generate_sanction_letter_pdf", (1, 20))
+def _pdf():
+    from core import pdf_generator
+
+    data = {
+        "Application ID": "LF123456", "Date": "19 October 2026", "Applicant Name": "Rohit Sharma",
+        "PAN Number": "ABCDE1234F", "Loan Type": "Personal Loan", "Sanctioned Amount": "₹300,000",
+        "Tenure": "36 months", "Interest Rate": "11.5% p.a.", "Monthly EMI": "₹9,893.18",
+        "Total Repayment": "₹356,154", "CIBIL Score": 780, "FOIR": "17.5%",
+        "Risk Category": "Low", "Approval Scenario": "A - Instant Approval",
+    }
+
+    def run(n):
+        for _ in range(n):
+            pdf_generator.generate_sanction_letter_pdf(data, "bench_sanction.pdf")
+    return run
+
+
+@case("journey", (1, 100))
+def _journey():
+    from agents.workflow import WorkflowEngine, ApplicationContext, JOURNEY
+
+    # Complete application, LLM never called, sanction PDF stubbed
+    engine = WorkflowEngine(sanction=lambda data: "sanction_letter.pdf")
+
+    def run(n):
+        for _ in range(n):
+            ctx = engine.run(ApplicationContext(), JOURNEY)
+            assert ctx.done
+    return run
+
+
+@case("journey_pdf", (1, 10))
+def _journey_pdf():
+    from agents.workflow import WorkflowEngine, ApplicationContext, JOURNEY
+
+    engine = WorkflowEngine()
+
+    def run(n):
+        for _ in range(n):
+            ctx = engine.run(ApplicationContext(), JOURNEY)
+            assert ctx.done
+    return run
+
+
+# ========================================
+# TIMING
+# ========================================
+
+def measure(run, size, repeat):
+    """Microseconds per call: (best, median) over `repeat` samples."""
+    run(size)  # warm-up: imports, shared resources, caches
+
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            run(size)
+        if time.perf_counter() - start >= MIN_SAMPLE_SECONDS:
+            break
+        loops *= 2
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(loops):
+                run(size)
+            samples.append((time.perf_counter() - start) / (loops * size) * 1e6)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return min(samples), statistics.median(samples)
+
+
+def run_suite(names, repeat):
+    results = {}
+    for name in names:
+        setup, sizes = CASES[name]
+        run = setup()
+        for size in sizes:
+            best, median = measure(run, size, repeat)
+            results[f"{name}[{size}]"] = {"us_per_call": round(best, 3), "median_us": round(median, 3)}
+            print(f"  {name}[{size}]: {best:,.2f} us/call", file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """[(case, base_us, new_us, change_pct, verdict)] for cases in both runs."""
+    rows = []
+    for key, new in results.items():
+        base = baseline["results"].get(key)
+        if base is None:
+            rows.append((key, None, new["us_per_call"], None, "new"))
+            continue
+        change = (new["us_per_call"] / base["us_per_call"] - 1) * 100 if base["us_per_call"] else 0.0
+        verdict = "REGRESSION" if change > threshold else "faster" if change < -threshold else "ok"
+        rows.append((key, base["us_per_call"], new["us_per_call"], change, verdict))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite with JSON baselines")
+    parser.add_argument("--only", nargs="+", choices=sorted(CASES), help="Cases to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=7, help="Timed samples per case and size")
+    parser.add_argument("--save", nargs="?", const=DEFAULT_BASELINE, metavar="PATH",
+                        help="Write results as a baseline (default path: bench/baselines/baseline.json)")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, metavar="PATH",
+                        help="Compare against a baseline; exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=20.0, help="Regression threshold in percent")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    # Sanction PDFs land in ./output; keep them out of the app directory
+    workdir = tempfile.mkdtemp(prefix="bench-suite-")
+    save_path = os.path.abspath(args.save) if args.save else None
+    os.chdir(workdir)
+
+    results = run_suite(args.only or list(CASES), args.repeat)
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+
+    if save_path:
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        with open(save_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Baseline saved to {save_path}", file=sys.stderr)
+
+    rows = compare(results, baseline, args.threshold) if baseline else None
+
+    if args.json:
+        if rows is not None:
+            report["compare"] = [
+                {"case": key, "baseline_us": base, "us_per_call": new,
+                 "change_pct": round(change, 1) if change is not None else None, "verdict": verdict}
+                for key, base, new, change, verdict in rows
+            ]
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif rows is None:
+        print(f"\n{'case':<38}{'us/call':>14}{'median us':>14}")
+        for key, r in results.items():
+            print(f"{key:<38}{r['us_per_call']:>14,.2f}{r['median_us']:>14,.2f}")
+    else:
+        print(f"\nAgainst {args.compare} ({baseline['created']}), threshold {args.threshold:.0f}%\n")
+        print(f"{'case':<38}{'baseline us':>14}{'us/call':>14}{'change':>9}  verdict")
+        for key, base, new, change, verdict in rows:
+            base_text = f"{base:,.2f}" if base is not None else "-"
+            change_text = f"{change:+.1f}%" if change is not None else "-"
+            print(f"{key:<38}{base_text:>14}{new:>14,.2f}{change_text:>9}  {verdict}")
+
+    if rows and any(verdict == "REGRESSION" for *_, verdict in rows):
+        print("\n❌ Performance regression against the baseline", file=sys.stderr)
+        sys.exit(1)
+    if rows:
+        print("\n✅ No regressions against the baseline", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# bench/workflow.py
+"""
+Headless workflow throughput: microseconds per state transition.
+
+Drives complete applications through agents/workflow.py with no UI, one
+journey per bureau scenario (instant approval, salary slip then approval,
+rejection). The LLM is never called (the classifier handles the purposes
+used here and polish is off); sanction PDFs are stubbed unless --pdf.
+
+    python -m bench.workflow
+    python -m bench.workflow --applications 20000 --pdf
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from agents.workflow import WorkflowEngine, ApplicationContext, JOURNEY
+
+
+SCENARIOS = {
+    "approved": {},
+    "documents": {"amount": {"loan_amount": 600000, "tenure": 36}},
+    "rejected": {"pan": {"pan": "PQRST9876Y"}},
+}
+
+
+def run(scenario, applications, engine):
+    journey = {**JOURNEY, **SCENARIOS[scenario]}
+    transitions = 0
+    outcome = None
+
+    start = time.perf_counter()
+    for _ in range(applications):
+        ctx = engine.run(ApplicationContext(), journey)
+        transitions += ctx.transitions
+        outcome = ctx.app_data.get("decision")
+    elapsed = time.perf_counter() - start
+
+    return {
+        "scenario": scenario,
+        "applications": applications,
+        "outcome": outcome,
+        "transitions": transitions,
+        "us_per_transition": round(elapsed / transitions * 1e6, 2),
+        "applications_per_s": round(applications / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless workflow transitions per second")
+    parser.add_argument("--applications", type=int, default=5000)
+    parser.add_argument("--pdf", action="store_true", help="Generate real sanction PDFs")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    if args.pdf:
+        # Sanction PDFs land in ./output; keep them out of the app directory
+        os.chdir(tempfile.mkdtemp(prefix="bench-workflow-"))
+
+    engine = WorkflowEngine() if args.pdf else WorkflowEngine(sanction=lambda data: "SANCTION LETTER")
+    results = [run(name, args.applications, engine) for name in SCENARIOS]
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+
+    print(f"Headless workflow ({args.applications:,} applications per scenario)\n")
+    print(f"{'scenario':<11}{'outcome':<11}{'transitions':>13}{'us/transition':>15}{'apps/s':>10}")
+    for r in results:
+        print(f"{r['scenario']:<11}{r['outcome']:<11}{r['transitions']:>13,}"
+              f"{r['us_per_transition']:>15.2f}{r['applications_per_s']:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
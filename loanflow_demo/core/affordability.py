@@ -0,0 +1,126 @@
+# core/affordability.py
+"""
+Affordability preview for the amount step.
+
+Every position of the amount input and tenure slider is priced once with
+the same rate card (the chosen loan type's), EMI and FOIR functions
+underwriting uses, so moving a widget is a table lookup. The amount step
+comes before PAN verification, so the preview is indicative: it prices at
+DEFAULT_CREDIT_SCORE and has no FOIR until the bureau score and income are
+known, and underwriting reprices with them. Tables are keyed by the pricing
+inputs (not the session), so sessions with the same profile share one. No
+Streamlit dependency.
+"""
+
+from array import array
+from functools import lru_cache
+
+from core.emi import calculate_emi
+from core.foir import calculate_foir
+from core.interest import calculate_base_interest_rate, rate_card_for
+
+
+# Widget ranges (min, max, step); app.py builds its inputs from these
+AMOUNT_RANGE = (50000, 10000000, 50000)
+TENURE_RANGE = (12, 240, 6)
+
+# calculate_base_interest_rate's neutral score, used until the PAN is verified
+DEFAULT_CREDIT_SCORE = 720
+
+
+def _positions(lo, hi, step):
+    return range(lo, hi + 1, step)
+
+
+class AffordabilityTable:
+    """Rate and EMI for every (amount, tenure) widget position."""
+
+    __slots__ = ("rates", "emis", "existing_emi", "income")
+
+    def __init__(self, employment_type, loan_type, credit_score, existing_emi=0, income=None):
+        self.existing_emi = existing_emi
+        self.income = income
+        self.rates = array("d")
+        self.emis = array("d")
+
+        for amount in _positions(*AMOUNT_RANGE):
+            for tenure in _positions(*TENURE_RANGE):
+                rate = calculate_base_interest_rate(
+                    tenure_months=tenure,
+                    employment_type=employment_type,
+                    loan_purpose=loan_type,
+                    loan_amount=amount,
+                    credit_score=credit_score
+                )
+                self.rates.append(rate)
+                self.emis.append(calculate_emi(amount, rate, tenure))
+
+    @staticmethod
+    def index(amount, tenure):
+        """Flat index of a widget position, or None if it is off the grid."""
+        a_lo, a_hi, a_step = AMOUNT_RANGE
+        t_lo, t_hi, t_step = TENURE_RANGE
+        if not (a_lo <= amount <= a_hi and t_lo <= tenure <= t_hi):
+            return None
+        if (amount - a_lo) % a_step or (tenure - t_lo) % t_step:
+            return None
+        tenures = (t_hi - t_lo) // t_step + 1
+        return int((amount - a_lo) // a_step * tenures + (tenure - t_lo) // t_step)
+
+    def foir(self, emi):
+        return calculate_foir(self.existing_emi, emi, self.income) if self.income else None
+
+    def lookup(self, amount, tenure):
+        i = self.index(amount, tenure)
+        if i is None:
+            return None
+        emi = self.emis[i]
+        return {
+            "rate": self.rates[i],
+            "emi": emi,
+            "total": round(emi * tenure, 2),
+            "foir": self.foir(emi),
+        }
+
+
+@lru_cache(maxsize=64)
+def affordability_table(employment_type, loan_type, credit_score, existing_emi=0, income=None):
+    return AffordabilityTable(employment_type, loan_type, credit_score, existing_emi, income)
+
+
+def pricing_inputs(app_data):
+    """
+    The underwriting inputs that set the price, from whatever the chat knows
+    so far (bureau fields only exist once the PAN is verified).
+    """
+    return {
+        "employment_type": app_data.get("employment_type", "Salaried"),
+        "loan_type": rate_card_for(app_data),
+        "credit_score": app_data.get("credit_score") or DEFAULT_CREDIT_SCORE,
+        "existing_emi": app_data.get("existing_emi", 0),
+        "income": app_data.get("monthly_salary"),
+    }
+
+
+def affordability_preview(app_data, loan_amount, tenure):
+    """
+    {"rate", "emi", "total", "foir", "indicative"} for a widget position.
+    indicative is True while the credit score is assumed (before PAN
+    verification); foir is None until the applicant's income is known.
+    """
+    table = affordability_table(**pricing_inputs(app_data))
+    preview = table.lookup(loan_amount, tenure)
+    if preview is None:
+        # Typed amount between steps: price it directly
+        inputs = pricing_inputs(app_data)
+        rate = calculate_base_interest_rate(
+            tenure_months=tenure,
+            employment_type=inputs["employment_type"],
+            loan_purpose=inputs["loan_type"],
+            loan_amount=loan_amount,
+            credit_score=inputs["credit_score"]
+        )
+        emi = calculate_emi(loan_amount, rate, tenure)
+        preview = {"rate": rate, "emi": emi, "total": round(emi * tenure, 2), "foir": table.foir(emi)}
+    preview["indicative"] = not app_data.get("credit_score")
+    return preview
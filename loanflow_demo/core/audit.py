@@ -0,0 +1,281 @@
+# core/audit.py
+"""
+Buffered, asynchronous audit log.
+
+log_event() only appends a tuple to an in-memory queue; a background
+writer formats queued events into the existing text format
+
+    [YYYY-mm-dd HH:MM:SS] [LEVEL] ROLE: content
+
+and writes them in batches, when FLUSH_LINES events are waiting or every
+FLUSH_SECONDS. The log rotates by size and/or age; rotated files are
+gzip-compressed and only the newest ROTATE_KEEP are kept. The logger is a
+shared resource (core/resources.py), so it is flushed and closed at
+interpreter exit. No Streamlit dependency.
+
+record_event() is the structured side: one JSON record per workflow step
+(application ID, stage, event, latency, changed fields), written through
+the same queue + writer into indexed JSONL segments (core/audit_store.py)
+so one application's history can be pulled without scanning the log.
+
+fsync policy (LOANFLOW_AUDIT_FSYNC):
+    never   leave durability to the OS
+    rotate  fsync before a file is rotated (default)
+    batch   fsync after every batch
+"""
+
+import gzip
+import os
+import shutil
+import sys
+import threading
+import time
+from collections import deque
+
+from core import resources
+from core.audit_store import SegmentStore
+
+
+LOG_PATH = os.getenv("LOANFLOW_AUDIT_LOG", "conversation_logs.txt")
+FLUSH_LINES = int(os.getenv("LOANFLOW_AUDIT_FLUSH_LINES", "256"))
+FLUSH_SECONDS = float(os.getenv("LOANFLOW_AUDIT_FLUSH_SECONDS", "1"))
+FSYNC = os.getenv("LOANFLOW_AUDIT_FSYNC", "rotate")
+ROTATE_BYTES = int(os.getenv("LOANFLOW_AUDIT_ROTATE_BYTES", str(10 * 1024 * 1024)))
+ROTATE_SECONDS = float(os.getenv("LOANFLOW_AUDIT_ROTATE_SECONDS", "0"))  # 0 = size only
+ROTATE_KEEP = int(os.getenv("LOANFLOW_AUDIT_ROTATE_KEEP", "10"))
+
+# Past this many queued events the caller writes them itself (backpressure)
+QUEUE_LIMIT = 100_000
+
+# Attempts per batch before it is dropped (and counted) so a broken disk
+# can't grow the queue past QUEUE_LIMIT and stall callers
+WRITE_RETRIES = int(os.getenv("LOANFLOW_AUDIT_WRITE_RETRIES", "3"))
+
+FSYNC_POLICIES = ("never", "rotate", "batch")
+
+
+def format_line(ts, level, role, content):
+    stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+    return f"[{stamp}] [{level}] {role}: {content}\n"
+
+
+class RotatingLogFile:
+    """Append-only text file with size/age rotation and gzip'd archives."""
+
+    def __init__(self, path, rotate_bytes=ROTATE_BYTES, rotate_seconds=ROTATE_SECONDS,
+                 keep=ROTATE_KEEP, fsync=FSYNC):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, not {fsync!r}")
+        self.path = path
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.keep = keep
+        self.fsync = fsync
+        self.rotations = 0
+        self._file = None
+        self._opened_at = 0.0
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._opened_at = time.time()
+
+    def _due(self):
+        if self.rotate_bytes and self._file.tell() >= self.rotate_bytes:
+            return True
+        return bool(self.rotate_seconds) and time.time() - self._opened_at >= self.rotate_seconds
+
+    def write_batch(self, events):
+        self.write("".join(format_line(*event) for event in events))
+
+    def write(self, text):
+        if self._file is None:
+            self._open()
+        self._file.write(text)
+        self._file.flush()
+        if self.fsync == "batch":
+            os.fsync(self._file.fileno())
+        if self._due():
+            self.rotate()
+
+    def rotate(self):
+        """Close the live file, compress it to path.<timestamp>-<n>.gz, prune old archives."""
+        if self._file is None:
+            return
+        if self.fsync != "never":
+            os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+
+        # Fixed-width names sort oldest first (several rotations can share a second)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        n = 0
+        while os.path.exists(archive := f"{self.path}.{stamp}-{n:03d}.gz"):
+            n += 1
+
+        with open(self.path, "rb") as src, gzip.open(archive, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(self.path)
+        self.rotations += 1
+        self._prune()
+
+    def archives(self):
+        directory = os.path.dirname(self.path) or "."
+        prefix = os.path.basename(self.path) + "."
+        return sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.startswith(prefix) and name.endswith(".gz")
+        )
+
+    def _prune(self):
+        for old in self.archives()[:-self.keep] if self.keep else []:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+    def close(self):
+        if self._file is not None:
+            self._file.flush()
+            if self.fsync != "never":
+                os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+
+class AuditLogger:
+    """
+    Queue + background writer in front of a sink (anything with
+    write_batch(events) and close()). log() is safe from any thread and
+    never touches the file; flush() and close() write everything queued.
+    """
+
+    def __init__(self, sink, flush_lines=FLUSH_LINES, flush_seconds=FLUSH_SECONDS):
+        self.sink = sink
+        self.flush_lines = flush_lines
+        self.flush_seconds = flush_seconds
+        self._queue = deque()
+        self._wake = threading.Event()
+        self._write_lock = threading.Lock()
+        self._state_lock = threading.Lock()  # _closed check + append are atomic
+        self._closed = False
+        self._failures = 0  # consecutive failed attempts at the head batch
+        self._stats = {"written": 0, "batches": 0, "max_batch": 0, "errors": 0, "dropped": 0, "waits": 0}
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def log(self, *event):
+        """Queue one event; the sink receives it as (timestamp, *event)."""
+        self.log_at(time.time(), *event)
+
+    def log_at(self, ts, *event):
+        """log() for an event that happened at `ts` (epoch seconds)."""
+        with self._state_lock:
+            closed = self._closed
+            if not closed:
+                self._queue.append((ts, *event))
+                queued = len(self._queue)
+
+        if closed:
+            # Late events during shutdown are written straight through
+            with self._write_lock:
+                self.sink.write_batch([(ts, *event)])
+            return
+
+        if queued >= self.flush_lines:
+            self._wake.set()
+        if queued >= QUEUE_LIMIT:
+            self._stats["waits"] += 1
+            self.flush()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self._write_batch()
+
+    def _write_batch(self):
+        with self._write_lock:
+            batch = []
+            while self._queue and len(batch) < QUEUE_LIMIT:
+                batch.append(self._queue.popleft())
+            if not batch:
+                return
+
+            try:
+                self.sink.write_batch(batch)
+            except Exception as e:
+                self._stats["errors"] += 1
+                self._failures += 1
+                if self._failures < WRITE_RETRIES:
+                    # Keep the events for the next attempt rather than losing them
+                    self._queue.extendleft(reversed(batch))
+                    print(f"⚠️ Audit log write failed: {e}", file=sys.stderr)
+                else:
+                    self._failures = 0
+                    self._stats["dropped"] += len(batch)
+                    print(f"⚠️ Audit log write failed {WRITE_RETRIES} times, dropped {len(batch)} events: {e}",
+                          file=sys.stderr)
+                return
+
+            self._failures = 0
+            self._stats["written"] += len(batch)
+            self._stats["batches"] += 1
+            self._stats["max_batch"] = max(self._stats["max_batch"], len(batch))
+
+    def flush(self):
+        """Write everything queued so far, on the calling thread."""
+        while self._queue:
+            errors = self._stats["errors"]
+            self._write_batch()
+            if self._stats["errors"] != errors:
+                break
+
+    def close(self):
+        """Stop the writer, flush the queue and close the file."""
+        with self._state_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+        self.sink.close()
+
+    def stats(self):
+        return {**self._stats, "queued": len(self._queue), "rotations": getattr(self.sink, "rotations", 0)}
+
+
+def _build_logger():
+    return AuditLogger(RotatingLogFile(LOG_PATH))
+
+
+resources.register("audit_log", _build_logger, close=lambda logger: logger.close())
+
+
+def get_logger():
+    """The process-wide audit logger (started on first use)."""
+    return resources.get("audit_log")
+
+
+def log_event(role, content, level="INFO"):
+    """Queue an audit line; returns in microseconds."""
+    get_logger().log(level, role, content)
+
+
+def audit_stats():
+    return get_logger().stats() if resources.is_loaded("audit_log") else {}
+
+
+def _build_recorder():
+    return AuditLogger(SegmentStore())
+
+
+resources.register("audit_records", _build_recorder, close=lambda logger: logger.close())
+
+
+def record_event(application_id, stage, event, latency_ms=None, payload=None):
+    """Queue a structured audit record (see core/audit_store.py)."""
+    resources.get("audit_records").log(application_id, stage, event, latency_ms, payload)
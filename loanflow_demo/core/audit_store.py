@@ -0,0 +1,295 @@
+# core/audit_store.py
+"""
+Structured audit records: JSONL segments with a per-application index.
+
+Each record is one JSON line:
+
+    {"ts": 1760870000.123, "application_id": "LF123456", "stage": "pan",
+     "event": "submitted", "latency_ms": 0.21, "payload": {...}}
+
+Records go to audit-000001.jsonl, audit-000002.jsonl, ... in the audit
+directory; a segment is sealed once it reaches SEGMENT_BYTES. While a
+segment is live, every record also appends "application_id ts offset
+length" to its .live index. Sealing sorts those entries into a
+fixed-width .idx file with a header (first/last timestamp, count), so a
+query binary-searches each sealed index and only scans the one live
+index: one application's events come back in milliseconds however large
+the log grows. A missing index is rebuilt from its segment.
+"""
+
+import bisect
+import glob
+import json
+import os
+import re
+
+
+AUDIT_DIR = os.getenv("LOANFLOW_AUDIT_DIR", "audit_logs")
+SEGMENT_BYTES = int(os.getenv("LOANFLOW_AUDIT_SEGMENT_BYTES", str(8 * 1024 * 1024)))
+
+# Fixed-width index entries: id, timestamp, byte offset, byte length
+ID_WIDTH = 24
+ENTRY = "{:<24} {:017.6f} {:012d} {:08d}\n"
+ENTRY_BYTES = len(ENTRY.format("", 0.0, 0, 0).encode("ascii"))
+HEADER = "#LFIDX1 {:017.6f} {:017.6f} {:012d}"
+
+_SEGMENT_RE = re.compile(r"audit-(\d{6})\.jsonl$")
+
+
+def segment_path(directory, seq):
+    return os.path.join(directory, f"audit-{seq:06d}.jsonl")
+
+
+def segments(directory):
+    """[(seq, path)] of every segment, oldest first."""
+    found = []
+    for path in glob.glob(os.path.join(directory, "audit-*.jsonl")):
+        match = _SEGMENT_RE.search(path)
+        if match:
+            found.append((int(match.group(1)), path))
+    return sorted(found)
+
+
+def _index_key(application_id):
+    return (application_id or "-")[:ID_WIDTH]
+
+
+# ========================================
+# WRITER
+# ========================================
+
+class SegmentStore:
+    """AuditLogger sink for (ts, application_id, stage, event, latency_ms, payload) events."""
+
+    def __init__(self, directory=AUDIT_DIR, segment_bytes=SEGMENT_BYTES):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.rotations = 0  # sealed segments (AuditLogger.stats)
+        self._file = None
+        self._live = None
+        self._seq = 0
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        existing = segments(self.directory)
+        self._seq = existing[-1][0] if existing else 1
+
+        # Continue the newest segment unless it was already sealed
+        if os.path.exists(segment_path(self.directory, self._seq)[:-len(".jsonl")] + ".idx"):
+            self._seq += 1
+        self._start_segment()
+
+    def _start_segment(self):
+        path = segment_path(self.directory, self._seq)
+        live_path = path[:-len(".jsonl")] + ".live"
+        if os.path.exists(path) and (not os.path.exists(live_path) or _torn_tail(live_path)):
+            _write_live_index(path, live_path)
+        self._file = open(path, "ab")
+        self._live = open(live_path, "a", encoding="ascii")
+
+    def write_batch(self, events):
+        if self._file is None:
+            self._open()
+
+        index = []
+        chunks = []
+        offset = self._file.tell()
+        for ts, application_id, stage, event, latency_ms, payload in events:
+            line = json.dumps({
+                "ts": round(ts, 6),
+                "application_id": application_id,
+                "stage": stage,
+                "event": event,
+                "latency_ms": latency_ms,
+                "payload": payload or {},
+            }, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8") + b"\n"
+            index.append(ENTRY.format(_index_key(application_id), ts, offset, len(line)))
+            chunks.append(line)
+            offset += len(line)
+
+        self._file.write(b"".join(chunks))
+        self._file.flush()
+        self._live.write("".join(index))
+        self._live.flush()
+
+        if offset >= self.segment_bytes:
+            self.seal()
+
+    def seal(self):
+        """Sort the live index into the segment's fixed-width .idx and start the next segment."""
+        if self._file is None:
+            return
+        path = self._file.name
+        self._file.close()
+        self._live.close()
+        self._file = self._live = None
+
+        base = path[:-len(".jsonl")]
+        _seal_index(base + ".live", base + ".idx")
+        self.rotations += 1
+
+        self._seq += 1
+        self._start_segment()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._live.close()
+            self._file = self._live = None
+
+
+def _torn_tail(path):
+    """True if a crash left the file's last line without its newline."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if not f.tell():
+            return False
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) != b"\n"
+
+
+def _write_live_index(path, live_path):
+    """Rebuild a live index by scanning its segment (after a crash or a deleted index)."""
+    offset = 0
+    with open(path, "rb") as f, open(live_path, "w", encoding="ascii") as out:
+        for line in f:
+            try:
+                record = json.loads(line)
+                out.write(ENTRY.format(_index_key(record.get("application_id")), record["ts"], offset, len(line)))
+            except (ValueError, KeyError):
+                pass
+            offset += len(line)
+
+
+def _complete_entry(entry):
+    """
+    False for a torn .live line: the writer's trailing line mid-append, or
+    one a crash cut short (later appends then run on from it).
+    """
+    if len(entry) != ENTRY_BYTES or not entry.endswith("\n"):
+        return False
+    try:
+        _parse_entry(entry)
+    except ValueError:
+        return False
+    return True
+
+
+def _seal_index(live_path, idx_path):
+    with open(live_path, encoding="ascii", errors="replace") as f:
+        entries = sorted(e for e in f if _complete_entry(e))  # id first, then timestamp: sorts by (id, ts)
+    first = min((float(e[ID_WIDTH + 1:ID_WIDTH + 18]) for e in entries), default=0.0)
+    last = max((float(e[ID_WIDTH + 1:ID_WIDTH + 18]) for e in entries), default=0.0)
+
+    tmp = idx_path + ".tmp"
+    with open(tmp, "w", encoding="ascii") as out:
+        out.write(HEADER.format(first, last, len(entries)).ljust(ENTRY_BYTES - 1) + "\n")
+        out.writelines(entries)
+    os.replace(tmp, idx_path)
+    os.remove(live_path)
+
+
+# ========================================
+# QUERY
+# ========================================
+
+class _SealedIndex:
+    """Random access over a sealed .idx file's fixed-width entries."""
+
+    def __init__(self, path):
+        self.f = open(path, "rb")
+        header = self.f.readline().decode("ascii").split()
+        self.first_ts, self.last_ts, self.count = float(header[1]), float(header[2]), int(header[3])
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        self.f.seek((i + 1) * ENTRY_BYTES)
+        return self.f.read(ENTRY_BYTES).decode("ascii")
+
+    def entries_for(self, key):
+        keys = _KeyView(self)
+        i = bisect.bisect_left(keys, key)
+        while i < self.count:
+            entry = self[i]
+            if entry[:ID_WIDTH].rstrip() != key:
+                break
+            yield entry
+            i += 1
+
+    def close(self):
+        self.f.close()
+
+
+class _KeyView:
+    def __init__(self, index):
+        self.index = index
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, i):
+        return self.index[i][:ID_WIDTH].rstrip()
+
+
+def _parse_entry(entry):
+    _, ts, offset, length = entry.split()
+    return float(ts), int(offset), int(length)
+
+
+def _live_hits(live_path, key):
+    """Entries for key in a live index the writer may be appending to (torn lines are skipped)."""
+    with open(live_path, encoding="ascii", errors="replace") as f:
+        return [_parse_entry(e) for e in f if e[:ID_WIDTH].rstrip() == key and _complete_entry(e)]
+
+
+def query(application_id, directory=AUDIT_DIR, since=None, until=None):
+    """Every record for one application (oldest first), optionally within [since, until]."""
+    key = _index_key(application_id)
+    records = []
+
+    for seq, path in segments(directory):
+        base = path[:-len(".jsonl")]
+        hits = None
+        if not os.path.exists(base + ".idx"):
+            if not os.path.exists(base + ".live"):
+                _write_live_index(path, base + ".live")
+            try:
+                hits = _live_hits(base + ".live", key)
+            except FileNotFoundError:
+                pass  # sealed since the check: read its .idx instead
+
+        if hits is None:
+            index = _SealedIndex(base + ".idx")
+            try:
+                if (since and index.last_ts < since) or (until and index.first_ts > until):
+                    continue
+                hits = [_parse_entry(e) for e in index.entries_for(key)]
+            finally:
+                index.close()
+
+        hits = [h for h in hits if (not since or h[0] >= since) and (not until or h[0] <= until)]
+        if not hits:
+            continue
+        with open(path, "rb") as f:
+            for _, offset, length in sorted(hits, key=lambda h: h[1]):
+                f.seek(offset)
+                records.append(json.loads(f.read(length)))
+
+    records.sort(key=lambda r: r["ts"])
+    return records
+
+
+def store_stats(directory=AUDIT_DIR):
+    """Segment count and on-disk bytes of records and indexes."""
+    stats = {"segments": 0, "sealed": 0, "record_bytes": 0, "index_bytes": 0}
+    for seq, path in segments(directory):
+        base = path[:-len(".jsonl")]
+        stats["segments"] += 1
+        stats["record_bytes"] += os.path.getsize(path)
+        for suffix in (".idx", ".live"):
+            if os.path.exists(base + suffix):
+                stats["index_bytes"] += os.path.getsize(base + suffix)
+                stats["sealed"] += suffix == ".idx"
+    return stats
@@ -0,0 +1,230 @@
+# core/chat_history.py
+"""
+Compact, memory-bounded chat history.
+
+Each entry is a slotted ChatRecord: interned role/type strings, a float
+timestamp instead of a datetime, and large payloads (CIBIL reports,
+sanction letters, badge markup) zlib-compressed above a size threshold.
+ChatHistory keeps a running byte estimate per session; past the cap, the
+oldest entries spill to a local JSONL store and are read back by offset
+only if the user scrolls that far up. No Streamlit dependency.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+import weakref
+import zlib
+from collections import Counter
+
+
+MAX_BYTES = int(os.getenv("LOANFLOW_HISTORY_MAX_BYTES", str(256 * 1024)))
+COMPRESS_BYTES = int(os.getenv("LOANFLOW_HISTORY_COMPRESS_BYTES", "1024"))
+SPILL_DIR = os.getenv("LOANFLOW_HISTORY_SPILL_DIR", os.path.join(tempfile.gettempdir(), "loanflow-history"))
+
+# Entries never spilled, however tight the cap (what the chat window shows)
+MIN_LIVE = 20
+
+
+class ChatRecord:
+    """One chat history entry: message, loading, report or sanction."""
+
+    __slots__ = ("type", "role", "agent", "ts", "download", "pending", "html", "_data")
+
+    def __init__(self, type, role=None, content="", agent=None, download=False, ts=None):
+        self.type = sys.intern(type)
+        self.role = sys.intern(role) if role else None
+        self.agent = sys.intern(agent) if agent else None
+        self.ts = time.time() if ts is None else ts
+        self.download = download
+        self.pending = None  # prefetch handle whose result replaces content
+        self.html = None  # rendered bubble, set by the view (ChatHistory.set_html)
+        self.content = content
+
+    @classmethod
+    def message(cls, role, content):
+        return cls("message", role=role, content=content)
+
+    @classmethod
+    def loading(cls, agent):
+        return cls("loading", agent=agent)
+
+    @classmethod
+    def report(cls, content, download=True):
+        return cls("report", content=content, download=download)
+
+    @classmethod
+    def sanction(cls, content):
+        return cls("sanction", content=content)
+
+    @property
+    def content(self):
+        data = self._data
+        return zlib.decompress(data).decode("utf-8") if isinstance(data, bytes) else data
+
+    @content.setter
+    def content(self, text):
+        self.html = None
+        text = text or ""
+        if len(text) >= COMPRESS_BYTES:
+            packed = zlib.compress(text.encode("utf-8"), 6)
+            if len(packed) < len(text):
+                self._data = packed
+                return
+        self._data = text
+
+    @property
+    def compressed(self):
+        return isinstance(self._data, bytes)
+
+    def nbytes(self):
+        """Approximate retained size (interned strings are shared, not counted)."""
+        size = sys.getsizeof(self) + sys.getsizeof(self._data)
+        return size + sys.getsizeof(self.html) if self.html is not None else size
+
+    def to_dict(self):
+        return {
+            "type": self.type, "role": self.role, "agent": self.agent,
+            "ts": self.ts, "download": self.download, "content": self.content,
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["type"], role=d.get("role"), content=d.get("content", ""),
+                   agent=d.get("agent"), download=d.get("download", False), ts=d.get("ts"))
+
+    def __repr__(self):
+        return f"ChatRecord({self.type!r}, role={self.role!r}, {len(self.content)} chars)"
+
+
+_histories = weakref.WeakSet()
+
+
+class ChatHistory:
+    """
+    List-like chat history for one session with a memory cap.
+    Index 0 is the oldest entry, whether spilled or live.
+    """
+
+    def __init__(self, session_id, max_bytes=MAX_BYTES, spill_dir=SPILL_DIR):
+        self.session_id = session_id
+        self.max_bytes = max_bytes
+        # Unique per history object: application IDs can repeat across
+        # sessions and processes sharing the spill directory
+        self.spill_path = os.path.join(spill_dir, f"{session_id}-{uuid.uuid4().hex}.jsonl")
+        self._live = []
+        self._offsets = []  # byte offset of each spilled record in spill_path
+        self._bytes = 0
+        self._counts = Counter()
+        _histories.add(self)
+        weakref.finalize(self, _remove_file, self.spill_path)
+
+    # ---- list protocol -------------------------------------------------
+
+    def __len__(self):
+        return len(self._offsets) + len(self._live)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("chat history index out of range")
+
+        spilled = len(self._offsets)
+        if index >= spilled:
+            return self._live[index - spilled]
+        return self._load(index)
+
+    def append(self, record):
+        self._live.append(record)
+        self._bytes += record.nbytes()
+        self._counts[record.type, record.role] += 1
+        if self._bytes > self.max_bytes:
+            self._spill()
+
+    def pop(self):
+        record = self._live.pop()
+        self._bytes -= record.nbytes()
+        self._counts[record.type, record.role] -= 1
+        return record
+
+    def update(self, record, content):
+        """Replace a live record's content, keeping the byte estimate right."""
+        self._bytes -= record.nbytes()
+        record.content = content
+        self._bytes += record.nbytes()
+        if self._bytes > self.max_bytes:
+            self._spill()
+
+    def set_html(self, index, html):
+        """
+        Keep an entry's rendered HTML on its record, counted against the cap.
+        Spilled entries are read back as fresh copies, so nothing is kept.
+        """
+        if index < 0:
+            index += len(self)
+        index -= len(self._offsets)
+        if not 0 <= index < len(self._live):
+            return
+        record = self._live[index]
+        self._bytes -= record.nbytes()
+        record.html = html
+        self._bytes += record.nbytes()
+        if self._bytes > self.max_bytes:
+            self._spill()
+
+    def count(self, type, role=None):
+        """Entries of a type (and role), without touching spilled ones."""
+        return self._counts[type, role]
+
+    # ---- spill store ---------------------------------------------------
+
+    def _spill(self):
+        os.makedirs(os.path.dirname(self.spill_path), exist_ok=True)
+
+        with open(self.spill_path, "ab") as f:
+            while self._bytes > self.max_bytes and len(self._live) > MIN_LIVE:
+                record = self._live.pop(0)
+                self._offsets.append(f.tell())
+                f.write(json.dumps(record.to_dict(), ensure_ascii=False).encode("utf-8") + b"\n")
+                self._bytes -= record.nbytes()
+
+    def _load(self, index):
+        with open(self.spill_path, "rb") as f:
+            f.seek(self._offsets[index])
+            return ChatRecord.from_dict(json.loads(f.readline()))
+
+    # ---- reporting -----------------------------------------------------
+
+    def memory_usage(self):
+        return {
+            "session_id": self.session_id,
+            "entries": len(self),
+            "live": len(self._live),
+            "spilled": len(self._offsets),
+            "compressed": sum(1 for r in self._live if r.compressed),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def memory_report():
+    """Per-session memory usage of every live chat history in this process."""
+    return sorted((h.memory_usage() for h in list(_histories)), key=lambda u: u["bytes"], reverse=True)
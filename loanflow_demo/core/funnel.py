@@ -0,0 +1,464 @@
+# core/funnel.py
+"""
+Streaming funnel analytics over the audit logs.
+
+One pass over the conversation text log (both the old "[ts] ROLE: content"
+lines and the current "[ts] [LEVEL] ROLE: content" ones, plain or gzip'd)
+and the structured JSONL records (core/audit_store.py) produces:
+
+- funnel: sessions reaching each step, from start to sanction
+- decision mix: underwriting decisions (APPROVED / REJECTED / NEED_SALARY_SLIP)
+- purpose and loan-type recommendation distributions
+- dwell time per workflow stage (p50 / p95 / max)
+
+Memory is bounded: each session is folded into the totals as soon as it
+ends (or goes idle), dwell times go into fixed log-scale histograms and
+free-text distributions keep at most DISTINCT_LIMIT keys. Text logs are
+scanned in blocks with one regex, so agent replies and continuation lines
+never reach Python; only the few milestone lines are decoded.
+
+Text sessions are delimited by "New session started" (or USER_PURPOSE in
+the old format) and are approximate when sessions interleave; structured
+records carry the application ID and are exact. The app writes both since
+structured records were added, so text sessions from after the first
+structured record are skipped when both are read.
+"""
+
+import gzip
+import json
+import math
+import re
+from collections import Counter, OrderedDict
+from datetime import datetime
+
+
+# "cleared": approved outright, or approved once the salary slip verified
+FUNNEL = ["started", "confirmed", "purpose", "loan_type", "amount", "pan",
+          "verified", "decision", "cleared", "sanctioned"]
+STEP = {name: i for i, name in enumerate(FUNNEL)}
+
+# Workflow stage (agents/workflow.py state) that each text milestone completes
+STAGE_OF = {
+    "confirmed": "start_confirmation",
+    "purpose": "loan_purpose",
+    "loan_type": "loan_type",
+    "amount": "amount",
+    "pan": "pan",
+    "verified": "verification_processing",
+    "decision": "underwriting_trigger",
+    "cleared": "document_upload",
+    "sanctioned": "sanction_letter",
+}
+
+# Structured (stage, event) records that reach a funnel step
+RECORD_STEPS = {
+    ("session", "started"): "started",
+    ("start_confirmation", "confirmed"): "confirmed",
+    ("loan_purpose", "recommended"): "purpose",
+    ("loan_type", "selected"): "loan_type",
+    ("amount", "entered"): "amount",
+    ("pan", "submitted"): "pan",
+    ("verification_processing", "verified"): "verified",
+    ("underwriting_trigger", "approved"): "cleared",
+    ("underwriting_trigger", "need_documents"): "decision",
+    ("underwriting_trigger", "rejected"): "decision",
+    ("document_verification", "verified"): "cleared",
+    ("sanction_letter", "sanctioned"): "sanctioned",
+}
+
+CONFIRM_WORDS = {"yes", "y", "ok", "okay", "sure", "start", "begin", "proceed"}  # agents/workflow.py
+
+DISTINCT_LIMIT = 10_000
+SESSION_TIMEOUT = 2 * 3600  # seconds of silence before a structured session is closed
+
+
+# ========================================
+# BOUNDED AGGREGATES
+# ========================================
+
+class DwellHistogram:
+    """Log-scale histogram (5% buckets from 1 ms): constant memory percentiles."""
+
+    BASE = 0.001
+    GROWTH = math.log(1.05)
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = Counter()
+
+    def add(self, seconds):
+        if seconds < 0:
+            return
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        bucket = 0 if seconds <= self.BASE else math.ceil(math.log(seconds / self.BASE) / self.GROWTH)
+        self.buckets[bucket] += 1
+
+    def percentile(self, pct):
+        if not self.count:
+            return 0.0
+        rank = self.count * pct / 100
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self.BASE * math.exp(bucket * self.GROWTH), self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_s": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50_s": round(self.percentile(50), 3),
+            "p95_s": round(self.percentile(95), 3),
+            "max_s": round(self.max, 3),
+        }
+
+
+class CappedCounter(Counter):
+    """Counter that folds new keys into "(other)" past `limit` distinct keys."""
+
+    def __init__(self, limit=DISTINCT_LIMIT):
+        super().__init__()
+        self.limit = limit
+
+    def add(self, key):
+        if key not in self and len(self) >= self.limit:
+            key = "(other)"
+        self[key] += 1
+
+
+def normalise_purpose(text):
+    return " ".join(text.lower().split())[:60]
+
+
+def normalise_loan_type(text):
+    text = text.strip().strip("*")
+    return text[:-5] if text.endswith(" Loan") else text
+
+
+class Session:
+    __slots__ = ("application_id", "started_ts", "furthest", "milestone_ts",
+                 "last_ts", "last_user", "purpose", "recommendation", "decision", "stages")
+
+    def __init__(self, application_id, ts):
+        self.application_id = application_id
+        self.started_ts = ts
+        self.furthest = 0
+        self.milestone_ts = ts
+        self.last_ts = ts
+        self.last_user = None
+        self.purpose = None
+        self.recommendation = None
+        self.decision = None
+        self.stages = []  # (stage, dwell seconds)
+
+
+# ========================================
+# ANALYZER
+# ========================================
+
+class FunnelAnalyzer:
+    """Feed text logs and structured records, then call report()."""
+
+    def __init__(self, session_timeout=SESSION_TIMEOUT, distinct_limit=DISTINCT_LIMIT):
+        self.session_timeout = session_timeout
+        self.reached = [0] * len(FUNNEL)
+        self.decisions = Counter()
+        self.purposes = CappedCounter(distinct_limit)
+        self.recommendations = CappedCounter(distinct_limit)
+        self.dwell = {}
+        self.sessions = 0
+        self.skipped_duplicates = 0
+        self.records_since = None  # first structured timestamp: text sessions after it are skipped
+        self.stats = {"files": 0, "bytes": 0, "lines": 0, "records": 0, "peak_open_sessions": 0}
+        self.first_ts = None
+        self.last_ts = None
+        # Sessions still in progress; they can span files (rotation, segments)
+        self._open_sessions = OrderedDict()
+        self._text_session = None
+
+    # ---- session folding ----------------------------------------------
+
+    def _reach(self, session, step, ts):
+        index = STEP[step]
+        if index <= session.furthest:
+            return
+        if index == session.furthest + 1 and step in STAGE_OF:
+            session.stages.append((STAGE_OF[step], ts - session.milestone_ts))
+        session.furthest = index
+        session.milestone_ts = ts
+
+    def _finish(self, session, text=False):
+        # Text timestamps are whole seconds
+        if text and self.records_since is not None and session.started_ts >= math.floor(self.records_since):
+            self.skipped_duplicates += 1
+            return
+        self.sessions += 1
+        for i in range(session.furthest + 1):
+            self.reached[i] += 1
+        if session.decision:
+            self.decisions[session.decision] += 1
+        if session.purpose:
+            self.purposes.add(session.purpose)
+        if session.recommendation:
+            self.recommendations.add(session.recommendation)
+        for stage, seconds in session.stages:
+            histogram = self.dwell.get(stage)
+            if histogram is None:
+                histogram = self.dwell[stage] = DwellHistogram()
+            histogram.add(seconds)
+
+        self.first_ts = session.started_ts if self.first_ts is None else min(self.first_ts, session.started_ts)
+        self.last_ts = session.last_ts if self.last_ts is None else max(self.last_ts, session.last_ts)
+
+    # ---- text log -----------------------------------------------------
+
+    def feed_text(self, f):
+        """A conversation text log (binary file object), oldest lines first."""
+        stamp_cache = (None, 0.0)
+
+        for chunk in _chunks(f):
+            self.stats["lines"] += chunk.count(b"\n")
+            # The regex skips agent replies and continuation lines in C; only
+            # milestone lines reach Python
+            for match in _TEXT_LINE.finditer(chunk):
+                stamp, role, content = match.groups()
+                if stamp != stamp_cache[0]:
+                    try:
+                        stamp_cache = (stamp, _epoch(stamp))
+                    except ValueError:
+                        continue
+                ts = stamp_cache[1]
+                content = content.strip().decode("utf-8", "replace")
+                self._text_line(role, content, ts)
+
+    def _text_line(self, role, content, ts):
+        session = self._text_session
+
+        if role == b"SYSTEM":
+            if session:
+                self._finish(session, text=True)
+            self._text_session = Session(content.rpartition(" ")[2], ts)
+            return
+        if role == b"USER_PURPOSE":
+            # Old format: no session marker, the purpose opens the session
+            if session:
+                self._finish(session, text=True)
+            session = self._text_session = Session(None, ts)
+            session.purpose = normalise_purpose(content)
+            self._reach(session, "purpose", ts)
+            return
+        if session is None:
+            session = self._text_session = Session(None, ts)
+        session.last_ts = ts
+
+        if role == b"USER":
+            self._text_user(session, content, ts)
+        elif role in (b"PURPOSE_CLASSIFIER", b"AI_RECOMMENDATION", b"CLASSIFIER_RECOMMENDATION", b"AI_ERROR"):
+            if session.purpose is None and session.last_user:
+                session.purpose = normalise_purpose(session.last_user)
+            if role in (b"AI_RECOMMENDATION", b"CLASSIFIER_RECOMMENDATION"):
+                session.recommendation = normalise_loan_type(content)
+            self._reach(session, "purpose", ts)
+        elif role == b"PAN_SUBMITTED":
+            self._reach(session, "pan", ts)
+        elif role == b"VERIFICATION_SUCCESS":
+            self._reach(session, "verified", ts)
+        elif role == b"UNDERWRITING_DECISION":
+            session.decision = content
+            self._reach(session, "decision", ts)
+            if content == "APPROVED":
+                session.furthest = STEP["cleared"]  # no document stage to time
+        elif role == b"DOCUMENT_VERIFICATION":
+            if content.endswith("True"):
+                self._reach(session, "cleared", ts)
+        elif role == b"SANCTION_GENERATED":
+            self._reach(session, "sanctioned", ts)
+
+    def _text_user(self, session, content, ts):
+        if session.furthest < STEP["confirmed"]:
+            if content.lower() in CONFIRM_WORDS:
+                self._reach(session, "confirmed", ts)
+        elif content.startswith("I selected"):
+            self._reach(session, "loan_type", ts)
+        elif content.startswith("I need"):
+            self._reach(session, "amount", ts)
+        elif content.startswith("PAN:"):
+            self._reach(session, "pan", ts)
+        elif session.purpose is None and session.furthest <= STEP["purpose"]:
+            # The purpose: logged before the classifier lines by older app
+            # versions and after them by the current one
+            if session.furthest == STEP["purpose"]:
+                session.purpose = normalise_purpose(content)
+            else:
+                session.last_user = content
+
+    # ---- structured records -------------------------------------------
+
+    def feed_records(self, lines):
+        """Lines (bytes) of core/audit_store.py JSONL segments, oldest first."""
+        open_sessions = self._open_sessions
+        count = 0
+
+        for line in lines:
+            try:
+                record = json.loads(line)
+                ts = record["ts"]
+                app_id = record["application_id"]
+            except (ValueError, KeyError, TypeError):
+                continue
+            count += 1
+            if self.records_since is None or ts < self.records_since:
+                self.records_since = ts
+
+            session = open_sessions.pop(app_id, None)
+            if session is None:
+                session = Session(app_id, ts)
+            open_sessions[app_id] = session  # most recently active last
+
+            stage, event = record.get("stage"), record.get("event")
+            if stage in TRANSITION_STAGES:
+                session.stages.append((stage, ts - session.last_ts))
+            session.last_ts = ts
+
+            payload = record.get("payload") or {}
+            if payload.get("loan_purpose"):
+                session.purpose = normalise_purpose(str(payload["loan_purpose"]))
+            if payload.get("recommended_loan_type"):
+                session.recommendation = normalise_loan_type(str(payload["recommended_loan_type"]))
+            if payload.get("decision") and stage == "underwriting_trigger":
+                session.decision = payload["decision"]
+
+            step = RECORD_STEPS.get((stage, event))
+            if step and STEP[step] > session.furthest:
+                session.furthest = STEP[step]
+
+            # The workflow is done: fold the session in now
+            if stage == "sanction_letter" or (stage == "underwriting_trigger" and event in ("rejected", "error")):
+                self._finish(open_sessions.pop(app_id))
+
+            # Close sessions that have gone quiet (records are time-ordered)
+            while open_sessions:
+                oldest = next(iter(open_sessions.values()))
+                if ts - oldest.last_ts < self.session_timeout:
+                    break
+                self._finish(open_sessions.popitem(last=False)[1])
+
+            if len(open_sessions) > self.stats["peak_open_sessions"]:
+                self.stats["peak_open_sessions"] = len(open_sessions)
+
+        self.stats["records"] += count
+
+    def finish(self):
+        """Fold in sessions still open at the end of the input (report() calls this)."""
+        for session in self._open_sessions.values():
+            self._finish(session)
+        self._open_sessions.clear()
+        if self._text_session:
+            self._finish(self._text_session, text=True)
+            self._text_session = None
+
+    # ---- files ----------------------------------------------------------
+
+    def feed_file(self, path, structured=None):
+        """A text log (.txt / .gz) or a JSONL segment; structured defaults by extension."""
+        if structured is None:
+            structured = path.endswith(".jsonl")
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rb") as f:
+            (self.feed_records if structured else self.feed_text)(f)
+            self.stats["bytes"] += f.tell()
+        self.stats["files"] += 1
+
+    # ---- report ---------------------------------------------------------
+
+    def report(self, top=10):
+        self.finish()
+        started = self.reached[0] or 1
+        funnel = []
+        for i, step in enumerate(FUNNEL):
+            previous = self.reached[i - 1] if i else self.reached[0]
+            funnel.append({
+                "step": step,
+                "sessions": self.reached[i],
+                "of_started_pct": round(100 * self.reached[i] / started, 1),
+                "of_previous_pct": round(100 * self.reached[i] / previous, 1) if previous else 0.0,
+            })
+
+        decided = sum(self.decisions.values()) or 1
+        return {
+            "sessions": self.sessions,
+            "skipped_duplicate_text_sessions": self.skipped_duplicates,
+            "from": _iso(self.first_ts),
+            "to": _iso(self.last_ts),
+            "funnel": funnel,
+            "decisions": {d: {"count": n, "pct": round(100 * n / decided, 1)}
+                          for d, n in self.decisions.most_common()},
+            "purposes": dict(self.purposes.most_common(top)),
+            "distinct_purposes": len(self.purposes),
+            "recommendations": dict(self.recommendations.most_common(top)),
+            "dwell": {stage: self.dwell[stage].summary()
+                      for stage in _STAGE_ORDER if stage in self.dwell},
+            "input": dict(self.stats),
+        }
+
+
+# "[ts] ROLE: content" or "[ts] [LEVEL] ROLE: content" for the milestone roles
+# only. Anchored on a literal newline rather than ^ so the regex engine can
+# jump between candidates (~2.5x faster); _chunks() starts every block with one
+_TEXT_LINE = re.compile(
+    rb"\n\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\] (?:\[[A-Z]+\] )?"
+    rb"(SYSTEM(?=: New session started)|USER|USER_PURPOSE|PURPOSE_CLASSIFIER|AI_RECOMMENDATION|"
+    rb"CLASSIFIER_RECOMMENDATION|AI_ERROR|PAN_SUBMITTED|VERIFICATION_SUCCESS|"
+    rb"UNDERWRITING_DECISION|DOCUMENT_VERIFICATION|SANCTION_GENERATED):[ \t]*([^\r\n]*)",
+)
+
+CHUNK_BYTES = 8 * 1024 * 1024
+
+
+def _chunks(f):
+    """Blocks of about CHUNK_BYTES, each starting with the newline before its first line."""
+    tail = b"\n"
+    while True:
+        block = f.read(CHUNK_BYTES)
+        if not block:
+            if len(tail) > 1:
+                yield tail
+            return
+        block = tail + block
+        cut = block.rfind(b"\n")
+        if not cut:
+            tail = block
+            continue
+        yield block[:cut]
+        tail = block[cut:]
+
+# Stages whose records close a dwell (everything after the greeting)
+_STAGE_ORDER = ["start_confirmation", "loan_purpose", "loan_type", "amount", "pan",
+                "verification_processing", "underwriting_trigger", "document_upload",
+                "document_verification", "sanction_letter"]
+TRANSITION_STAGES = set(_STAGE_ORDER)
+
+
+_HOUR_EPOCH = {}
+
+
+def _epoch(stamp):
+    # b"YYYY-mm-dd HH:MM:SS": one datetime per hour of log, then arithmetic
+    hour = stamp[:13]
+    base = _HOUR_EPOCH.get(hour)
+    if base is None:
+        base = _HOUR_EPOCH[hour] = datetime(
+            int(stamp[0:4]), int(stamp[5:7]), int(stamp[8:10]), int(stamp[11:13])
+        ).timestamp()
+    return base + int(stamp[14:16]) * 60 + int(stamp[17:19])
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts).isoformat(sep=" ", timespec="seconds") if ts is not None else None
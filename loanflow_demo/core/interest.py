@@ -1,5 +1,34 @@
 # core/interest.py
 
+from types import MappingProxyType
+
+from core import resources
+
+
+# Base rates by loan purpose
+PURPOSE_RATES = {
+    "Personal": 12.5,
+    "Home": 8.75,
+    "Business": 15.0,
+    "Education": 10.5,
+    "Medical": 11.5
+}
+
+resources.register("rate_cards", lambda: MappingProxyType(PURPOSE_RATES))
+
+
+def rate_card_for(app_data):
+    """
+    Rate card an application prices on: the chosen loan type, else a
+    purpose that names a card (batch rows), else None (the default rate).
+    """
+    cards = resources.get("rate_cards")
+    for key in ("loan_type", "loan_purpose"):
+        if app_data.get(key) in cards:
+            return app_data[key]
+    return None
+
+
 def calculate_base_interest_rate(
     tenure_months,
     employment_type="Salaried",
@@ -11,16 +40,7 @@ def calculate_base_interest_rate(
     Dynamic real-world prototype interest rate calculator.
     """
 
-    # Base rates by loan purpose
-    purpose_rates = {
-        "Personal": 12.5,
-        "Home": 8.75,
-        "Business": 15.0,
-        "Education": 10.5,
-        "Medical": 11.5
-    }
-
-    base_rate = purpose_rates.get(loan_purpose, 12.5)
+    base_rate = resources.get("rate_cards").get(loan_purpose, 12.5)
 
     # Employment-based adjustments
     if employment_type == "Self-Employed":
@@ -0,0 +1,37 @@
+# core/latency.py
+"""
+Latency profiles for simulated agent processing time.
+
+Production and tests run with no artificial delay. Demos can set
+LOANFLOW_LATENCY_PROFILE=demo (or fast) to make the agents look like they
+are working; the app renders those delays as a progress bar that reruns
+itself instead of sleeping on the script thread.
+"""
+
+import os
+
+
+# Seconds of simulated processing per workflow stage (waiting_for value)
+LATENCY_PROFILES = {
+    "off": {},
+    "fast": {
+        "verification_processing": 0.8,
+        "underwriting_trigger": 0.8,
+        "document_verification": 0.5,
+    },
+    "demo": {
+        "verification_processing": 3.0,
+        "underwriting_trigger": 3.0,
+        "document_verification": 2.0,
+    },
+}
+
+LATENCY_PROFILE = os.getenv("LOANFLOW_LATENCY_PROFILE", "off")
+
+# Progress bar refresh interval while a simulated delay is running
+PROGRESS_TICK_SECONDS = 0.25
+
+
+def simulated_delay(stage, profile=None):
+    """Seconds of simulated processing for a stage; 0 when none applies."""
+    return LATENCY_PROFILES.get(profile or LATENCY_PROFILE, {}).get(stage, 0.0)
@@ -0,0 +1,431 @@
+# core/metrics.py
+"""
+In-process metrics with Prometheus text exposition.
+
+Counters, gauges and histograms live in one registry; each metric keeps
+a value per label set behind its own lock, so updates from Streamlit
+script threads, the prefetch pool and the audit writer are safe and cost
+well under a microsecond. Existing stats (AI resilience, token usage,
+classifier, prefetch, caches, chat histories, audit writer, shared
+resources) are read at scrape time by collectors rather than counted
+twice; a collector only reports modules that are already loaded.
+
+The app starts a local HTTP endpoint alongside Streamlit
+(LOANFLOW_METRICS_PORT, default 9464; 0 disables):
+
+    curl -s localhost:9464/metrics
+"""
+
+import math
+import os
+import sys
+import threading
+import time
+from functools import wraps
+
+from core import resources
+
+
+METRICS_PORT = int(os.getenv("LOANFLOW_METRICS_PORT", "9464"))
+METRICS_HOST = os.getenv("LOANFLOW_METRICS_HOST", "127.0.0.1")
+
+# Seconds; spans in-memory steps (ms) to slow LLM calls and PDFs
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# ========================================
+# METRIC TYPES
+# ========================================
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if len(labels) != len(self.labels):
+            raise ValueError(f"{self.name} takes labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def samples(self):
+        """[(suffix, {label: value}, value)] for exposition."""
+        with self._lock:
+            items = list(self._values.items())
+        return [("", dict(zip(self.labels, key)), value) for key, value in items]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [per-bucket counts..., +Inf count, sum]
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            else:
+                state[len(self.buckets)] += 1
+            state[-1] += value
+
+    def time(self, **labels):
+        """Context manager observing the block's duration."""
+        return _Timer(self, labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+
+        out = []
+        for key, state in items:
+            labels = dict(zip(self.labels, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), state):
+                cumulative += count
+                out.append(("_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            out.append(("_sum", labels, state[-1]))
+            out.append(("_count", labels, cumulative))
+        return out
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+def timed(histogram, **labels):
+    """Decorator: observe each call's duration in `histogram`."""
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, **labels)
+        return wrapper
+    return decorate
+
+
+# ========================================
+# REGISTRY
+# ========================================
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help, labels, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labels, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"metric {name} is already registered as a {metric.type}")
+            return metric
+
+    def counter(self, name, help, labels=()):
+        return self._get_or_create(Counter, name, help, labels)
+
+    def gauge(self, name, help, labels=()):
+        return self._get_or_create(Gauge, name, help, labels)
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, help, labels, buckets=buckets)
+
+    def register_collector(self, collect):
+        """collect() -> iterable of (name, type, help, [({labels}, value)]), run per scrape."""
+        with self._lock:
+            self._collectors.append(collect)
+
+    def render(self):
+        """Every metric in the Prometheus text format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        for metric in metrics:
+            _render_family(lines, metric.name, metric.type, metric.help,
+                           [(metric.name + suffix, labels, value) for suffix, labels, value in metric.samples()])
+
+        for collect in collectors:
+            try:
+                families = list(collect())
+            except Exception as e:
+                print(f"⚠️ Metrics collector {getattr(collect, '__name__', collect)} failed: {e}", file=sys.stderr)
+                continue
+            for name, type_, help, samples in families:
+                _render_family(lines, name, type_, help, [(name, labels, value) for labels, value in samples])
+
+        return "\n".join(lines) + "\n"
+
+
+def _render_family(lines, name, type_, help, samples):
+    lines.append(f"# HELP {name} {help}")
+    lines.append(f"# TYPE {name} {type_}")
+    for sample_name, labels, value in samples:
+        if labels:
+            label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            lines.append(f"{sample_name}{{{label_text}}} {_format_value(value)}")
+        else:
+            lines.append(f"{sample_name} {_format_value(value)}")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    if value is None:
+        return "NaN"
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() and abs(value) < 1e15 else repr(value)
+    return str(int(value))
+
+
+REGISTRY = Registry()
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+register_collector = REGISTRY.register_collector
+render = REGISTRY.render
+
+
+# ========================================
+# APPLICATION METRICS
+# ========================================
+
+APPLICATIONS_STARTED = counter(
+    "loanflow_applications_started_total", "Applications that reached the greeting")
+APPLICATIONS_COMPLETED = counter(
+    "loanflow_applications_completed_total", "Applications that finished, by final outcome", ["outcome"])
+WORKFLOW_STEPS = counter(
+    "loanflow_workflow_steps_total", "Workflow steps completed, by stage and event", ["stage", "event"])
+WORKFLOW_STEP_SECONDS = histogram(
+    "loanflow_workflow_step_seconds", "Handler time per workflow step", ["stage"])
+DECISIONS = counter(
+    "loanflow_underwriting_decisions_total", "Underwriting decisions", ["decision"])
+BUREAU_SECONDS = histogram(
+    "loanflow_bureau_seconds", "PAN verification: bureau fetch plus CIBIL report")
+LLM_SECONDS = histogram(
+    "loanflow_llm_seconds", "LLM call duration", ["use_case", "outcome"])
+PDF_SECONDS = histogram(
+    "loanflow_pdf_seconds", "Sanction letter generation (PDF)")
+
+
+# ========================================
+# COLLECTORS (existing stats, read per scrape)
+# ========================================
+
+# name -> (module, function) of lru_caches whose hit ratio is exported
+CACHES = {
+    "stat_html": ("theme.layout", "stat_html"),
+    "purpose_fuzzy_lookup": ("core.purpose_classifier", "_fuzzy_lookup"),
+    "affordability_table": ("core.affordability", "affordability_table"),
+}
+
+
+def _loaded(module):
+    return sys.modules.get(module)
+
+
+def _cache_metrics():
+    hits, misses, sizes = [], [], []
+    for name, (module, attr) in CACHES.items():
+        fn = getattr(_loaded(module), attr, None)
+        if fn is None or not hasattr(fn, "cache_info"):
+            continue
+        info = fn.cache_info()
+        hits.append(({"cache": name}, info.hits))
+        misses.append(({"cache": name}, info.misses))
+        sizes.append(({"cache": name}, info.currsize))
+
+    prefetch = _loaded("ai.prefetch")
+    if prefetch:
+        stats = prefetch.prefetch_stats()
+        hits.append(({"cache": "ai_prefetch"}, stats["used"]))
+        misses.append(({"cache": "ai_prefetch"}, stats["missed"]))
+
+    yield "loanflow_cache_hits_total", "counter", "Cache hits", hits
+    yield "loanflow_cache_misses_total", "counter", "Cache misses", misses
+    yield "loanflow_cache_entries", "gauge", "Entries held per lru_cache", sizes
+
+
+def _session_metrics():
+    chat_history = _loaded("core.chat_history")
+    if not chat_history:
+        return
+    report = chat_history.memory_report()
+    yield "loanflow_active_sessions", "gauge", "Live chat sessions in this process", [({}, len(report))]
+    yield "loanflow_chat_history_bytes", "gauge", "Chat history bytes held in memory", [({}, sum(r["bytes"] for r in report))]
+
+
+def _ai_metrics():
+    resilience = _loaded("ai.resilience")
+    if resilience:
+        m = resilience.resilience_metrics()
+        breaker = m["breaker"]
+        yield "loanflow_llm_breaker_open", "gauge", "1 while the LLM circuit breaker is open", [
+            ({}, 1 if str(breaker.get("state", "")).lower() == "open" else 0)]
+        yield "loanflow_llm_resilience_events_total", "counter", "Deadline, hedge and hedge-win counts", [
+            ({"event": k}, v) for k, v in m["calls"].items()]
+
+    prompts = _loaded("ai.prompts")
+    if prompts:
+        usage = prompts.token_usage()
+        yield "loanflow_llm_tokens_total", "counter", "Estimated LLM tokens by use case", [
+            ({"use_case": use_case, "direction": direction}, entry.get(f"{direction}_tokens", 0))
+            for use_case, entry in usage.items() for direction in ("input", "output")]
+
+    classifier = _loaded("core.purpose_classifier")
+    if classifier:
+        stats = classifier.classifier_stats()
+        yield "loanflow_purpose_classifications_total", "counter", "Purpose classifications by path", [
+            ({"path": "local"}, stats["local"]), ({"path": "llm_fallback"}, stats["llm_fallback"])]
+
+    prefetch = _loaded("ai.prefetch")
+    if prefetch:
+        yield "loanflow_prefetch_total", "counter", "Speculative AI prefetches by result", [
+            ({"result": k}, v) for k, v in prefetch.prefetch_stats().items()]
+
+    async_client = _loaded("ai.async_client")
+    shared = getattr(async_client, "_shared_client", None)
+    if shared is not None:
+        yield "loanflow_async_llm_requests_total", "counter", "Async LLM client requests by kind", [
+            ({"kind": k}, v) for k, v in shared.stats.items()]
+
+
+def _runtime_metrics():
+    loggers = [(log, resources.get(name).stats()) for name, log in (("audit_log", "text"), ("audit_records", "records"))
+               if resources.is_loaded(name)]
+    if loggers:
+        yield "loanflow_audit_events_written_total", "counter", "Audit events written", [
+            ({"log": log}, stats["written"]) for log, stats in loggers]
+        yield "loanflow_audit_events_dropped_total", "counter", "Audit events dropped after repeated write failures", [
+            ({"log": log}, stats["dropped"]) for log, stats in loggers]
+        yield "loanflow_audit_queued", "gauge", "Audit events waiting for the writer", [
+            ({"log": log}, stats["queued"]) for log, stats in loggers]
+        yield "loanflow_audit_write_errors_total", "counter", "Failed audit batch writes", [
+            ({"log": log}, stats["errors"]) for log, stats in loggers]
+
+    status = resources.status()
+    yield "loanflow_resource_loaded", "gauge", "1 once a shared resource is built", [
+        ({"resource": name}, 1 if s["loaded"] else 0) for name, s in status.items()]
+    yield "loanflow_resource_build_seconds", "gauge", "Time taken to build each shared resource", [
+        ({"resource": name}, s["build_ms"] / 1000) for name, s in status.items() if s["build_ms"] is not None]
+
+
+for _collector in (_cache_metrics, _session_metrics, _ai_metrics, _runtime_metrics):
+    register_collector(_collector)
+
+
+# ========================================
+# HTTP ENDPOINT
+# ========================================
+
+def _handler_class():
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # scrapes every few seconds would flood the Streamlit console
+
+    return MetricsHandler
+
+
+def start_http_server(port=METRICS_PORT, host=METRICS_HOST):
+    """Serve /metrics on a daemon thread; returns the server, or None if disabled or the port is taken."""
+    if not port:
+        return None
+    # http.server is imported here, not at app start
+    from http.server import ThreadingHTTPServer
+
+    try:
+        server = ThreadingHTTPServer((host, port), _handler_class())
+    except OSError as e:
+        print(f"⚠️ Metrics endpoint not started on {host}:{port}: {e}", file=sys.stderr)
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def _close_server(server):
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+
+
+# One endpoint per process, however many sessions/reruns ask for it
+resources.register("metrics_server", start_http_server, close=_close_server)
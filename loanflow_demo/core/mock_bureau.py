@@ -1,6 +1,10 @@
 from datetime import datetime
+from types import MappingProxyType
 import random
 
+from core import resources
+from core.tracing import traced
+
 # Simulated PAN database (KYC + credit info)
 MOCK_PAN_DB = {
     "ABCDE1234F": {
@@ -71,11 +75,16 @@ MOCK_PAN_DB = {
     }
 }
 
+# Read-only view shared by every session (core/resources.py)
+resources.register("bureau_store", lambda: MappingProxyType(MOCK_PAN_DB))
+
+
 def fetch_pan_details(pan):
     """Fetch basic credit bureau data for a PAN"""
     pan = pan.upper().strip()
-    return MOCK_PAN_DB.get(pan)
+    return resources.get("bureau_store").get(pan)
 
+@traced("generate_cibil_report")
 def generate_cibil_report(bureau_data):
     """
     Generates a detailed CIBIL-style credit report based on bureau data
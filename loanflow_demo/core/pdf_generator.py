@@ -7,6 +7,72 @@ from reportlab.lib.enums import TA_CENTER
 from datetime import datetime
 import os
 
+from core import resources
+
+
+def _build_styles():
+    """Paragraph and table styles for the sanction letter (read-only once built)"""
+    styles = getSampleStyleSheet()
+    
+    details_table = TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#F3F4F6')),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('INNERGRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('BOX', (0, 0), (-1, -1), 1, colors.grey),
+        ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ('LEFTPADDING', (0, 0), (-1, -1), 10),
+    ])
+    
+    return {
+        "title": ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=18,
+            textColor=colors.HexColor('#2D7FF9'),
+            alignment=TA_CENTER,
+            spaceAfter=12,
+            fontName='Helvetica-Bold'
+        ),
+        "heading": ParagraphStyle(
+            'CustomHeading',
+            parent=styles['Heading2'],
+            fontSize=14,
+            textColor=colors.HexColor('#6366f1'),
+            spaceAfter=10,
+            spaceBefore=15,
+            fontName='Helvetica-Bold'
+        ),
+        "normal": ParagraphStyle(
+            'CustomNormal',
+            parent=styles['Normal'],
+            fontSize=11,
+            leading=14
+        ),
+        "footer": ParagraphStyle(
+            'Footer', parent=styles['Normal'],
+            fontSize=9, textColor=colors.grey, alignment=TA_CENTER
+        ),
+        "app_table": TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('TEXTCOLOR', (0, 0), (0, -1), colors.grey),
+            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ]),
+        "loan_table": details_table,
+        "credit_table": details_table,
+    }
+
+
+resources.register("pdf_styles", _build_styles)
+
+
 def generate_sanction_letter_pdf(data, filename=None):
     """
     Generates a professional sanction letter PDF
@@ -28,35 +94,11 @@ def generate_sanction_letter_pdf(data, filename=None):
     # Container for elements
     elements = []
     
-    # Styles
-    styles = getSampleStyleSheet()
-    
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        textColor=colors.HexColor('#2D7FF9'),
-        alignment=TA_CENTER,
-        spaceAfter=12,
-        fontName='Helvetica-Bold'
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=14,
-        textColor=colors.HexColor('#6366f1'),
-        spaceAfter=10,
-        spaceBefore=15,
-        fontName='Helvetica-Bold'
-    )
-    
-    normal_style = ParagraphStyle(
-        'CustomNormal',
-        parent=styles['Normal'],
-        fontSize=11,
-        leading=14
-    )
+    # Styles (built once per process)
+    styles = resources.get("pdf_styles")
+    title_style = styles["title"]
+    heading_style = styles["heading"]
+    normal_style = styles["normal"]
     
     # Header
     header = Paragraph("LOANFLOW AI", title_style)
@@ -73,14 +115,7 @@ def generate_sanction_letter_pdf(data, filename=None):
     ]
     
     app_table = Table(app_info, colWidths=[2*inch, 4*inch])
-    app_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('TEXTCOLOR', (0, 0), (0, -1), colors.grey),
-        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-    ]))
+    app_table.setStyle(styles["app_table"])
     elements.append(app_table)
     elements.append(Spacer(1, 0.3*inch))
     
@@ -113,19 +148,7 @@ def generate_sanction_letter_pdf(data, filename=None):
     ]
     
     loan_table = Table(loan_details, colWidths=[2.5*inch, 3.5*inch])
-    loan_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#F3F4F6')),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('INNERGRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ('BOX', (0, 0), (-1, -1), 1, colors.grey),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('LEFTPADDING', (0, 0), (-1, -1), 10),
-    ]))
+    loan_table.setStyle(styles["loan_table"])
     elements.append(loan_table)
     elements.append(Spacer(1, 0.2*inch))
     
@@ -141,27 +164,14 @@ def generate_sanction_letter_pdf(data, filename=None):
     ]
     
     credit_table = Table(credit_details, colWidths=[2.5*inch, 3.5*inch])
-    credit_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#F3F4F6')),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('INNERGRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ('BOX', (0, 0), (-1, -1), 1, colors.grey),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('LEFTPADDING', (0, 0), (-1, -1), 10),
-    ]))
+    credit_table.setStyle(styles["credit_table"])
     elements.append(credit_table)
     elements.append(Spacer(1, 0.3*inch))
     
     # Footer
     footer_text = Paragraph(
         "<i>Generated by LoanFlow AI | Demo for EY Techathon </i>",
-        ParagraphStyle('Footer', parent=styles['Normal'], 
-                      fontSize=9, textColor=colors.grey, alignment=TA_CENTER)
+        styles["footer"]
     )
     elements.append(Spacer(1, 0.5*inch))
     elements.append(footer_text)
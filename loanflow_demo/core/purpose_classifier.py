@@ -0,0 +1,195 @@
+# core/purpose_classifier.py
+"""
+Deterministic loan-purpose classifier.
+
+Maps free-text purposes ("wedding", "to start a new grocery shop") onto
+LOAN_TYPES keys using a precompiled alias trie plus bounded fuzzy matching
+for typos. The LLM is only needed when confidence is below
+CONFIDENCE_THRESHOLD.
+"""
+
+import re
+import threading
+from functools import lru_cache
+
+from core.utils import LOAN_TYPES
+
+
+CONFIDENCE_THRESHOLD = 0.6
+
+PURPOSE_ALIASES = {
+    "Home": [
+        "home", "house", "flat", "apartment", "property", "plot", "villa", "real estate",
+        "construction", "renovation", "home renovation", "home improvement", "housing",
+    ],
+    "Education": [
+        "education", "study", "studies", "higher studies", "study abroad", "college",
+        "university", "tuition", "fees", "school", "course", "degree", "masters", "mba",
+        "phd", "coaching",
+    ],
+    "Business": [
+        "business", "shop", "startup", "start up", "store", "expansion", "working capital",
+        "inventory", "machinery", "equipment", "office", "franchise", "restaurant",
+        "factory", "grocery shop", "new business",
+    ],
+    "Personal": [
+        "personal", "wedding", "marriage", "travel", "vacation", "holiday", "trip",
+        "medical", "hospital", "surgery", "treatment", "emergency", "gadget", "phone",
+        "laptop", "furniture", "debt consolidation", "car", "bike", "vehicle", "auto",
+    ],
+}
+
+STOPWORDS = {
+    "a", "an", "the", "to", "for", "of", "my", "our", "in", "on", "and", "i", "we",
+    "want", "need", "buy", "buying", "get", "new", "loan", "some", "me", "am", "is",
+}
+
+# Fuzzy hits count for less than exact alias hits
+EXACT_WEIGHT = 1.0
+FUZZY_WEIGHT = 0.7
+
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+
+def _build_trie(aliases):
+    """token -> nested dict; the '$' key holds (loan_type, phrase_length)."""
+    trie = {}
+    for loan_type, phrases in aliases.items():
+        if loan_type not in LOAN_TYPES:
+            continue
+        for phrase in phrases:
+            node = trie
+            tokens = phrase.split()
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node["$"] = (loan_type, len(tokens))
+    return trie
+
+
+_TRIE = _build_trie(PURPOSE_ALIASES)
+_VOCAB = tuple(sorted(word for word in _TRIE if word != "$"))
+
+
+def _within_distance(a, b, limit):
+    """Levenshtein distance <= limit, with early exit."""
+    if abs(len(a) - len(b)) > limit:
+        return False
+
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+
+@lru_cache(maxsize=4096)
+def _fuzzy_lookup(token):
+    """Closest single-word alias for a misspelt token, or None."""
+    if len(token) < 4:
+        return None
+    limit = 1 if len(token) <= 6 else 2
+    for word in _VOCAB:
+        if word[0] == token[0] and "$" in _TRIE[word] and _within_distance(token, word, limit):
+            return word
+    return None
+
+
+def classify_purpose(text):
+    """
+    Classify a loan purpose.
+    Returns {"loan_type", "confidence", "matches"}; loan_type is None when
+    nothing matched.
+    """
+    tokens = [t for t in _TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+    scores = {}
+    matches = []
+    covered = 0
+
+    i = 0
+    while i < len(tokens):
+        # Longest exact alias starting at i
+        node, hit, j = _TRIE, None, i
+        while j < len(tokens) and tokens[j] in node:
+            node = node[tokens[j]]
+            j += 1
+            if "$" in node:
+                hit = node["$"]
+
+        if hit:
+            loan_type, length = hit
+            scores[loan_type] = scores.get(loan_type, 0) + EXACT_WEIGHT * length
+            matches.append(" ".join(tokens[i:i + length]))
+            covered += length
+            i += length
+            continue
+
+        word = _fuzzy_lookup(tokens[i])
+        if word:
+            loan_type = _TRIE[word]["$"][0]
+            scores[loan_type] = scores.get(loan_type, 0) + FUZZY_WEIGHT
+            matches.append(f"{tokens[i]}~{word}")
+            covered += 1
+        i += 1
+
+    if not scores:
+        return {"loan_type": None, "confidence": 0.0, "matches": []}
+
+    best = max(scores, key=scores.get)
+    margin = scores[best] / sum(scores.values())
+    strength = min(1.0, scores[best])
+    coverage = covered / len(tokens)
+
+    return {
+        "loan_type": best,
+        "confidence": round(margin * strength * (0.5 + 0.5 * coverage), 3),
+        "matches": matches
+    }
+
+
+# ========================================
+# CLASSIFIER STATS
+# ========================================
+
+_stats = {"total": 0, "local": 0, "llm_fallback": 0, "confidence_sum": 0.0}
+_stats_lock = threading.Lock()
+
+
+def record_classification(confidence, used_llm):
+    """Record one classification outcome (local answer or LLM fallback)."""
+    with _stats_lock:
+        _stats["total"] += 1
+        _stats["confidence_sum"] += confidence
+        _stats["llm_fallback" if used_llm else "local"] += 1
+
+
+def classifier_stats():
+    """Snapshot: counts, fallback rate and mean confidence."""
+    with _stats_lock:
+        total = _stats["total"]
+        return {
+            "total": total,
+            "local": _stats["local"],
+            "llm_fallback": _stats["llm_fallback"],
+            "fallback_rate": round(_stats["llm_fallback"] / total, 4) if total else 0.0,
+            "mean_confidence": round(_stats["confidence_sum"] / total, 4) if total else 0.0,
+        }
+
+
+PURPOSE_BLURBS = {
+    "Home": "a **Home Loan** gives you the lowest rates and the longest tenures (up to 20 years), keeping EMIs light.",
+    "Education": "an **Education Loan** offers lower rates than a personal loan and tenures that run past your course.",
+    "Business": "a **Business Loan** is built for working capital and expansion, with repayment matched to cash flow.",
+    "Personal": "a **Personal Loan** is quick to disburse, needs no collateral and can be used for any need.",
+}
+
+
+def recommendation_message(purpose, loan_type):
+    """Chat reply for a locally classified purpose (mirrors the LLM format)."""
+    return (
+        f"For *{purpose}*, {PURPOSE_BLURBS[loan_type]}\n\n"
+        f"RECOMMENDED: {loan_type}"
+    )
@@ -0,0 +1,132 @@
+# core/resources.py
+"""
+Process-wide resource cache.
+
+Heavy objects (LLM clients, API keys read from secrets, the bureau store,
+rate cards, PDF styles, ...) are registered with a factory and built on
+first use, once per process, then shared by every Streamlit session and
+thread. Shared instances must be treated as read-only.
+
+Lifecycle: register() -> get() (or warm_up() at server start) -> close()
+(called for every loaded resource at interpreter exit).
+"""
+
+import atexit
+import importlib
+import threading
+import time
+
+
+_factories = {}
+_closers = {}
+_instances = {}
+_build_seconds = {}
+_lock = threading.RLock()
+_warm_up_thread = None
+
+
+def register(name, factory, close=None):
+    """
+    Register a zero-argument factory for a named resource, with an
+    optional close(instance) hook run by close()/reset().
+    """
+    with _lock:
+        _factories[name] = factory
+        if close:
+            _closers[name] = close
+
+
+def get(name):
+    """Return the shared instance, building it on first use."""
+    try:
+        return _instances[name]
+    except KeyError:
+        pass
+
+    with _lock:
+        if name not in _instances:
+            if name not in _factories:
+                raise KeyError(f"Unknown resource: {name}")
+            start = time.perf_counter()
+            _instances[name] = _factories[name]()
+            _build_seconds[name] = time.perf_counter() - start
+        return _instances[name]
+
+
+def build(name):
+    """A fresh, unshared instance from the registered factory."""
+    with _lock:
+        factory = _factories[name]
+    return factory()
+
+
+def is_loaded(name):
+    return name in _instances
+
+
+def warm_up(names=None, modules=(), background=False):
+    """
+    Build resources ahead of the first request. modules are imported first
+    so the factories they register are known; names defaults to every
+    registered resource. Returns {name: build seconds}, or the warm-up
+    thread when background=True (started once per process).
+    """
+    global _warm_up_thread
+
+    def build():
+        for module in modules:
+            importlib.import_module(module)
+        timings = {}
+        for name in names or list(_factories):
+            try:
+                get(name)
+            except Exception:
+                continue  # it will raise again, in context, on first real use
+            timings[name] = _build_seconds.get(name, 0.0)
+        return timings
+
+    if not background:
+        return build()
+
+    with _lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(target=build, name="resource-warm-up", daemon=True)
+            _warm_up_thread.start()
+        return _warm_up_thread
+
+
+def status():
+    """{name: {"loaded", "build_ms"}} for every registered resource."""
+    with _lock:
+        return {
+            name: {
+                "loaded": name in _instances,
+                "build_ms": round(_build_seconds[name] * 1000, 2) if name in _build_seconds else None,
+            }
+            for name in _factories
+        }
+
+
+def reset(name=None):
+    """Close and drop one (or every) cached instance so the next get() rebuilds it."""
+    with _lock:
+        names = list(_instances) if name is None else [name]
+        for n in names:
+            if n not in _instances:
+                continue
+            instance = _instances.pop(n)
+            _build_seconds.pop(n, None)
+            closer = _closers.get(n)
+            if closer:
+                try:
+                    closer(instance)
+                except Exception:
+                    pass
+
+
+def close():
+    """Release every loaded resource (server shutdown)."""
+    reset()
+
+
+atexit.register(close)
@@ -0,0 +1,316 @@
+# core/tracing.py
+"""
+Lightweight tracing for the agent pipeline.
+
+Spans wrap the bureau fetch, CIBIL report, underwriting, LLM calls
+(blocking, streamed and coalesced), document check and sanction letter
+(see @traced in the agents and ai/), nested under one "workflow.<stage>"
+span per WorkflowEngine step. Every span carries the application ID, and
+all spans of an application share one trace ID derived from it, so a slow
+application reads as a single trace.
+
+Exporters (LOANFLOW_TRACE):
+    off     no spans are created (default); a traced call costs one flag check
+    file    OpenTelemetry OTLP/JSON, one ExportTraceServiceRequest per line,
+            appended to LOANFLOW_TRACE_FILE by a background writer
+            (core/audit.py's AuditLogger); the OTel collector's
+            otlpjsonfile receiver and most trace viewers read it as is
+    memory  finished spans kept in a bounded in-process buffer
+            (finished_spans()), for tests and benchmarks
+
+No Streamlit or OpenTelemetry SDK dependency.
+"""
+
+import contextvars
+import functools
+import hashlib
+import json
+import os
+import secrets
+import time
+from collections import deque
+
+from core import resources
+
+
+TRACE_MODE = os.getenv("LOANFLOW_TRACE", "off")
+TRACE_FILE = os.getenv("LOANFLOW_TRACE_FILE", "traces.jsonl")
+MEMORY_SPANS = 10_000
+
+SERVICE_NAME = "loanflow"
+TRACE_MODES = ("off", "file", "memory")
+
+# OTLP enums
+SPAN_KIND_INTERNAL = 1
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_enabled = False
+_exporter = None
+
+# (trace_id, span_id, application_id) of the innermost open span
+_current = contextvars.ContextVar("loanflow_span", default=None)
+
+
+# ========================================
+# SPANS
+# ========================================
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "application_id",
+                 "attributes", "start_ns", "end_ns", "error", "_token")
+
+    def __init__(self, name, attributes, application_id=None):
+        parent = _current.get()
+        if application_id is None and parent is not None:
+            application_id = parent[2]
+
+        if parent is not None and (application_id is None or application_id == parent[2]):
+            self.trace_id, self.parent_id = parent[0], parent[1]
+        else:
+            self.trace_id, self.parent_id = trace_id_for(application_id), None
+
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.application_id = application_id
+        self.attributes = attributes
+        if application_id is not None:
+            attributes["loanflow.application_id"] = application_id
+        self.error = None
+        self.start_ns = self.end_ns = None
+        self._token = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def __enter__(self):
+        self._token = _current.set((self.trace_id, self.span_id, self.application_id))
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.reset(self._token)
+        self.end(f"{exc_type.__name__}: {exc}" if exc is not None else None)
+        return False
+
+    def end(self, error=None):
+        """Finish and export the span (once)."""
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if error:
+            self.error = error
+        if _exporter is not None:
+            _exporter.export(self)
+
+    def to_otlp(self):
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": STATUS_ERROR, "message": self.error} if self.error else {"code": STATUS_OK},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+    @property
+    def duration_ms(self):
+        return (self.end_ns - self.start_ns) / 1e6 if self.end_ns else None
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set_attribute(self, key, value):
+        pass
+
+    def end(self, error=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def trace_id_for(application_id):
+    """All spans of one application share a trace; other work gets a fresh one."""
+    if application_id is None:
+        return secrets.token_hex(16)
+    return hashlib.md5(str(application_id).encode("utf-8")).hexdigest()
+
+
+def _otlp_attribute(key, value):
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def span(name, application_id=None, **attributes):
+    """
+    Context manager for one span. application_id starts (or continues) that
+    application's trace; nested spans inherit it.
+    """
+    if not _enabled:
+        return _NOOP
+    return Span(name, attributes, application_id)
+
+
+def start_span(name, application_id=None, **attributes):
+    """
+    A started span that is not made current, for work that ends somewhere
+    else (a generator closed by its consumer): call end() exactly where it
+    finishes, e.g. in a finally block. Spans started meanwhile do not nest
+    under it.
+    """
+    if not _enabled:
+        return _NOOP
+    span = Span(name, attributes, application_id)
+    span.start_ns = time.time_ns()
+    return span
+
+
+def traced(name=None):
+    """Decorator: run the function inside a span (one flag check when tracing is off)."""
+    def decorate(fn):
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with Span(span_name, {"code.function": fn.__qualname__, "code.namespace": fn.__module__}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def current_span_ids():
+    """(trace_id, span_id) of the innermost open span, or None."""
+    current = _current.get()
+    return current[:2] if current else None
+
+
+# ========================================
+# EXPORTERS
+# ========================================
+
+class MemoryExporter:
+    """Keeps the newest `limit` finished spans."""
+
+    def __init__(self, limit=MEMORY_SPANS):
+        self.spans = deque(maxlen=limit)
+
+    def export(self, span):
+        self.spans.append(span)
+
+    def close(self):
+        pass
+
+
+class OtlpJsonFile:
+    """AuditLogger sink: each batch becomes one OTLP/JSON ExportTraceServiceRequest line."""
+
+    def __init__(self, path=TRACE_FILE):
+        self.path = path
+        self.rotations = 0
+        self._file = None
+
+    def write_batch(self, events):
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+
+        request = {"resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+            "scopeSpans": [{
+                "scope": {"name": "loanflow.tracing"},
+                "spans": [span.to_otlp() for _, span in events],
+            }],
+        }]}
+        self._file.write(json.dumps(request, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class FileExporter:
+    """Queues finished spans for a background OTLP/JSON writer."""
+
+    def __init__(self, path=TRACE_FILE):
+        from core.audit import AuditLogger
+        self.logger = AuditLogger(OtlpJsonFile(path))
+
+    def export(self, span):
+        self.logger.log(span)
+
+    def flush(self):
+        self.logger.flush()
+
+    def close(self):
+        self.logger.close()
+
+
+def _build_exporter():
+    if _mode == "file":
+        return FileExporter(_path)
+    return MemoryExporter()
+
+
+_mode = TRACE_MODE
+_path = TRACE_FILE
+
+resources.register("trace_exporter", _build_exporter, close=lambda exporter: exporter.close())
+
+
+def configure(mode, path=None):
+    """Switch tracing at runtime: "off", "file" or "memory"."""
+    global _enabled, _exporter, _mode, _path
+    if mode not in TRACE_MODES:
+        raise ValueError(f"trace mode must be one of {TRACE_MODES}, not {mode!r}")
+
+    _enabled = False
+    _exporter = None
+    resources.reset("trace_exporter")  # flushes and closes the previous exporter
+    _mode, _path = mode, path or TRACE_FILE
+    if mode != "off":
+        _exporter = resources.get("trace_exporter")
+        _enabled = True
+
+
+def is_enabled():
+    return _enabled
+
+
+def finished_spans():
+    """Spans held by the memory exporter (oldest first)."""
+    return list(_exporter.spans) if isinstance(_exporter, MemoryExporter) else []
+
+
+def flush():
+    if hasattr(_exporter, "flush"):
+        _exporter.flush()
+
+
+if TRACE_MODE != "off":
+    configure(TRACE_MODE)
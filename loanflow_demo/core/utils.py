@@ -1,6 +1,9 @@
+import json
+import os
 import re
-from datetime import datetime
-import streamlit as st
+import time
+from collections import deque
+
 # ==================== LOAN TYPES ====================
 LOAN_TYPES = {
     "Personal": {"base_rate": 12.5, "min_tenure": 6, "max_tenure": 60},
@@ -22,6 +25,60 @@ def get_interest_rate(loan_type, tenure, credit_score, employment="Salaried"):
     elif tenure <= 12: base_rate += 0.25
     return round(base_rate, 2)
 
-def log_action(action):
-    timestamp = datetime.now().strftime("%H:%M:%S")
-    st.session_state.logs.append(f"[{timestamp}] {action}")
\ No newline at end of file
+# ==================== ACTION LOG ====================
+ACTION_LOG_CAPACITY = int(os.getenv("LOANFLOW_ACTION_LOG_CAPACITY", "1024"))
+
+
+class ActionLog:
+    """
+    Fixed-capacity ring buffer of (monotonic ts, action, payload) entries
+    for one application (each ApplicationContext owns one, so concurrent
+    sessions never mix). append() is O(1); once full, the oldest entry is
+    overwritten and counted in `dropped`. drain() empties it into the audit
+    log, tagged with the application ID. No Streamlit state, so batch jobs
+    and threads can use it too.
+    """
+
+    def __init__(self, application_id=None, capacity=ACTION_LOG_CAPACITY):
+        self.application_id = application_id
+        self.capacity = capacity
+        self.dropped = 0
+        self._entries = deque(maxlen=capacity)
+
+    def append(self, action, payload=None):
+        if len(self._entries) == self.capacity:
+            self.dropped += 1
+        self._entries.append((time.monotonic(), action, payload))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(list(self._entries))
+
+    def drain(self, sink=None):
+        """
+        Remove every entry (oldest first) and pass them to
+        sink(application_id, entries); the default sink writes them to the
+        audit log with their wall-clock time. Returns the drained entries.
+        """
+        entries = []
+        while self._entries:
+            try:
+                entries.append(self._entries.popleft())
+            except IndexError:  # emptied by another thread
+                break
+        if entries:
+            (sink or _audit_sink)(self.application_id, entries)
+        return entries
+
+
+def _audit_sink(application_id, entries):
+    from core.audit import get_logger
+
+    logger = get_logger()
+    offset = time.time() - time.monotonic()
+    prefix = f"{application_id} " if application_id else ""
+    for ts, action, payload in entries:
+        content = action if payload is None else f"{action} {json.dumps(payload, default=str)}"
+        logger.log_at(ts + offset, "INFO", "ACTION", prefix + content)
@@ -0,0 +1,31 @@
+import csv
+import io
+
+from ai.batch import BatchExplainer
+from tools.batch_explain import StreamingWriter, read_rows
+
+
+def test_malformed_row_is_reported_and_batch_continues(tmp_path):
+    path = tmp_path / "applicants.csv"
+    path.write_text(
+        "loan_amount,tenure,credit_score,existing_emi,monthly_salary\n"
+        "300000,36,780,5000,85000\n"
+        "250000,24,760,0,\n"
+        "abc,24,760,0,50000\n"
+        "200000,24,790,0,60000\n",
+        encoding="utf-8",
+    )
+
+    out = io.StringIO()
+    writer = StreamingWriter(out, "csv")
+    explainer = BatchExplainer(polish=False)
+    for app, explanation in explainer.run(read_rows(str(path))):
+        writer.write(app, explanation)
+
+    rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+    assert [row["loan_amount"] for row in rows] == ["300000", "250000", "abc", "200000"]
+    assert rows[0]["decision"] and rows[0]["explanation"] and not rows[0]["error"]
+    assert "monthly_salary" in rows[1]["error"] and not rows[1]["explanation"]
+    assert "loan_amount" in rows[2]["error"]
+    assert rows[3]["decision"] and not rows[3]["error"]
+    assert explainer.stats["invalid"] == 2
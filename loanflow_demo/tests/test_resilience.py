@@ -0,0 +1,82 @@
+import time
+from types import SimpleNamespace
+
+from ai import groq_client, resilience
+from ai.resilience import CircuitBreaker
+
+
+def _chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class _StreamingClient:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        if self.fail:
+            raise ConnectionError("upstream down")
+        return iter([_chunk("Hello"), _chunk(" there")])
+
+
+def _half_open_breaker(monkeypatch, client):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    monkeypatch.setattr(groq_client, "breaker", breaker)
+    monkeypatch.setattr(groq_client, "get_client", lambda: client)
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    return breaker
+
+
+def test_closing_half_open_stream_early_releases_probe(monkeypatch):
+    breaker = _half_open_breaker(monkeypatch, _StreamingClient())
+
+    stream = groq_client.stream_llama_response("hi")
+    assert next(stream) == "Hello"
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    stream.close()
+
+    # The abandoned probe gave its slot back: the next call goes upstream
+    assert "".join(groq_client.stream_llama_response("hi")) == "Hello there"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_half_open_stream_reopens_breaker(monkeypatch):
+    client = _StreamingClient(fail=True)
+    breaker = _half_open_breaker(monkeypatch, client)
+
+    assert list(groq_client.stream_llama_response("hi")) == [groq_client.FALLBACK_RESPONSES["default"]]
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+class _TricklingClient:
+    def __init__(self, pause):
+        self.pause = pause
+        self.closed = False
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        def chunks():
+            try:
+                for text in ["Hello", " there", " again"]:
+                    yield _chunk(text)
+                    time.sleep(self.pause)
+            finally:
+                self.closed = True
+        return chunks()
+
+
+def test_stream_past_deadline_is_closed_and_counted(monkeypatch):
+    client = _TricklingClient(pause=0.06)
+    breaker = CircuitBreaker(failure_threshold=1)
+    monkeypatch.setattr(groq_client, "breaker", breaker)
+    monkeypatch.setattr(groq_client, "get_client", lambda: client)
+    exceeded = resilience.counters["deadline_exceeded"]
+
+    # Each chunk arrives well within a read timeout; the whole call does not
+    assert "".join(groq_client.stream_llama_response("hi", deadline=0.1)) == "Hello there"
+    assert client.closed
+    assert breaker.state == CircuitBreaker.OPEN
+    assert resilience.counters["deadline_exceeded"] == exceeded + 1
@@ -0,0 +1,66 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from ai import async_client, groq_client
+from ai.resilience import CircuitBreaker
+from core import tracing
+from tests.test_resilience import _StreamingClient
+
+
+@pytest.fixture
+def spans(monkeypatch):
+    monkeypatch.setattr(groq_client, "breaker", CircuitBreaker())
+    monkeypatch.setattr(async_client, "breaker", CircuitBreaker())
+    tracing.configure("memory")
+    yield lambda name: [s for s in tracing.finished_spans() if s.name == name]
+    tracing.configure("off")
+
+
+class _SlowAsyncClient:
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        await asyncio.sleep(0.2)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Reply"))])
+
+
+def test_stream_span_is_exported_when_finished_or_abandoned(monkeypatch, spans):
+    monkeypatch.setattr(groq_client, "get_client", lambda: _StreamingClient())
+
+    with tracing.span("workflow.loan_purpose", application_id="LF000001"):
+        assert "".join(groq_client.stream_llama_response("hi", use_case="loan_purpose")) == "Hello there"
+
+    stream = groq_client.stream_llama_response("hi", use_case="loan_purpose")
+    next(stream)
+    stream.close()
+
+    finished, abandoned = spans("stream_llama_response")
+    parent, = spans("workflow.loan_purpose")
+    assert finished.attributes["loanflow.outcome"] == "ok"
+    assert finished.parent_id == parent.span_id
+    assert finished.attributes["loanflow.application_id"] == "LF000001"
+    assert abandoned.attributes["loanflow.outcome"] == "abandoned"
+    assert abandoned.end_ns is not None
+
+
+def test_coalesced_calls_are_traced(monkeypatch, spans):
+    monkeypatch.setattr(async_client, "_shared_client", async_client.AsyncLlamaClient(client=_SlowAsyncClient()))
+
+    results = []
+    callers = [
+        threading.Thread(target=lambda: results.append(async_client.get_llama_response_coalesced("same prompt")))
+        for _ in range(2)
+    ]
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join()
+
+    assert results == ["Reply", "Reply"]
+    traced = spans("get_llama_response_coalesced")
+    assert len(traced) == 2
+    assert sorted(s.attributes["loanflow.coalesced"] for s in traced) == [False, True]
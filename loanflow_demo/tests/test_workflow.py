@@ -0,0 +1,156 @@
+import pytest
+
+from agents import workflow
+from agents.workflow import (
+    ApplicationContext, WorkflowEngine, INPUT_STATES, JOURNEY, TRANSITIONS
+)
+from ai import explain
+
+
+BUREAU = {
+    "ABCDE1234F": {"name": "Asha Rao", "credit_score": 780, "existing_emi": 5000,
+                   "preapproved_limit": 500000, "monthly_income": 85000},
+    "PQRST9876Y": {"name": "Amit Joshi", "credit_score": 590, "existing_emi": 12000,
+                   "preapproved_limit": 100000, "monthly_income": 40000},
+    "LMNOP4321Q": {"name": "Ravi Iyer", "credit_score": 760, "existing_emi": 30000,
+                   "preapproved_limit": 400000, "monthly_income": 45000},
+}
+
+SALARY_SLIP = {**JOURNEY, "amount": {"loan_amount": 600000, "tenure": 36}}
+REJECTION = {**JOURNEY, "pan": {"pan": "PQRST9876Y"}}
+
+
+def _bureau(pan):
+    data = BUREAU.get(pan)
+    return (dict(data), "CIBIL REPORT") if data else (None, None)
+
+
+def _no_document(document):
+    return (False, "No document uploaded.") if document is None else (True, "Document verified successfully.")
+
+
+@pytest.fixture
+def taken(monkeypatch):
+    """(state, event) pairs taken by every engine the test builds."""
+    monkeypatch.setattr(explain, "LLM_POLISH", False)
+    return set()
+
+
+@pytest.fixture
+def engine(taken):
+    def build(**agents):
+        agents = {"verify_pan": _bureau, "verify_document": _no_document,
+                  "sanction": lambda data: "SANCTION LETTER", **agents}
+        return WorkflowEngine(
+            recommend=lambda built: "RECOMMENDED: Home Loan",
+            record=lambda application_id, state, event, latency_ms, changed: taken.add((state, event)),
+            **agents,
+        )
+    return build
+
+
+def _messages(ctx):
+    return [record.content for record in ctx.drain() if record.type == "message"]
+
+
+def test_instant_approval_is_sanctioned(engine):
+    sanctioned = []
+    eng = engine(sanction=lambda data: sanctioned.append(data) or "SANCTION LETTER")
+    ctx = eng.run(ApplicationContext(), JOURNEY)
+
+    assert ctx.done
+    assert ctx.app_data["decision"] == "APPROVED"
+    assert sanctioned[0]["application_id"] == ctx.application_id
+    assert any(record.type == "sanction" for record in ctx.drain())
+
+
+def test_low_score_is_rejected_with_its_reason(engine):
+    ctx = engine().run(ApplicationContext(), REJECTION)
+
+    assert ctx.done
+    assert ctx.app_data["decision"] == "REJECTED"
+    assert "590" in _messages(ctx)[-1]
+
+
+def test_salary_slip_then_approval(engine):
+    eng = engine()
+    ctx = ApplicationContext()
+    eng.run(ctx, {k: v for k, v in SALARY_SLIP.items() if k != "document_upload"})
+
+    assert ctx.state == "document_upload"
+    assert ctx.app_data["decision"] == "NEED_SALARY_SLIP"
+
+    eng.run(ctx, SALARY_SLIP)
+    assert ctx.done
+    assert ctx.app_data["decision"] == "APPROVED"
+
+
+def test_context_round_trips_mid_journey(engine):
+    eng = engine()
+    ctx = ApplicationContext()
+    eng.run(ctx, {k: v for k, v in SALARY_SLIP.items() if k != "document_upload"})
+
+    restored = ApplicationContext.from_dict(ctx.to_dict())
+    assert restored.to_dict() == ctx.to_dict()
+    assert not restored.outbox and not restored.transient
+
+    eng.run(restored, SALARY_SLIP)
+    assert restored.done
+    assert restored.app_data["decision"] == "APPROVED"
+
+
+@pytest.mark.parametrize("state", sorted(INPUT_STATES))
+def test_input_state_without_input_is_refused(engine, state):
+    ctx = ApplicationContext(state=state)
+    with pytest.raises(ValueError):
+        engine().step(ctx)
+    assert ctx.state == state and ctx.transitions == 0
+
+
+def test_invalid_input_stays_or_goes_back(engine):
+    eng = engine()
+    ctx = ApplicationContext()
+    eng.advance(ctx)
+
+    assert eng.step(ctx, {"text": "not now"}) == "declined"
+    assert ctx.state == "start_confirmation"
+
+    eng.run(ctx, {k: v for k, v in JOURNEY.items() if k != "pan"})
+    assert eng.step(ctx, {"pan": "ABC123"}) == "invalid"
+    assert ctx.state == "pan" and "pan" not in ctx.app_data
+
+    # A PAN the bureau doesn't know sends the applicant back to re-enter it
+    eng.step(ctx, {"pan": "ZZZZZ0000Z"})
+    assert eng.step(ctx) == "failed"
+    assert ctx.state == "pan"
+
+    ctx = eng.run(ApplicationContext(), {k: v for k, v in SALARY_SLIP.items() if k != "document_upload"})
+    eng.step(ctx, {"document": None})
+    assert eng.step(ctx) == "failed"
+    assert ctx.state == "document_upload"
+
+
+def test_every_transition_is_reachable(engine, taken, monkeypatch):
+    def down(*args, **kwargs):
+        raise RuntimeError("agent down")
+
+    # Journeys that end
+    engine().run(ApplicationContext(), JOURNEY)
+    engine().run(ApplicationContext(), REJECTION)
+    engine().run(ApplicationContext(), SALARY_SLIP)
+    # FOIR over 50% once the salary slip is in: the sanction step declines
+    engine().run(ApplicationContext(), {**SALARY_SLIP, "pan": {"pan": "LMNOP4321Q"}})
+    engine(sanction=down).run(ApplicationContext(), JOURNEY)
+
+    # Journeys that loop back for input (cut off by max_steps)
+    engine().run(ApplicationContext(), {**JOURNEY, "start_confirmation": {"text": "later"}}, max_steps=2)
+    engine().run(ApplicationContext(), {**JOURNEY, "pan": {"pan": "bad"}}, max_steps=8)
+    engine().run(ApplicationContext(), {**JOURNEY, "pan": {"pan": "ZZZZZ0000Z"}}, max_steps=8)
+    engine().run(ApplicationContext(), {**SALARY_SLIP, "document_upload": {"document": None}}, max_steps=8)
+    engine(verify_pan=down).run(ApplicationContext(), JOURNEY, max_steps=8)
+    engine(verify_document=down).run(ApplicationContext(), SALARY_SLIP, max_steps=8)
+
+    monkeypatch.setattr(workflow, "run_underwriting", down)
+    engine().run(ApplicationContext(), JOURNEY)
+
+    assert taken == {(state, event) for state, events in TRANSITIONS.items() for event in events}
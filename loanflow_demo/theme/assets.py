@@ -0,0 +1,131 @@
+# theme/assets.py
+"""
+Theme asset pipeline.
+
+theme/style.css, the load_theme rules and theme/app.css are merged (later
+sources override earlier ones per selector and property), minified and
+content-hashed once per process. Streamlit drops elements a rerun does not
+re-emit, so the page must reference the bundle on every rerun: with static
+serving enabled (server.enableStaticServing) that is a ~80-byte <link> to
+static/loanflow.<hash>.css, which the browser fetches and caches once;
+otherwise the minified bundle is inlined. The <link> needs Streamlit >= 1.66
+(requirements.txt): older static routes serve .css as text/plain with
+nosniff, and the browser refuses the stylesheet.
+"""
+
+import hashlib
+import os
+import re
+from functools import lru_cache
+
+import streamlit as st
+
+from theme.theme import THEME_CSS
+
+
+THEME_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(THEME_DIR)
+STATIC_DIR = os.path.join(APP_DIR, "static")
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+_SPACE_RE = re.compile(r"\s+")
+_PUNCT_RE = re.compile(r"\s*([{}:;,>])\s*")
+
+
+def _read(name):
+    with open(os.path.join(THEME_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def css_sources():
+    """CSS sources in cascade order (later wins)."""
+    return [_read("style.css"), THEME_CSS, _read("app.css")]
+
+
+def _squeeze(text):
+    text = _SPACE_RE.sub(" ", text).strip()
+    return _PUNCT_RE.sub(r"\1", text)
+
+
+def _blocks(css):
+    """Yield (prelude, body) for each top-level block; nested braces kept in body."""
+    css = _COMMENT_RE.sub("", css)
+    i = 0
+    while True:
+        open_at = css.find("{", i)
+        if open_at < 0:
+            return
+        depth, j = 1, open_at + 1
+        while depth and j < len(css):
+            depth += {"{": 1, "}": -1}.get(css[j], 0)
+            j += 1
+        yield css[i:open_at].strip(), css[open_at + 1:j - 1]
+        i = j
+
+
+def merge_css(sources):
+    """
+    Merge stylesheets into one minified string. Rules with the same selector
+    are merged property by property; at-rules (@keyframes, @media) with the
+    same prelude are replaced whole. First-seen order is kept.
+    """
+    rules = {}
+
+    for css in sources:
+        for prelude, body in _blocks(css):
+            selector = _squeeze(prelude)
+            if selector.startswith("@"):
+                rules[selector] = _squeeze(body)
+                continue
+
+            props = rules.setdefault(selector, {})
+            for decl in body.split(";"):
+                if ":" in decl:
+                    name, value = decl.split(":", 1)
+                    props[name.strip()] = _squeeze(value)
+
+    out = []
+    for selector, body in rules.items():
+        if isinstance(body, dict):
+            body = ";".join(f"{name}:{value}" for name, value in body.items())
+        out.append(f"{selector}{{{body}}}")
+    return "".join(out)
+
+
+@lru_cache(maxsize=1)
+def css_bundle():
+    """{"css", "hash", "filename"} for the merged theme; built once per process."""
+    css = merge_css(css_sources())
+    digest = hashlib.sha256(css.encode("utf-8")).hexdigest()[:12]
+    return {"css": css, "hash": digest, "filename": f"loanflow.{digest}.css"}
+
+
+@lru_cache(maxsize=1)
+def publish_static():
+    """Write the bundle to static/ (once); False if it can't be written."""
+    bundle = css_bundle()
+    path = os.path.join(STATIC_DIR, bundle["filename"])
+    if os.path.exists(path):
+        return True
+
+    try:
+        os.makedirs(STATIC_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(bundle["css"])
+        os.replace(tmp, path)
+        return True
+    except OSError:
+        return False
+
+
+def theme_html():
+    """The markup that applies the theme on a rerun."""
+    bundle = css_bundle()
+    if st.get_option("server.enableStaticServing") and publish_static():
+        return f'<link rel="stylesheet" href="app/static/{bundle["filename"]}">'
+    return f"<style>{bundle['css']}</style>"
+
+
+def inject_theme():
+    st.markdown(theme_html(), unsafe_allow_html=True)
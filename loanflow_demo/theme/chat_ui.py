@@ -2,15 +2,33 @@
 
 import streamlit as st
 
+from theme.layout import loading_html
+
 def render_chat_message(role, content, message_type="text"):
     """
     Render a chat message bubble
     role: 'user', 'agent', 'system'
     message_type: 'text', 'widget', 'report'
+    content: agent content may also be an iterable of text chunks (streamed)
+    """
+    
+    if role == "agent" and not isinstance(content, str):
+        return stream_agent_message(content)
+    
+    html = message_html(role, content)
+    if html:
+        st.markdown(html, unsafe_allow_html=True)
+
+
+def message_html(role, content):
+    """
+    Bubble HTML for one message. Not cached here: chat text (PAN, salary)
+    must not outlive its session, so the history keeps each record's
+    HTML on the record itself (ChatHistory.set_html).
     """
     
     if role == "user":
-        st.markdown(f"""
+        return f"""
         <div style='
             background: linear-gradient(135deg, #6366f1, #8b5cf6);
             color: white;
@@ -23,26 +41,13 @@ def render_chat_message(role, content, message_type="text"):
             <div style='font-weight: 500;'>👤 You</div>
             <div style='margin-top: 5px;'>{content}</div>
         </div>
-        """, unsafe_allow_html=True)
+        """
     
     elif role == "agent":
-        st.markdown(f"""
-        <div style='
-            background: rgba(139, 92, 246, 0.2);
-            border-left: 4px solid #8b5cf6;
-            color: #E8EAED;
-            padding: 15px 20px;
-            border-radius: 18px;
-            margin: 10px 40% 10px 0;
-            animation: fadeIn 0.3s;
-        '>
-            <div style='font-weight: 600; color: #8b5cf6;'>🤖 Agent Finn</div>
-            <div style='margin-top: 5px;'>{content}</div>
-        </div>
-        """, unsafe_allow_html=True)
+        return _agent_bubble(content)
     
     elif role == "system":
-        st.markdown(f"""
+        return f"""
         <div style='
             background: rgba(16, 185, 129, 0.15);
             border: 1px solid rgba(16, 185, 129, 0.3);
@@ -56,7 +61,44 @@ def render_chat_message(role, content, message_type="text"):
         '>
             ⚙️ {content}
         </div>
-        """, unsafe_allow_html=True)
+        """
+    
+    return ""
+
+
+def _agent_bubble(content):
+    return f"""
+        <div style='
+            background: rgba(139, 92, 246, 0.2);
+            border-left: 4px solid #8b5cf6;
+            color: #E8EAED;
+            padding: 15px 20px;
+            border-radius: 18px;
+            margin: 10px 40% 10px 0;
+            animation: fadeIn 0.3s;
+        '>
+            <div style='font-weight: 600; color: #8b5cf6;'>🤖 Agent Finn</div>
+            <div style='margin-top: 5px;'>{content}</div>
+        </div>
+        """
+
+
+def stream_agent_message(chunks):
+    """
+    Render an agent bubble that grows as text chunks arrive.
+    Returns the full text once the stream is exhausted.
+    """
+
+    placeholder = st.empty()
+    text = ""
+
+    for chunk in chunks:
+        text += chunk
+        placeholder.markdown(_agent_bubble(text + "▌"), unsafe_allow_html=True)
+
+    text = text.strip()
+    placeholder.markdown(_agent_bubble(text), unsafe_allow_html=True)
+    return text
 
 
 def render_agent_loading(agent_name):
@@ -71,47 +113,8 @@ def render_agent_loading(agent_name):
     
     icon = icons.get(agent_name, "🤖")
     
-    st.markdown(f"""
-    <div style='
-        background: rgba(139, 92, 246, 0.2);
-        border-left: 4px solid #8b5cf6;
-        padding: 15px 20px;
-        border-radius: 12px;
-        margin: 10px 40% 10px 0;
-        animation: pulse 1.5s infinite;
-    '>
-        <div style='font-weight: 600; color: #8b5cf6;'>{icon} {agent_name} Agent</div>
-        <div style='margin-top: 8px; display: flex; align-items: center; gap: 10px;'>
-            <div class='loading-spinner'></div>
-            <span>Processing...</span>
-        </div>
-    </div>
-    
-    <style>
-    @keyframes pulse {{
-        0%, 100% {{ opacity: 1; }}
-        50% {{ opacity: 0.7; }}
-    }}
-    
-    .loading-spinner {{
-        width: 16px;
-        height: 16px;
-        border: 2px solid rgba(139, 92, 246, 0.3);
-        border-top-color: #8b5cf6;
-        border-radius: 50%;
-        animation: spin 0.8s linear infinite;
-    }}
-    
-    @keyframes spin {{
-        to {{ transform: rotate(360deg); }}
-    }}
-    
-    @keyframes fadeIn {{
-        from {{ opacity: 0; transform: translateY(10px); }}
-        to {{ opacity: 1; transform: translateY(0); }}
-    }}
-    </style>
-    """, unsafe_allow_html=True)
+    # Spinner and pulse styles ship in the theme bundle
+    st.markdown(loading_html(icon, agent_name), unsafe_allow_html=True)
 
 
 def render_widget_container():
@@ -0,0 +1,118 @@
+# theme/history.py
+"""
+Windowed chat history renderer.
+
+A rerun emits only the most recent entries of the conversation (the
+window); older ones sit behind a "Show earlier messages" control, so
+rerun cost stays flat as a conversation grows. Bubble HTML is built once
+per record and kept on it, in the session's own (memory-capped) history,
+so re-emitting a message does not rebuild it.
+"""
+
+import os
+
+import streamlit as st
+
+from theme.chat_ui import message_html, render_agent_loading
+
+
+HISTORY_WINDOW = int(os.getenv("LOANFLOW_HISTORY_WINDOW", "20"))
+
+SANCTION_BANNER = """
+<div style='background: linear-gradient(135deg, rgba(34, 197, 94, 0.15), rgba(16, 185, 129, 0.15));
+            padding: 25px; border-radius: 15px;
+            border: 2px solid rgba(34, 197, 94, 0.4); margin: 25px 0;
+            box-shadow: 0 6px 20px rgba(34, 197, 94, 0.2);
+            animation: fadeIn 0.5s ease-out;'>
+    <h3 style='color: #22c55e; margin-top: 0; display: flex; align-items: center; gap: 10px;'>
+        🎉 Sanction Letter Generated Successfully!
+    </h3>
+</div>
+"""
+
+
+def _show_earlier():
+    st.session_state.history_window += HISTORY_WINDOW
+
+
+def _render_report(msg, application_id, index):
+    content = msg.content
+    with st.expander("📊 View CIBIL Credit Report", expanded=False):
+        st.code(content, language="text")
+    if msg.download:
+        st.download_button(
+            label="📥 Download CIBIL Report (TXT)",
+            data=content,
+            file_name=f"CIBIL_Report_{application_id}.txt",
+            mime="text/plain",
+            use_container_width=True,
+            key=f"report_download_{index}"
+        )
+
+
+def _render_sanction(msg, application_id):
+    content = msg.content
+    st.markdown(SANCTION_BANNER, unsafe_allow_html=True)
+
+    with st.expander("📄 View Sanction Letter", expanded=True):
+        st.code(content, language="text")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button(
+            label="📥 Download as TXT",
+            data=content,
+            file_name=f"Sanction_Letter_{application_id}.txt",
+            mime="text/plain",
+            use_container_width=True
+        )
+    with col2:
+        st.download_button(
+            label="📧 Email Copy",
+            data=content,
+            file_name=f"Sanction_Letter_{application_id}.txt",
+            mime="text/plain",
+            use_container_width=True
+        )
+
+
+def render_chat_history(history, application_id, window=None):
+    """
+    Render the last `window` history entries (default: the session's
+    current window, grown by "Show earlier messages").
+    Returns the index of the first rendered entry.
+    """
+
+    if window is None:
+        window = st.session_state.setdefault("history_window", HISTORY_WINDOW)
+
+    start = max(0, len(history) - window)
+    if start:
+        st.button(
+            f"⬆️ Show earlier messages ({start} hidden)",
+            key="show_earlier_messages",
+            on_click=_show_earlier,
+            use_container_width=True
+        )
+
+    for i in range(start, len(history)):
+        msg = history[i]
+
+        if msg.type == "message":
+            html = msg.html
+            if html is None:
+                html = message_html(msg.role, msg.content)
+                history.set_html(i, html)
+            if html:
+                st.markdown(html, unsafe_allow_html=True)
+
+        elif msg.type == "loading":
+            render_agent_loading(msg.agent)
+
+        elif msg.type == "report":
+            _render_report(msg, application_id, i)
+
+        elif msg.type == "sanction":
+            _render_sanction(msg, application_id)
+
+    return start
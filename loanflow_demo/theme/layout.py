@@ -0,0 +1,108 @@
+# theme/layout.py
+"""
+Precompiled page chrome: header, stat boxes, progress bar, tip and footer.
+
+Styling lives in the theme bundle (theme/app.css), so the markup is
+class-based. Each template is whitespace-compacted once at import and only
+its dynamic fields are substituted on a rerun.
+"""
+
+import re
+from functools import lru_cache
+
+
+_BETWEEN_TAGS_RE = re.compile(r">\s+<")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def compile_template(html):
+    """Collapse template whitespace once; the result is a str.format template."""
+    return _SPACE_RE.sub(" ", _BETWEEN_TAGS_RE.sub("><", html)).strip()
+
+
+HERO_HTML = compile_template("""
+<div class='lf-hero'>
+    <h1>🏦 LoanFlow</h1>
+    <p class='lf-hero-subtitle'>Smart Conversational Loan Assistant</p>
+    <p class='lf-hero-tagline'>Powered by Finn, the master agent</p>
+</div>
+""")
+
+STAT_TEMPLATE = compile_template("""
+<div class='lf-stat {extra_class}'>
+    <div class='lf-stat-label'>{label}</div>
+    <div class='lf-stat-value {value_class}'>{value}</div>
+</div>
+""")
+
+PROGRESS_TEMPLATE = compile_template("""
+<div class='lf-progress'>
+    <div class='lf-progress-head'>
+        <span class='lf-progress-title'>📊 Application Progress</span>
+        <span class='lf-progress-step'>Step {step} of {total_steps}</span>
+    </div>
+    <div class='lf-progress-track'>
+        <div class='lf-progress-fill' style='width: {width}%;'></div>
+    </div>
+    <div class='lf-progress-stage'>
+        <span class='lf-dot'>●</span>
+        <span>Current Stage: <strong>{stage}</strong></span>
+    </div>
+</div>
+""")
+
+TIP_HTML = compile_template("""
+<div class='lf-tip'>
+    <span>💡 <strong>Quick Tip:</strong> Refresh page for new application | All conversations are securely logged</span>
+</div>
+""")
+
+FOOTER_HTML = compile_template("""
+<div class='lf-footer'>
+    <p class='lf-footer-badges'>
+        🔒 <strong>Secure & Encrypted</strong> |
+        💬 <strong>24/7 Support</strong> |
+        ⚡ <strong>Instant Approvals</strong>
+    </p>
+    <p class='lf-footer-copy'>© 2025 LoanFlow AI. All rights reserved.</p>
+    <p class='lf-footer-legal'>
+        By using this service, you agree to our <a href="#">Terms of Service</a>
+        and <a href="#">Privacy Policy</a>
+    </p>
+</div>
+""")
+
+LOADING_TEMPLATE = compile_template("""
+<div class='lf-loading'>
+    <div class='lf-loading-title'>{icon} {agent_name} Agent</div>
+    <div class='lf-loading-body'>
+        <div class='loading-spinner'></div>
+        <span>Processing...</span>
+    </div>
+</div>
+""")
+
+
+@lru_cache(maxsize=256)
+def stat_html(label, value, mono=False, delayed=False):
+    return STAT_TEMPLATE.format(
+        label=label,
+        value=value,
+        value_class="lf-mono" if mono else "",
+        extra_class="lf-delay" if delayed else "",
+    )
+
+
+@lru_cache(maxsize=64)
+def progress_html(step, total_steps, stage):
+    return PROGRESS_TEMPLATE.format(
+        step=step,
+        total_steps=total_steps,
+        width=round(step / total_steps * 100, 2),
+        stage=stage,
+    )
+
+
+@lru_cache(maxsize=16)
+def loading_html(icon, agent_name):
+    return LOADING_TEMPLATE.format(icon=icon, agent_name=agent_name)
@@ -3,57 +3,57 @@ import streamlit as st
 # ================================
 # GLOBAL THEME INITIALIZATION
 # ================================
-def load_theme():
-    """Inject global CSS styles for LoanFlow AI UI."""
-    st.markdown("""
-    <style>
+THEME_CSS = """
+/* Global background */
+.main { 
+    background: linear-gradient(135deg, #0a0e27, #1a1f3a); 
+    color: #E8EAED; 
+}
+
+/* Agent cards (status on left side) */
+.agent-card {
+    background: rgba(30, 35, 60, 0.8);
+    border-radius: 12px;
+    padding: 20px;
+    border-left: 4px solid #6366f1;
+    margin: 10px 0;
+}
+
+.agent-card.working { 
+    border-left-color: #8b5cf6; 
+    background: rgba(139, 92, 246, 0.2); 
+    animation: pulse 2s infinite; 
+}
+
+.agent-card.complete { 
+    border-left-color: #10b981; 
+    background: rgba(16, 185, 129, 0.2); 
+}
+
+.agent-card.error { 
+    border-left-color: #ef4444; 
+    background: rgba(239, 68, 68, 0.15); 
+}
+
+@keyframes pulse { 
+    0%, 100% { opacity: 1; } 
+    50% { opacity: 0.7; } 
+}
+
+/* Top metrics bar boxes */
+.metric-box { 
+    background: rgba(139, 92, 246, 0.2); 
+    border-radius: 8px; 
+    padding: 15px; 
+    text-align: center; 
+}
+"""
 
-    /* Global background */
-    .main { 
-        background: linear-gradient(135deg, #0a0e27, #1a1f3a); 
-        color: #E8EAED; 
-    }
-
-    /* Agent cards (status on left side) */
-    .agent-card {
-        background: rgba(30, 35, 60, 0.8);
-        border-radius: 12px;
-        padding: 20px;
-        border-left: 4px solid #6366f1;
-        margin: 10px 0;
-    }
-
-    .agent-card.working { 
-        border-left-color: #8b5cf6; 
-        background: rgba(139, 92, 246, 0.2); 
-        animation: pulse 2s infinite; 
-    }
-
-    .agent-card.complete { 
-        border-left-color: #10b981; 
-        background: rgba(16, 185, 129, 0.2); 
-    }
 
-    .agent-card.error { 
-        border-left-color: #ef4444; 
-        background: rgba(239, 68, 68, 0.15); 
-    }
-
-    @keyframes pulse { 
-        0%, 100% { opacity: 1; } 
-        50% { opacity: 0.7; } 
-    }
-
-    /* Top metrics bar boxes */
-    .metric-box { 
-        background: rgba(139, 92, 246, 0.2); 
-        border-radius: 8px; 
-        padding: 15px; 
-        text-align: center; 
-    }
-
-    </style>
-    """, unsafe_allow_html=True)
+def load_theme():
+    """Inject global CSS styles for LoanFlow AI UI (the merged theme bundle)."""
+    from theme.assets import inject_theme
+    inject_theme()
 
 
 # ================================
@@ -0,0 +1,76 @@
+# tools/audit_query.py
+"""
+Pull one application's audit trail from the structured audit log.
+
+Uses the per-application segment indexes (core/audit_store.py), so the
+lookup reads only that application's records however large the log is.
+
+    python -m tools.audit_query LF123456
+    python -m tools.audit_query LF123456 --since 2026-10-01 --until "2026-10-19 18:00" --json
+    python -m tools.audit_query --stats
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+
+from core.audit_store import AUDIT_DIR, query, store_stats
+
+
+def parse_time(value):
+    """Epoch seconds or an ISO date/datetime (local time)."""
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a timestamp or ISO date: {value!r}")
+
+
+def format_record(record):
+    stamp = datetime.fromtimestamp(record["ts"]).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+    latency = f"{record['latency_ms']:>9.2f} ms" if record.get("latency_ms") is not None else " " * 12
+    payload = json.dumps(record["payload"], ensure_ascii=False) if record.get("payload") else ""
+    return f"{stamp}  {record['stage']:<26}{record['event']:<14}{latency}  {payload}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the structured audit log by application ID")
+    parser.add_argument("application_id", nargs="?")
+    parser.add_argument("--dir", default=AUDIT_DIR, help=f"Audit directory (default: {AUDIT_DIR})")
+    parser.add_argument("--since", type=parse_time, help="Epoch seconds or ISO date/datetime")
+    parser.add_argument("--until", type=parse_time, help="Epoch seconds or ISO date/datetime")
+    parser.add_argument("--json", action="store_true", help="Print records as JSON lines")
+    parser.add_argument("--stats", action="store_true", help="Print segment and index sizes")
+    args = parser.parse_args()
+
+    if args.stats:
+        json.dump(store_stats(args.dir), sys.stdout, indent=2)
+        print()
+        return
+    if not args.application_id:
+        parser.error("application_id is required (or use --stats)")
+
+    start = time.perf_counter()
+    records = query(args.application_id, args.dir, since=args.since, until=args.until)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if args.json:
+        for record in records:
+            print(json.dumps(record, ensure_ascii=False))
+        return
+
+    if not records:
+        print(f"No audit records for {args.application_id} in {args.dir}")
+        sys.exit(1)
+    for record in records:
+        print(format_record(record))
+    print(f"\n{len(records)} records in {elapsed_ms:.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# tools/batch_explain.py
+"""
+Offline batch underwriting with chat-identical explanations.
+
+Reads applicants from CSV or JSONL, underwrites each row (unless it already
+has a decision) and streams results to CSV/JSONL in input order as they
+complete, so output starts immediately and memory stays flat.
+
+    python -m tools.batch_explain applicants.csv -o explained.csv
+    LOANFLOW_LLM_POLISH=1 python -m tools.batch_explain applicants.jsonl -o out.jsonl --workers 16
+
+Columns: loan_amount, tenure, credit_score, existing_emi, monthly_salary
+(or income), pre_approved_limit, employment_type, loan_purpose. Rows that
+are missing a required field or can't be underwritten are still written,
+with the reason in an `error` column and no explanation.
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+
+from ai.batch import BatchExplainer, UW_FIELDS
+
+
+NUMERIC_FIELDS = ["loan_amount", "tenure", "credit_score", "existing_emi", "monthly_salary", "pre_approved_limit"]
+REQUIRED_FIELDS = ["loan_amount", "tenure", "credit_score", "monthly_salary"]
+DEFAULTS = {"employment_type": "Salaried", "loan_purpose": "Personal", "existing_emi": 0}
+OUTPUT_FIELDS = NUMERIC_FIELDS + list(DEFAULTS) + UW_FIELDS + ["explanation", "error"]
+
+
+def normalise_row(row):
+    """
+    Coerce a raw CSV/JSONL row into the chat's app_data shape.
+    Raises ValueError if a required field is missing or not a number.
+    """
+    app = {k: v for k, v in row.items() if v not in (None, "")}
+    if "monthly_salary" not in app and "income" in app:
+        app["monthly_salary"] = app["income"]
+    missing = [key for key in REQUIRED_FIELDS if key not in app]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    for key, value in DEFAULTS.items():
+        app.setdefault(key, value)
+    for key in NUMERIC_FIELDS:
+        if key in app:
+            try:
+                app[key] = int(float(app[key]))
+            except (TypeError, ValueError):
+                raise ValueError(f"{key} is not a number: {app[key]!r}") from None
+    if "pre_approved_limit" not in app:
+        app["pre_approved_limit"] = app["monthly_salary"] * 3
+    if app.get("decision"):
+        for key in ("emi", "interest_rate", "foir"):
+            app[key] = float(app[key]) if app.get(key) not in (None, "") else None
+    return app
+
+
+def _checked(row):
+    """Normalised row, or the raw row with an error (written, not underwritten)."""
+    try:
+        return normalise_row(row)
+    except ValueError as e:
+        return dict(row, error=str(e))
+
+
+def read_rows(path):
+    """Yield normalised rows lazily from a .csv or .jsonl file (- for stdin)."""
+    f = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+    try:
+        if path.endswith(".csv"):
+            for row in csv.DictReader(f):
+                yield _checked(row)
+        else:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield {"error": f"line {line_no}: invalid JSON ({e.msg})"}
+                    continue
+                yield _checked(row) if isinstance(row, dict) else {"error": f"line {line_no}: not an object"}
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+class StreamingWriter:
+    """Writes result rows as they arrive; CSV header comes from the first row."""
+
+    def __init__(self, f, fmt, flush_every=100):
+        self.f = f
+        self.fmt = fmt
+        self.flush_every = flush_every
+        self.count = 0
+        self._csv = None
+
+    def write(self, app, explanation):
+        record = dict(app, explanation=explanation)
+
+        if self.fmt == "jsonl":
+            self.f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            if self._csv is None:
+                fields = list(dict.fromkeys(list(app) + OUTPUT_FIELDS))
+                self._csv = csv.DictWriter(self.f, fieldnames=fields, extrasaction="ignore")
+                self._csv.writeheader()
+            self._csv.writerow(record)
+
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self.f.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch underwriting explanations in input order")
+    parser.add_argument("input", help="Applicants .csv or .jsonl (- for JSONL on stdin)")
+    parser.add_argument("-o", "--output", default="-", help="Output .csv or .jsonl (- for stdout)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Output format (default: from extension)")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent unique LLM requests")
+    parser.add_argument("--window", type=int, default=256, help="Rows buffered ahead of the writer")
+    parser.add_argument("--polish", action="store_true", help="Use the LLM (same as LOANFLOW_LLM_POLISH=1)")
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.output.endswith(".csv") else "jsonl")
+    out = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+
+    explainer = BatchExplainer(polish=True if args.polish else None, max_workers=args.workers, window=args.window)
+    writer = StreamingWriter(out, fmt)
+    start = time.perf_counter()
+
+    try:
+        for app, explanation in explainer.run(read_rows(args.input)):
+            writer.write(app, explanation)
+    finally:
+        out.flush()
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    stats = explainer.stats
+    print(
+        f"✅ {stats['rows']} rows in {elapsed:.2f}s ({stats['rows'] / max(elapsed, 1e-9):,.0f} rows/s) · "
+        f"LLM: {'on' if explainer.polish else 'off'}, unique {stats['unique']}, "
+        f"deduplicated {stats['deduplicated']}, errors {stats['errors']}, invalid rows {stats['invalid']}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# tools/funnel_report.py
+"""
+Funnel, decision mix, purposes and stage dwell times from the audit logs.
+
+With no paths, reads the structured records (LOANFLOW_AUDIT_DIR) and the
+conversation log (LOANFLOW_AUDIT_LOG) with its gzip'd archives. Paths can
+be text logs (.txt / .gz), JSONL segments or audit directories. One
+streaming pass, bounded memory (core/funnel.py).
+
+    python -m tools.funnel_report
+    python -m tools.funnel_report conversation_logs.txt --top 15
+    python -m tools.funnel_report /var/log/loanflow/audit_logs old_logs.txt.gz --json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from core.audit import LOG_PATH, RotatingLogFile
+from core.audit_store import AUDIT_DIR, segments
+from core.funnel import FunnelAnalyzer, SESSION_TIMEOUT
+
+
+def collect_inputs(paths):
+    """(structured segments, text logs), each oldest first."""
+    explicit = bool(paths)
+    if not explicit:
+        paths = [AUDIT_DIR, *RotatingLogFile(LOG_PATH).archives(), LOG_PATH]
+
+    records, texts = [], []
+    for path in paths:
+        if os.path.isdir(path):
+            records.extend(segment for _, segment in segments(path))
+        elif path.endswith(".jsonl"):
+            records.append(path)
+        elif os.path.exists(path):
+            texts.append(path)
+        elif explicit:
+            print(f"⚠️ Skipping missing input: {path}", file=sys.stderr)
+    return records, texts
+
+
+def print_report(report):
+    print(f"Sessions: {report['sessions']:,}  ({report['from']} → {report['to']})")
+    if report["skipped_duplicate_text_sessions"]:
+        print(f"Text sessions also in the structured log (skipped): {report['skipped_duplicate_text_sessions']:,}")
+
+    print(f"\n{'funnel step':<14}{'sessions':>10}{'% start':>10}{'% prev':>9}")
+    for row in report["funnel"]:
+        print(f"{row['step']:<14}{row['sessions']:>10,}{row['of_started_pct']:>10.1f}{row['of_previous_pct']:>9.1f}")
+
+    print(f"\n{'decision':<20}{'count':>8}{'%':>8}")
+    for decision, row in report["decisions"].items():
+        print(f"{decision:<20}{row['count']:>8,}{row['pct']:>8.1f}")
+
+    print(f"\n{'purpose':<40}{'count':>8}   ({report['distinct_purposes']:,} distinct)")
+    for purpose, n in report["purposes"].items():
+        print(f"{purpose[:39]:<40}{n:>8,}")
+
+    print(f"\n{'recommended loan type':<40}{'count':>8}")
+    for loan_type, n in report["recommendations"].items():
+        print(f"{loan_type[:39]:<40}{n:>8,}")
+
+    print(f"\n{'stage dwell':<26}{'count':>8}{'p50 s':>9}{'p95 s':>9}{'max s':>10}")
+    for stage, row in report["dwell"].items():
+        print(f"{stage:<26}{row['count']:>8,}{row['p50_s']:>9.1f}{row['p95_s']:>9.1f}{row['max_s']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming funnel analytics over the audit logs")
+    parser.add_argument("paths", nargs="*", help="Text logs (.txt/.gz), JSONL segments or audit directories")
+    parser.add_argument("--top", type=int, default=10, help="Rows per distribution (default: 10)")
+    parser.add_argument("--session-timeout", type=float, default=SESSION_TIMEOUT,
+                        help=f"Idle seconds before a structured session is closed (default: {SESSION_TIMEOUT})")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    records, texts = collect_inputs(args.paths)
+    analyzer = FunnelAnalyzer(session_timeout=args.session_timeout)
+
+    start = time.perf_counter()
+    # Structured first: it sets the cut-off for duplicate text sessions
+    for path in records:
+        analyzer.feed_file(path, structured=True)
+    for path in texts:
+        analyzer.feed_file(path, structured=False)
+    elapsed = time.perf_counter() - start
+
+    report = analyzer.report(top=args.top)
+    report["input"]["seconds"] = round(elapsed, 2)
+    report["input"]["mb_per_s"] = round(report["input"]["bytes"] / 1e6 / elapsed, 1) if elapsed else 0.0
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        return
+
+    print_report(report)
+    stats = report["input"]
+    print(f"\nRead {stats['files']} files, {stats['bytes'] / 1e6:,.1f} MB in {stats['seconds']:.2f} s "
+          f"({stats['mb_per_s']:,.1f} MB/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
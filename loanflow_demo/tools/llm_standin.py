@@ -0,0 +1,262 @@
+# tools/llm_standin.py
+"""
+Local OpenAI/Groq-compatible stand-in LLM server.
+
+Serves /openai/v1/chat/completions (Groq path), /v1/chat/completions and
+/openai/v1/models with configurable latency, token rate, error rate and
+canned responses, so the AI layer can be measured without the live API.
+
+    python -m tools.llm_standin --port 8787 --latency lognormal --latency-ms 400
+    GROQ_API_KEY=dummy GROQ_BASE_URL=http://127.0.0.1:8787 streamlit run app.py
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+DEFAULT_RESPONSES = {
+    "RECOMMENDED:": (
+        "A Personal Loan fits this need well: quick disbursal and no collateral. "
+        "Key benefits: flexible tenure and fixed EMIs.\n\nRECOMMENDED: Personal"
+    ),
+    "rejected": (
+        "We're sorry, we couldn't approve this loan right now. The requested amount is "
+        "above what your profile supports. Improving your credit score, reducing existing "
+        "EMIs or applying for a lower amount will help."
+    ),
+    "CIBIL": (
+        "Your credit score is in a healthy range and your repayment history looks "
+        "consistent. Keep payments on time to maintain it."
+    ),
+    "default": (
+        "Your application was evaluated against our standard rules. Your FOIR shows how "
+        "much of your income goes to EMIs; keeping it under 50% improves eligibility."
+    ),
+}
+
+MODELS = ["llama-3.3-70b-versatile", "llama-3.1-8b-instant"]
+
+
+class StandInConfig:
+    """Behaviour knobs for the stand-in server."""
+
+    def __init__(self, latency="fixed", latency_ms=300.0, jitter_ms=100.0,
+                 tokens_per_sec=150.0, error_rate=0.0, error_status=500,
+                 responses=None, seed=None):
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tokens_per_sec = tokens_per_sec
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.responses = dict(DEFAULT_RESPONSES, **(responses or {}))
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def sample_latency(self):
+        """Time to first token, in seconds."""
+        with self._rng_lock:
+            if self.latency == "uniform":
+                ms = self._rng.uniform(self.latency_ms - self.jitter_ms, self.latency_ms + self.jitter_ms)
+            elif self.latency == "normal":
+                ms = self._rng.gauss(self.latency_ms, self.jitter_ms)
+            elif self.latency == "lognormal":
+                # latency_ms is the median, jitter_ms widens the tail
+                sigma = self.jitter_ms / self.latency_ms if self.latency_ms else 0
+                ms = self._rng.lognormvariate(0, sigma) * self.latency_ms
+            else:
+                ms = self.latency_ms
+        return max(0.0, ms) / 1000.0
+
+    def should_fail(self):
+        with self._rng_lock:
+            return self._rng.random() < self.error_rate
+
+    def pick_response(self, prompt):
+        for needle, text in self.responses.items():
+            if needle != "default" and needle in prompt:
+                return text
+        return self.responses["default"]
+
+
+def _tokenize(text):
+    # Whitespace-preserving word chunks stand in for model tokens
+    words = text.split(" ")
+    return [w + " " for w in words[:-1]] + [words[-1]]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    config = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/") in ("/openai/v1/models", "/v1/models"):
+            self._send_json(200, {
+                "object": "list",
+                "data": [{"id": m, "object": "model", "owned_by": "standin"} for m in MODELS]
+            })
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        if self.path.rstrip("/") not in ("/openai/v1/chat/completions", "/v1/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        config = self.config
+
+        time.sleep(config.sample_latency())
+
+        if config.should_fail():
+            self._send_json(config.error_status, {
+                "error": {"message": "stand-in injected error", "type": "server_error"}
+            })
+            return
+
+        prompt = " ".join(m.get("content", "") for m in request.get("messages", []))
+        tokens = _tokenize(config.pick_response(prompt))
+        tokens = tokens[:request.get("max_tokens") or len(tokens)]
+        delay = 1.0 / config.tokens_per_sec if config.tokens_per_sec > 0 else 0
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = request.get("model", MODELS[0])
+        created = int(time.time())
+
+        if request.get("stream"):
+            self._stream(tokens, delay, completion_id, model, created)
+            return
+
+        time.sleep(delay * len(tokens))
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(tokens)},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": len(prompt.split()),
+                "completion_tokens": len(tokens),
+                "total_tokens": len(prompt.split()) + len(tokens)
+            }
+        })
+
+    def _stream(self, tokens, delay, completion_id, model, created):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        def event(delta, finish_reason=None):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        event({"role": "assistant", "content": ""})
+        for token in tokens:
+            time.sleep(delay)
+            event({"content": token})
+        event({}, "stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+
+class _StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that hit their deadline (or lose a hedge race) hang up early
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def start_server(config=None, host="127.0.0.1", port=0):
+    """
+    Start the stand-in in a daemon thread.
+    Returns (server, base_url); call server.shutdown() to stop.
+    """
+    handler = type("StandInHandler", (_Handler,), {"config": config or StandInConfig()})
+    server = _StandInServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="llm-standin", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def add_config_args(parser):
+    parser.add_argument("--latency", choices=["fixed", "uniform", "normal", "lognormal"], default="fixed",
+                        help="Time-to-first-token distribution")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Mean/median time to first token")
+    parser.add_argument("--jitter-ms", type=float, default=100.0, help="Spread of the latency distribution")
+    parser.add_argument("--tokens-per-sec", type=float, default=150.0, help="Generation speed (0 = instant)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status for injected errors")
+    parser.add_argument("--responses", help="JSON file of {substring: response} canned replies")
+    parser.add_argument("--seed", type=int, help="Seed for reproducible latency/error sampling")
+
+
+def config_from_args(args):
+    responses = None
+    if args.responses:
+        with open(args.responses, encoding="utf-8") as f:
+            responses = json.load(f)
+
+    return StandInConfig(
+        latency=args.latency,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        tokens_per_sec=args.tokens_per_sec,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        responses=responses,
+        seed=args.seed
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Groq/OpenAI-compatible stand-in LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    add_config_args(parser)
+    args = parser.parse_args()
+
+    server, base_url = start_server(config_from_args(args), args.host, args.port)
+    print(f"🧪 LLM stand-in listening on {base_url}")
+    print(f"   export GROQ_API_KEY=dummy GROQ_BASE_URL={base_url}")
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()